@@ -1,5 +1,6 @@
 import 'dart:convert';
 import 'dart:math' as math;
+import 'dart:typed_data';
 import 'package:flutter/services.dart';
 import 'package:google_maps_flutter/google_maps_flutter.dart';
 
@@ -7,11 +8,26 @@ import 'package:google_maps_flutter/google_maps_flutter.dart';
 class TileService {
   final Map<String, Map<String, dynamic>> _tileCache = {};
   Map<String, dynamic>? _tileIndex;
+  _TileBundle? _bundle;
+  
+  static const _bundleDir = 'assets/maps/tile_bundles';
   
   /// Load tile index từ assets
+  /// Ưu tiên tile đã đóng gói (tools/pack_tile_bundles.py), nếu không có thì
+  /// đọc từng file trong assets/maps/tiles
   Future<void> loadTileIndex() async {
     if (_tileIndex != null) return;
     
+    try {
+      _bundle = await _TileBundle.load(_bundleDir);
+      final indexStr = await rootBundle.loadString('$_bundleDir/index.json');
+      _tileIndex = json.decode(indexStr);
+      print('📚 Loaded tile bundles with ${_bundle!.length} tiles');
+      return;
+    } catch (e) {
+      _bundle = null;
+    }
+    
     try {
       final indexStr = await rootBundle.loadString('assets/maps/tiles/index.json');
       _tileIndex = json.decode(indexStr);
@@ -80,8 +96,10 @@ class TileService {
     }
     
     try {
-      final tilePath = 'assets/maps/tiles/$tileKey.json';
-      final tileStr = await rootBundle.loadString(tilePath);
+      final tileStr = _bundle != null
+          ? await _bundle!.loadString(tileKey)
+          : await rootBundle.loadString('assets/maps/tiles/$tileKey.json');
+      if (tileStr == null) return null;
       final tileData = json.decode(tileStr);
       
       // Cache tile
@@ -116,6 +134,7 @@ class TileService {
   /// Clear cache để free memory
   void clearCache() {
     _tileCache.clear();
+    _bundle?.clear();
     print('🧹 Cleared tile cache');
   }
   
@@ -125,6 +144,68 @@ class TileService {
   }
 }
 
+/// Tile đóng gói: bảng tiles.idx (z/x/y -> bundle, offset, length) + các
+/// file .bin; mỗi bundle chỉ load một lần rồi cắt tile ra theo offset
+class _TileBundle {
+  final String dir;
+  final List<String> _bundles;
+  final Map<String, List<int>> _entries;
+  final Map<int, Future<ByteData>> _data = {};
+
+  _TileBundle._(this.dir, this._bundles, this._entries);
+
+  int get length => _entries.length;
+
+  static Future<_TileBundle> load(String dir) async {
+    final table = await rootBundle.load('$dir/tiles.idx');
+    final bytes = table.buffer.asUint8List(table.offsetInBytes, table.lengthInBytes);
+    final magic = String.fromCharCodes(bytes.sublist(0, 4));
+    final version = table.getUint16(4, Endian.little);
+    if (magic != 'TBDL' || version != 1) {
+      throw FormatException('Unsupported tile table: $magic v$version');
+    }
+    final bundleCount = table.getUint16(6, Endian.little);
+    final tileCount = table.getUint32(8, Endian.little);
+    
+    var pos = 12;
+    final bundles = <String>[];
+    for (var i = 0; i < bundleCount; i++) {
+      final length = bytes[pos];
+      bundles.add(String.fromCharCodes(bytes.sublist(pos + 1, pos + 1 + length)));
+      pos += 1 + length;
+    }
+    
+    // 20 bytes / tile: z, pad, bundle, x, y, offset, length
+    final entries = <String, List<int>>{};
+    for (var i = 0; i < tileCount; i++, pos += 20) {
+      final z = table.getUint8(pos);
+      final x = table.getUint32(pos + 4, Endian.little);
+      final y = table.getUint32(pos + 8, Endian.little);
+      entries['$z/$x/$y'] = [
+        table.getUint16(pos + 2, Endian.little),
+        table.getUint32(pos + 12, Endian.little),
+        table.getUint32(pos + 16, Endian.little),
+      ];
+    }
+    return _TileBundle._(dir, bundles, entries);
+  }
+
+  /// Nội dung JSON của tile, null nếu tile không có trong bundle
+  Future<String?> loadString(String tileKey) async {
+    final entry = _entries[tileKey];
+    if (entry == null) return null;
+    
+    final data = await _data.putIfAbsent(
+      entry[0],
+      () => rootBundle.load('$dir/${_bundles[entry[0]]}'),
+    );
+    return utf8.decode(data.buffer.asUint8List(data.offsetInBytes + entry[1], entry[2]));
+  }
+
+  /// Bỏ các bundle đã load (bảng tra vẫn giữ)
+  void clear() => _data.clear();
+}
+
 class _TileCoordinate {
   final int zoom;
   final int x;
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark and accuracy suite for VN-2000 -> WGS84 projection.
+
+Đo tốc độ (điểm/giây) của:
+  - pyproj từng điểm
+  - pyproj theo mảng (batched)
+  - kernel NumPy (vn2000.py)
+  - grid nội suy (grid_transform.py)
+ở các cỡ 1k / 100k / 10M điểm, rồi kiểm tra sai số thuận/nghịch/khứ hồi so với
+pyproj trên lưới dày phủ vùng nghiên cứu. Kết quả ghi ra JSON để so sánh hồi quy.
+
+Usage:
+    python tools/benchmark_projection.py
+    python tools/benchmark_projection.py --sizes 1000 100000 --output bench.json
+    python tools/benchmark_projection.py --compare bench_baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from grid_transform import build_grid, load_grid
+from vn2000 import (
+    STUDY_AREA,
+    USE_PYPROJ,
+    degrees_to_metres,
+    get_transformer,
+    vn2000_to_wgs84_np,
+    wgs84_to_vn2000_np,
+)
+
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+PER_POINT_LIMIT = 100_000  # per-point pyproj is too slow beyond this
+ACCURACY_GRID = 400  # 400 x 400 check points over the study area
+KERNEL_TOLERANCE_M = 0.001
+ROUND_TRIP_TOLERANCE_M = 0.001
+REGRESSION_SLOWDOWN = 0.8  # flag if throughput drops below 80% of baseline
+
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    min_e, min_n, max_e, max_n = STUDY_AREA
+    return rng.uniform(min_e, max_e, n), rng.uniform(min_n, max_n, n)
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_methods(grid):
+    """name -> callable(e, n) for every available method."""
+    methods = {}
+    if USE_PYPROJ:
+        transformer = get_transformer()
+
+        def per_point(e, n):
+            transform = transformer.transform
+            for x, y in zip(e.tolist(), n.tolist()):
+                transform(x, y)
+
+        methods["pyproj_per_point"] = per_point
+        methods["pyproj_batched"] = transformer.transform
+    methods["numpy_kernel"] = vn2000_to_wgs84_np
+    methods["grid_bilinear"] = grid.transform
+    return methods
+
+
+def run_throughput(grid, sizes):
+    results = []
+    methods = benchmark_methods(grid)
+    for size in sizes:
+        e, n = random_points(size)
+        repeat = 5 if size <= 100_000 else 1
+        for name, func in methods.items():
+            if name == "pyproj_per_point" and size > PER_POINT_LIMIT:
+                results.append({"method": name, "points": size, "skipped": True})
+                continue
+            seconds = timed(lambda: func(e, n), repeat)
+            results.append(
+                {
+                    "method": name,
+                    "points": size,
+                    "seconds": seconds,
+                    "points_per_second": size / seconds,
+                }
+            )
+            print(f"  {name:18} {size:>12,} pts  {size / seconds:>16,.0f} pts/s")
+    return results
+
+
+def max_error_m(lon, lat, ref_lon, ref_lat):
+    return float(degrees_to_metres(lon - ref_lon, lat - ref_lat, ref_lat).max())
+
+
+def run_accuracy(grid, resolution=ACCURACY_GRID):
+    """Forward / inverse / round-trip errors on a dense grid (metres)."""
+    min_e, min_n, max_e, max_n = STUDY_AREA
+    e, n = np.meshgrid(
+        np.linspace(min_e, max_e, resolution), np.linspace(min_n, max_n, resolution)
+    )
+    e, n = e.ravel(), n.ravel()
+
+    lon, lat = vn2000_to_wgs84_np(e, n)
+    back_e, back_n = wgs84_to_vn2000_np(lon, lat)
+    grid_lon, grid_lat = grid.transform(e, n)
+
+    report = {
+        "points": int(e.size),
+        "kernel_round_trip_m": float(np.hypot(back_e - e, back_n - n).max()),
+    }
+
+    if USE_PYPROJ:
+        ref_lon, ref_lat = get_transformer().transform(e, n)
+        ref_e, ref_n = get_transformer(inverse=True).transform(ref_lon, ref_lat)
+        inv_e, inv_n = wgs84_to_vn2000_np(ref_lon, ref_lat)
+        report.update(
+            {
+                "kernel_forward_vs_pyproj_m": max_error_m(lon, lat, ref_lon, ref_lat),
+                "kernel_inverse_vs_pyproj_m": float(
+                    np.hypot(inv_e - ref_e, inv_n - ref_n).max()
+                ),
+                "pyproj_round_trip_m": float(np.hypot(ref_e - e, ref_n - n).max()),
+                "grid_vs_pyproj_m": max_error_m(grid_lon, grid_lat, ref_lon, ref_lat),
+            }
+        )
+    else:
+        report["grid_vs_kernel_m"] = max_error_m(grid_lon, grid_lat, lon, lat)
+    return report
+
+
+def check_accuracy(accuracy, grid):
+    """Return a list of failed assertions."""
+    failures = []
+    checks = [
+        ("kernel_forward_vs_pyproj_m", KERNEL_TOLERANCE_M),
+        ("kernel_inverse_vs_pyproj_m", KERNEL_TOLERANCE_M),
+        ("kernel_round_trip_m", ROUND_TRIP_TOLERANCE_M),
+        ("grid_vs_pyproj_m", grid.error_bound),
+        ("grid_vs_kernel_m", grid.error_bound),
+    ]
+    for key, limit in checks:
+        if key in accuracy and accuracy[key] > limit:
+            failures.append(f"{key} = {accuracy[key]:.6f} m > {limit:.6f} m")
+    return failures
+
+
+def compare(results, baseline_file):
+    """Return regressions against a previous results file."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    old = {
+        (r["method"], r["points"]): r
+        for r in baseline.get("throughput", [])
+        if not r.get("skipped")
+    }
+    for r in results["throughput"]:
+        prev = old.get((r["method"], r["points"]))
+        if prev is None or r.get("skipped"):
+            continue
+        ratio = r["points_per_second"] / prev["points_per_second"]
+        if ratio < REGRESSION_SLOWDOWN:
+            regressions.append(
+                f"{r['method']} @ {r['points']:,}: {ratio:.0%} of baseline throughput"
+            )
+    for key, value in results["accuracy"].items():
+        prev = baseline.get("accuracy", {}).get(key)
+        if key.endswith("_m") and prev is not None and value > max(prev * 2, 1e-6):
+            regressions.append(f"{key}: {value:.6f} m (baseline {prev:.6f} m)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Projection benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", default="projection_benchmark.json")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("PROJECTION BENCHMARK")
+    print("=" * 80)
+    if not USE_PYPROJ:
+        print("⚠️ pyproj not found, benchmarking NumPy kernel and grid only")
+
+    grid = load_grid()
+    if grid is None:
+        print("Building grid transform (run grid_transform.py to cache it)...")
+        grid, _ = build_grid()
+
+    print("\nThroughput:")
+    throughput = run_throughput(grid, args.sizes)
+
+    print("\nAccuracy (max error over study area):")
+    accuracy = run_accuracy(grid)
+    for key, value in accuracy.items():
+        if key.endswith("_m"):
+            print(f"  {key:30} {value * 1000:10.4f} mm")
+
+    results = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "grid_step_m": grid.step,
+        "grid_error_bound_m": grid.error_bound,
+        "throughput": throughput,
+        "accuracy": accuracy,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+
+    failures = check_accuracy(accuracy, grid)
+    if args.compare:
+        failures += compare(results, args.compare)
+
+    print("\n" + "=" * 80)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ All accuracy checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Geometry cleaning pipeline: tạo lại các file *_cleaned.geojson.
+
+Thay cho việc làm sạch thủ công (HOAHAI.geojson -> HOAHAI_cleaned.geojson,
+KM.geojson.backup 4 MB -> KM_cleaned.geojson 36 KB). Mọi đỉnh được gom vào mảng
+NumPy phẳng (đỉnh / vòng / part / feature) rồi xử lý vector hoá:
+  1. bỏ đỉnh trùng liên tiếp
+  2. bỏ đỉnh thẳng hàng (khoảng cách tới đoạn nối hai đỉnh kề <= tolerance)
+  3. khép kín vòng polygon
+  4. bỏ vòng / part suy biến (polygon < 4 đỉnh hoặc diện tích 0, line < 2 đỉnh)
+  5. sửa chiều vòng theo RFC 7946 (vòng ngoài ngược chiều kim đồng hồ, lỗ thuận)
+Tuỳ chọn lọc feature (--labels-only, --layers) như bước lọc nhãn của KM.geojson.
+
+Usage:
+    python tools/clean_geometry.py assets/maps/KM.geojson.backup --labels-only
+    python tools/clean_geometry.py assets/maps/260to.geojson --report clean_report.json
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from columnar_cache import geometry_parts
+
+# Kind of every ring, decides which cleaning steps apply
+POINT, LINE, POLYGON = 0, 1, 2
+GEOM_KIND = {
+    "Point": POINT,
+    "MultiPoint": POINT,
+    "LineString": LINE,
+    "MultiLineString": LINE,
+    "Polygon": POLYGON,
+    "MultiPolygon": POLYGON,
+}
+LABEL_PATTERN = re.compile(r"^(Tổ\s+\d+|Chi bộ\s)")
+
+
+def fix_mojibake(text):
+    """'tá»\\x95 dÃ¢n phá»\\x91' -> 'tổ dân phố' (UTF-8 read as Latin-1)."""
+    try:
+        return text.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
+
+
+def keep_feature(feature, layers=None, labels_only=False):
+    props = feature.get("properties") or {}
+    if layers is not None and fix_mojibake(props.get("Layer") or "") not in layers:
+        return False
+    if labels_only:
+        return bool(LABEL_PATTERN.match(props.get("Text_utf8") or ""))
+    return True
+
+
+class FlatGeometry:
+    """Features flattened to coordinate / offset arrays."""
+
+    def __init__(self, features):
+        self.geom_types = []
+        coords = []
+        ring_offsets = [0]
+        ring_kind = []
+        ring_outer = []
+        part_rings = [0]
+        feature_parts = [0]
+        dims = 2
+        for feature in features:
+            geom = feature.get("geometry") or {}
+            geom_type = geom.get("type")
+            kind = GEOM_KIND.get(geom_type)
+            self.geom_types.append(geom_type if kind is not None else None)
+            for part in geometry_parts(geom) if kind is not None else []:
+                for r, ring in enumerate(part):
+                    coords.extend(ring)
+                    dims = max(dims, max((len(c) for c in ring), default=2))
+                    ring_offsets.append(len(coords))
+                    ring_kind.append(kind)
+                    ring_outer.append(r == 0)
+                part_rings.append(len(ring_kind))
+            feature_parts.append(len(part_rings) - 1)
+
+        self.coords = np.zeros((len(coords), dims))
+        for i, c in enumerate(coords):
+            self.coords[i, : len(c)] = c
+        self.dims = dims
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.ring_kind = np.asarray(ring_kind, dtype=np.int8)
+        self.ring_outer = np.asarray(ring_outer, dtype=bool)
+        self.part_rings = np.asarray(part_rings, dtype=np.int64)
+        self.feature_parts = np.asarray(feature_parts, dtype=np.int64)
+
+    @property
+    def vertex_ring(self):
+        return np.repeat(
+            np.arange(len(self.ring_kind)), np.diff(self.ring_offsets)
+        ).astype(np.int64)
+
+    def keep_vertices(self, keep):
+        """Drop vertices where keep is False, updating ring offsets."""
+        counts = np.bincount(
+            self.vertex_ring[keep], minlength=len(self.ring_kind)
+        ).astype(np.int64)
+        self.coords = self.coords[keep]
+        self.ring_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def keep_rings(self, keep):
+        """Drop rings (and parts left without their exterior ring)."""
+        part_of_ring = np.repeat(
+            np.arange(len(self.part_rings) - 1), np.diff(self.part_rings)
+        )
+        # A part survives only if its first ring does
+        part_ok = np.zeros(len(self.part_rings) - 1, dtype=bool)
+        firsts = self.part_rings[:-1][np.diff(self.part_rings) > 0]
+        part_ok[part_of_ring[firsts]] = keep[firsts]
+        keep = keep & part_ok[part_of_ring]
+
+        self.keep_vertices(np.repeat(keep, np.diff(self.ring_offsets)))
+        self.ring_offsets = np.concatenate([[0], self.ring_offsets[1:][keep]]).astype(
+            np.int64
+        )
+        self.ring_kind = self.ring_kind[keep]
+        self.ring_outer = self.ring_outer[keep]
+
+        rings_per_part = np.bincount(part_of_ring[keep], minlength=len(part_ok)).astype(
+            np.int64
+        )
+        self.part_rings = np.concatenate([[0], np.cumsum(rings_per_part[part_ok])])
+        feature_of_part = np.repeat(
+            np.arange(len(self.feature_parts) - 1), np.diff(self.feature_parts)
+        )
+        parts_per_feature = np.bincount(
+            feature_of_part[part_ok], minlength=len(self.feature_parts) - 1
+        ).astype(np.int64)
+        self.feature_parts = np.concatenate([[0], np.cumsum(parts_per_feature)])
+
+    def geometry(self, index):
+        geom_type = self.geom_types[index]
+        parts = []
+        for p in range(self.feature_parts[index], self.feature_parts[index + 1]):
+            rings = []
+            for r in range(self.part_rings[p], self.part_rings[p + 1]):
+                ring = self.coords[self.ring_offsets[r] : self.ring_offsets[r + 1]]
+                rings.append(ring.tolist())
+            parts.append(rings)
+        if geom_type is None or not parts:
+            return None
+        if geom_type == "Point":
+            return {"type": geom_type, "coordinates": parts[0][0][0]}
+        if geom_type == "LineString":
+            return {"type": geom_type, "coordinates": parts[0][0]}
+        if geom_type == "Polygon":
+            return {"type": geom_type, "coordinates": parts[0]}
+        if geom_type == "MultiPoint":
+            return {"type": geom_type, "coordinates": [p[0][0] for p in parts]}
+        if geom_type == "MultiLineString":
+            return {"type": geom_type, "coordinates": [p[0] for p in parts]}
+        return {"type": geom_type, "coordinates": parts}
+
+
+def _ring_bounds(flat):
+    ring = flat.vertex_ring
+    first = flat.ring_offsets[:-1][ring]
+    last = flat.ring_offsets[1:][ring] - 1
+    return ring, first, last
+
+
+def remove_duplicates(flat):
+    """Consecutive duplicate vertices (same x, y) within a ring."""
+    xy = flat.coords[:, :2]
+    ring = flat.vertex_ring
+    dup = np.zeros(len(xy), dtype=bool)
+    dup[1:] = (xy[1:] == xy[:-1]).all(axis=1) & (ring[1:] == ring[:-1])
+    dup &= flat.ring_kind[ring] != POINT
+    flat.keep_vertices(~dup)
+    return int(dup.sum())
+
+
+def remove_collinear(flat, tolerance):
+    """
+    Interior vertices within `tolerance` of the segment joining their
+    neighbours. Runs of collinear vertices are thinned every other vertex per
+    pass so the reference segment never drifts further than one vertex.
+    """
+    removed = 0
+    while True:
+        xy = flat.coords[:, :2]
+        ring, first, last = _ring_bounds(flat)
+        idx = np.arange(len(xy))
+        interior = (idx > first) & (idx < last) & (flat.ring_kind[ring] != POINT)
+        cand = np.flatnonzero(interior)
+        if cand.size == 0:
+            break
+        a, p, b = xy[cand - 1], xy[cand], xy[cand + 1]
+        ab = b - a
+        ap = p - a
+        length = np.hypot(ab[:, 0], ab[:, 1])
+        cross = np.abs(ab[:, 0] * ap[:, 1] - ab[:, 1] * ap[:, 0])
+        forward = ((p - a) * (b - p)).sum(axis=1) >= 0  # not a spike
+        collinear = (cross <= tolerance * length) & forward & (length > 0)
+
+        mask = np.zeros(len(xy), dtype=bool)
+        mask[cand[collinear]] = True
+        if not mask.any():
+            break
+        # Position inside each run of consecutive collinear vertices
+        starts = mask & ~np.concatenate([[False], mask[:-1]])
+        run_id = np.cumsum(starts)
+        run_start = np.flatnonzero(starts)
+        pos = idx - run_start[np.maximum(run_id - 1, 0)]
+        drop = mask & (pos % 2 == 0)
+        if not drop.any():
+            break
+        removed += int(drop.sum())
+        flat.keep_vertices(~drop)
+    return removed
+
+
+def close_rings(flat):
+    """Append the first vertex to open polygon rings."""
+    starts = flat.ring_offsets[:-1]
+    ends = flat.ring_offsets[1:] - 1
+    nonempty = ends >= starts
+    is_open = np.zeros(len(starts), dtype=bool)
+    is_open[nonempty] = (
+        flat.coords[starts[nonempty], :2] != flat.coords[ends[nonempty], :2]
+    ).any(axis=1)
+    is_open &= flat.ring_kind == POLYGON
+    if is_open.any():
+        flat.coords = np.insert(
+            flat.coords, flat.ring_offsets[1:][is_open], flat.coords[starts[is_open]], 0
+        )
+        flat.ring_offsets = flat.ring_offsets + np.concatenate(
+            [[0], np.cumsum(is_open)]
+        )
+    return int(is_open.sum())
+
+
+def signed_areas(flat):
+    """Shoelace area of every ring (positive = counter-clockwise)."""
+    xy = flat.coords[:, :2]
+    areas = np.zeros(len(flat.ring_kind))
+    if len(xy) < 2:
+        return areas
+    ring = flat.vertex_ring
+    same = ring[1:] == ring[:-1]
+    cross = xy[:-1, 0] * xy[1:, 1] - xy[1:, 0] * xy[:-1, 1]
+    np.add.at(areas, ring[:-1][same], 0.5 * cross[same])
+    return areas
+
+
+def drop_degenerate(flat, tolerance):
+    """Polygon rings < 4 vertices or ~zero area, lines < 2 vertices."""
+    counts = np.diff(flat.ring_offsets)
+    areas = signed_areas(flat)
+    bad = (flat.ring_kind == POLYGON) & (
+        (counts < 4) | (np.abs(areas) <= tolerance * tolerance)
+    )
+    bad |= (flat.ring_kind == LINE) & (counts < 2)
+    bad |= counts == 0
+    before = len(flat.ring_kind)
+    flat.keep_rings(~bad)
+    return before - len(flat.ring_kind)
+
+
+def fix_orientation(flat):
+    """Exterior rings counter-clockwise, holes clockwise (RFC 7946)."""
+    areas = signed_areas(flat)
+    wrong = (flat.ring_kind == POLYGON) & ((areas > 0) != flat.ring_outer)
+    if not wrong.any():
+        return 0
+    ring, first, last = _ring_bounds(flat)
+    idx = np.arange(len(flat.coords))
+    order = np.where(wrong[ring], first + last - idx, idx)
+    flat.coords = flat.coords[order]
+    return int(wrong.sum())
+
+
+def default_tolerance(flat):
+    """About 1 mm: 1e-8 degree for lon/lat, 0.001 for projected metres."""
+    if flat.coords.size and np.abs(flat.coords[:, 0]).max() <= 180:
+        return 1e-8
+    return 0.001
+
+
+def clean_features(
+    features,
+    tolerance=None,
+    decimals=None,
+    drop_z=False,
+    layers=None,
+    labels_only=False,
+):
+    """Run the cleaning pipeline. Returns (cleaned features, stats)."""
+    kept = [f for f in features if keep_feature(f, layers, labels_only)]
+    flat = FlatGeometry(kept)
+    stats = {
+        "features_in": len(features),
+        "features_filtered": len(features) - len(kept),
+        "vertices_in": int(len(flat.coords)),
+    }
+    if drop_z:
+        flat.coords = flat.coords[:, :2]
+    if decimals is not None:
+        flat.coords = np.round(flat.coords, decimals)
+    if tolerance is None:
+        tolerance = default_tolerance(flat)
+
+    stats["duplicates_removed"] = remove_duplicates(flat)
+    stats["collinear_removed"] = remove_collinear(flat, tolerance)
+    stats["rings_closed"] = close_rings(flat)
+    stats["rings_dropped"] = drop_degenerate(flat, tolerance)
+    stats["rings_reoriented"] = fix_orientation(flat)
+
+    cleaned = []
+    for i, feature in enumerate(kept):
+        geometry = flat.geometry(i)
+        if geometry is None and feature.get("geometry"):
+            continue  # every part was degenerate
+        cleaned.append(
+            {
+                "type": "Feature",
+                "properties": feature.get("properties"),
+                "geometry": geometry,
+            }
+        )
+    stats["features_out"] = len(cleaned)
+    stats["features_dropped"] = len(kept) - len(cleaned)
+    stats["vertices_out"] = int(len(flat.coords))
+    stats["tolerance"] = tolerance
+    return cleaned, stats
+
+
+def cleaned_path(path):
+    """KM.geojson.backup -> KM_cleaned.geojson, HOAHAI.geojson -> HOAHAI_cleaned..."""
+    directory, name = os.path.split(path)
+    if name.endswith(".backup"):
+        name = name[: -len(".backup")]
+    stem = os.path.splitext(name)[0]
+    return os.path.join(directory, f"{stem}_cleaned.geojson")
+
+
+def clean_file(path, output=None, **options):
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    features, stats = clean_features(data.get("features", []), **options)
+
+    output = output or cleaned_path(path)
+    collection = {k: v for k, v in data.items() if k != "features"}
+    collection["features"] = features
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(collection, f, ensure_ascii=False, separators=(",", ":"))
+
+    stats.update(
+        {
+            "file": path,
+            "output": output,
+            "bytes_in": os.path.getsize(path),
+            "bytes_out": os.path.getsize(output),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+    )
+    return stats
+
+
+def _pct(before, after):
+    return 100.0 * (before - after) / before if before else 0.0
+
+
+def print_report(reports):
+    print("=" * 80)
+    print(
+        f"{'File':28} {'feat in/out':>13} {'verts in/out':>17} " f"{'size in/out':>17}"
+    )
+    print("=" * 80)
+    for r in reports:
+        print(
+            f"{os.path.basename(r['file'])[:28]:28} "
+            f"{r['features_in']:6}/{r['features_out']:<6} "
+            f"{r['vertices_in']:8}/{r['vertices_out']:<8} "
+            f"{r['bytes_in'] / 1024:7.0f}/{r['bytes_out'] / 1024:<6.0f}KB"
+        )
+        print(
+            f"  -> {r['output']}: vertices -{_pct(r['vertices_in'], r['vertices_out']):.1f}%"
+            f", size -{_pct(r['bytes_in'], r['bytes_out']):.1f}%"
+            f" | dup {r['duplicates_removed']}, collinear {r['collinear_removed']}"
+            f", closed {r['rings_closed']}, dropped {r['rings_dropped']}"
+            f", reoriented {r['rings_reoriented']}"
+        )
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean GeoJSON geometry")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("--output", help="output file (single input only)")
+    parser.add_argument(
+        "--tolerance", type=float, help="collinear/zero-area tolerance (CRS units)"
+    )
+    parser.add_argument("--decimals", type=int, help="round coordinates")
+    parser.add_argument("--drop-z", action="store_true")
+    parser.add_argument("--layers", nargs="+", help="keep only these layers")
+    parser.add_argument(
+        "--labels-only",
+        action="store_true",
+        help="keep only 'Tổ N' / 'Chi bộ ...' text features",
+    )
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args()
+    if args.output and len(args.inputs) > 1:
+        parser.error("--output needs a single input file")
+
+    options = {
+        "tolerance": args.tolerance,
+        "decimals": args.decimals,
+        "drop_z": args.drop_z,
+        "layers": set(args.layers) if args.layers else None,
+        "labels_only": args.labels_only,
+    }
+    reports = [clean_file(path, args.output, **options) for path in args.inputs]
+    print_report(reports)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"Report saved to: {args.report}")
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
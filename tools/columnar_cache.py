@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Memory-mappable columnar cache of a (CAD) GeoJSON file.
+
+Parse GeoJSON một lần, ghi ra thư mục cache theo hash nội dung file nguồn:
+  xy.npy              float64 (N, 2)   toạ độ mọi đỉnh
+  geom_type.npy       int8    (F,)     mã kiểu geometry (GEOM_TYPES)
+  feature_parts.npy   int64   (F+1,)   offset feature -> part
+  part_rings.npy      int64   (P+1,)   offset part -> ring
+  ring_vertices.npy   int64   (R+1,)   offset ring -> đỉnh
+  <col>_codes.npy     int32   (F,)     cột dictionary-encoded (Layer, Text, ...)
+  <col>_dict.json                      bảng từ điển của cột (-1 = không có khoá)
+  properties.jsonl + properties_offsets.npy   properties còn lại, đọc lười
+  manifest.json
+
+Loader dùng np.load(mmap_mode="r"): mở cache mất vài mili giây, các tool thao
+tác trực tiếp trên mảng.
+
+Usage:
+    python tools/columnar_cache.py assets/maps/nhs.geojson
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from array import array
+
+import numpy as np
+
+from geojson_stream import iter_features
+
+CACHE_ROOT = os.path.join(os.path.dirname(__file__), ".geojson_cache")
+CACHE_VERSION = 1
+DICT_COLUMNS = ("Layer", "Text", "Text_utf8")
+
+# Geometry type codes; every geometry is stored as parts -> rings -> vertices
+GEOM_TYPES = {
+    None: 0,
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+GEOM_NAMES = {code: name for name, code in GEOM_TYPES.items()}
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_dir_for(path, cache_root=CACHE_ROOT, digest=None):
+    digest = digest or file_hash(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_root, f"{name}-{digest[:16]}")
+
+
+def geometry_parts(geom):
+    """Split a geometry into parts, each a list of rings (lists of [x, y, ...])."""
+    geom_type = geom.get("type")
+    coords = geom.get("coordinates")
+    if not coords:
+        return []
+    if geom_type == "Point":
+        return [[[coords]]]
+    if geom_type == "LineString":
+        return [[coords]]
+    if geom_type == "Polygon":
+        return [coords]
+    if geom_type == "MultiPoint":
+        return [[[point]] for point in coords]
+    if geom_type == "MultiLineString":
+        return [[line] for line in coords]
+    if geom_type == "MultiPolygon":
+        return coords
+    return []
+
+
+_MISSING = object()
+
+
+class _Dictionary:
+    def __init__(self):
+        self.values = []
+        self.index = {}
+        self.codes = array("i")
+
+    def add(self, value):
+        if value is _MISSING:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+def build_cache(path, cache_root=CACHE_ROOT, force=False):
+    """Write the columnar cache for `path` (skipped if already built). Returns its dir."""
+    digest = file_hash(path)
+    out_dir = cache_dir_for(path, cache_root, digest)
+    manifest_file = os.path.join(out_dir, "manifest.json")
+    if not force and os.path.exists(manifest_file):
+        return out_dir
+    os.makedirs(out_dir, exist_ok=True)
+
+    xy = array("d")
+    geom_type = array("b")
+    feature_parts = array("q", [0])
+    part_rings = array("q", [0])
+    ring_vertices = array("q", [0])
+    columns = {name: _Dictionary() for name in DICT_COLUMNS}
+    prop_offsets = array("q", [0])
+    unsupported = 0
+
+    with open(os.path.join(out_dir, "properties.jsonl"), "wb") as props_file:
+        for feature in iter_features(path):
+            geom = feature.get("geometry") or {}
+            code = GEOM_TYPES.get(geom.get("type"))
+            if code is None:
+                unsupported += 1
+                code = 0
+            geom_type.append(code)
+
+            parts = geometry_parts(geom) if code else []
+            for part in parts:
+                for ring in part:
+                    for coord in ring:
+                        xy.append(coord[0])
+                        xy.append(coord[1])
+                    ring_vertices.append(len(xy) // 2)
+                part_rings.append(len(ring_vertices) - 1)
+            feature_parts.append(len(part_rings) - 1)
+
+            props = dict(feature.get("properties") or {})
+            for name, column in columns.items():
+                column.add(props.pop(name, _MISSING))
+            line = json.dumps(props, ensure_ascii=False).encode("utf-8") + b"\n"
+            props_file.write(line)
+            prop_offsets.append(prop_offsets[-1] + len(line))
+
+    def save(name, data, dtype):
+        np.save(os.path.join(out_dir, name), np.frombuffer(data, dtype=dtype))
+
+    np.save(
+        os.path.join(out_dir, "xy.npy"),
+        np.frombuffer(xy, dtype=np.float64).reshape(-1, 2),
+    )
+    save("geom_type.npy", geom_type, np.int8)
+    save("feature_parts.npy", feature_parts, np.int64)
+    save("part_rings.npy", part_rings, np.int64)
+    save("ring_vertices.npy", ring_vertices, np.int64)
+    save("properties_offsets.npy", prop_offsets, np.int64)
+    for name, column in columns.items():
+        save(f"{name}_codes.npy", column.codes, np.int32)
+        with open(
+            os.path.join(out_dir, f"{name}_dict.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(column.values, f, ensure_ascii=False)
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(path),
+        "sha256": digest,
+        "features": len(geom_type),
+        "parts": len(part_rings) - 1,
+        "rings": len(ring_vertices) - 1,
+        "vertices": len(xy) // 2,
+        "unsupported_geometries": unsupported,
+        "dict_columns": list(DICT_COLUMNS),
+    }
+    # Manifest last: its presence marks a complete cache
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+class ColumnarCache:
+    """Read-only, memory-mapped view of a columnar cache directory."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != CACHE_VERSION:
+            raise ValueError(f"Unsupported cache version in {cache_dir}")
+
+        self.xy = self._load("xy.npy")
+        self.geom_type = self._load("geom_type.npy")
+        self.feature_parts = self._load("feature_parts.npy")
+        self.part_rings = self._load("part_rings.npy")
+        self.ring_vertices = self._load("ring_vertices.npy")
+        self.properties_offsets = self._load("properties_offsets.npy")
+        self.codes = {}
+        self.dictionaries = {}
+        for name in self.manifest["dict_columns"]:
+            self.codes[name] = self._load(f"{name}_codes.npy")
+            with open(
+                os.path.join(cache_dir, f"{name}_dict.json"), encoding="utf-8"
+            ) as f:
+                self.dictionaries[name] = json.load(f)
+        self._props = None
+
+    def _load(self, name):
+        return np.load(os.path.join(self.cache_dir, name), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.geom_type)
+
+    def vertex_counts(self):
+        """Number of vertices per feature."""
+        starts = self.ring_vertices[self.part_rings[self.feature_parts]]
+        return np.diff(starts)
+
+    def vertex_owner(self):
+        """Feature index of every vertex."""
+        return np.repeat(np.arange(len(self)), self.vertex_counts())
+
+    def column(self, name, index, default=None):
+        code = int(self.codes[name][index])
+        return default if code < 0 else self.dictionaries[name][code]
+
+    def properties(self, index):
+        """Full properties dict of feature `index` (decoded lazily)."""
+        if self._props is None:
+            path = os.path.join(self.cache_dir, "properties.jsonl")
+            if self.properties_offsets[-1]:
+                self._props = np.memmap(path, mode="r")
+            else:
+                self._props = np.zeros(0, dtype=np.uint8)
+        start, end = self.properties_offsets[index], self.properties_offsets[index + 1]
+        props = json.loads(bytes(self._props[start:end]))
+        for name in self.dictionaries:
+            value = self.column(name, index, _MISSING)
+            if value is not _MISSING:
+                props[name] = value
+        return props
+
+    def geometry(self, index):
+        """Rebuild the GeoJSON geometry of feature `index`."""
+        code = int(self.geom_type[index])
+        if code == 0:
+            return None
+        parts = []
+        for p in range(self.feature_parts[index], self.feature_parts[index + 1]):
+            rings = []
+            for r in range(self.part_rings[p], self.part_rings[p + 1]):
+                start, end = self.ring_vertices[r], self.ring_vertices[r + 1]
+                rings.append(self.xy[start:end].tolist())
+            parts.append(rings)
+        name = GEOM_NAMES[code]
+        if not parts:  # valid empty geometry, e.g. "coordinates": []
+            return {"type": name, "coordinates": []}
+        if name == "Point":
+            coords = parts[0][0][0]
+        elif name == "LineString":
+            coords = parts[0][0]
+        elif name == "Polygon":
+            coords = parts[0]
+        elif name == "MultiPoint":
+            coords = [part[0][0] for part in parts]
+        elif name == "MultiLineString":
+            coords = [part[0] for part in parts]
+        else:
+            coords = parts
+        return {"type": name, "coordinates": coords}
+
+    def feature(self, index):
+        return {
+            "type": "Feature",
+            "properties": self.properties(index),
+            "geometry": self.geometry(index),
+        }
+
+    def iter_features(self):
+        for i in range(len(self)):
+            yield self.feature(i)
+
+
+def open_cache(path, cache_root=CACHE_ROOT):
+    """Open the cache for a GeoJSON source file, building it if needed."""
+    return ColumnarCache(build_cache(path, cache_root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build columnar GeoJSON cache")
+    parser.add_argument("input_file")
+    parser.add_argument("--cache-root", default=CACHE_ROOT)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cache_dir = build_cache(args.input_file, args.cache_root, args.force)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cache = ColumnarCache(cache_dir)
+    opened = time.perf_counter() - start
+
+    manifest = cache.manifest
+    print(f"Cache:    {cache_dir}")
+    print(f"Features: {manifest['features']:,}")
+    print(f"Vertices: {manifest['vertices']:,}")
+    print(f"Layers:   {len(cache.dictionaries['Layer']):,}")
+    print(f"Build:    {built:.2f}s   Open: {opened * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+
+from columnar_cache import ColumnarCache, build_cache
+
+
+def feature(geometry, **properties):
+    return {"type": "Feature", "properties": properties, "geometry": geometry}
+
+
+class TestColumnarCache(unittest.TestCase):
+    def build(self, features):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "layer.geojson")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f)
+        return ColumnarCache(build_cache(path, os.path.join(tmp.name, "cache")))
+
+    def test_round_trip(self):
+        geometries = [
+            {"type": "Point", "coordinates": [1.0, 2.0]},
+            {"type": "LineString", "coordinates": [[0.0, 0.0], [1.0, 1.0]]},
+            {
+                "type": "MultiPolygon",
+                "coordinates": [[[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]]],
+            },
+            None,
+        ]
+        cache = self.build([feature(g, name=str(i)) for i, g in enumerate(geometries)])
+        self.assertEqual([cache.geometry(i) for i in range(len(cache))], geometries)
+        self.assertEqual(cache.properties(1), {"name": "1"})
+
+    def test_empty_geometries(self):
+        geometries = [
+            {"type": "LineString", "coordinates": []},
+            {"type": "Point", "coordinates": []},
+            {"type": "MultiPolygon", "coordinates": []},
+            {"type": "LineString", "coordinates": [[0.0, 0.0], [1.0, 1.0]]},
+        ]
+        cache = self.build([feature(g) for g in geometries])
+        self.assertEqual([cache.geometry(i) for i in range(len(cache))], geometries)
+        self.assertEqual(cache.vertex_counts().tolist(), [0, 0, 0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
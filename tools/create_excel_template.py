@@ -1,29 +1,53 @@
 #!/usr/bin/env python3
-"""Create Excel template for administrative units data entry."""
+"""
+Create the Excel template for administrative units data entry.
+
+Workbook "Chi bộ" / "Tổ dân phố" / "Hướng dẫn", điền sẵn mọi chi bộ và tổ dân
+phố đang có trên bản đồ:
+  - tổ: ranh giới trong 260to.geojson (ToDP / ChiBo), toạ độ trung tâm là điểm
+    polylabel tính trong VN-2000 (luôn nằm trong polygon)
+  - chi bộ / lãnh đạo / số điện thoại: nhãn text CAD trong các file phường
+    (HOAHAI, HOAQUY, KM, MYAN); chi bộ lấy trung tâm = trung bình các tổ
+Cột "Chi bộ" của sheet tổ và cột màu có dropdown (data validation).
+
+Workbook được ghi ở chế độ openpyxl write_only (stream từng dòng, style dùng
+chung qua NamedStyle) nên vẫn nhanh và ít RAM khi có hàng chục nghìn dòng.
+
+Usage:
+    python tools/create_excel_template.py
+    python tools/create_excel_template.py --empty --output template_empty.xlsx
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
 
 try:
-    import pandas as pd
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    from openpyxl.utils.dataframe import dataframe_to_rows
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.worksheet.datavalidation import DataValidation
 except ImportError:
-    print("Installing required packages...")
-    import subprocess
-
-    subprocess.check_call(["pip", "install", "pandas", "openpyxl"])
-    import pandas as pd
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
+    print("❌ openpyxl not found. Install with: pip install openpyxl")
+    sys.exit(1)
 
-# Create workbook
-wb = Workbook()
+from label_anchors import compute_anchors
+from label_join import CHI_BO_PATTERN, classify, clean_text
 
-# Sheet 1: Chi bộ
-ws_cb = wb.active
-ws_cb.title = "Chi bộ"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLYGON_FILE = os.path.join(ROOT, "assets", "maps", "260to.geojson")
+LABEL_FILES = [
+    os.path.join(ROOT, "assets", "maps", f"{ward}.geojson")
+    for ward in ("HOAHAI", "HOAQUY", "KM", "MYAN")
+]
 
-# Headers
-headers_cb = [
+CHI_BO_HEADERS = [
     "STT",
     "Tên chi bộ",
     "Mô tả",
@@ -33,63 +57,9 @@ headers_cb = [
     "Số thành viên",
     "Màu hiển thị",
 ]
+CHI_BO_WIDTHS = {"B": 25, "C": 45, "D": 25, "E": 25, "F": 15, "H": 15}
 
-# Add headers with style
-for col, header in enumerate(headers_cb, 1):
-    cell = ws_cb.cell(row=1, column=col, value=header)
-    cell.font = Font(bold=True, color="FFFFFF")
-    cell.fill = PatternFill(start_color="2196F3", end_color="2196F3", fill_type="solid")
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-
-# Add example data
-example_cb = [
-    [
-        1,
-        "Chi bộ Khuê Đông",
-        "Chi bộ Khuê Đông - Phường Ngũ Hành Sơn",
-        "16.0530,108.2020",
-        "Nguyễn Văn A",
-        "0123456789",
-        150,
-        "#2196F3",
-    ],
-    [
-        2,
-        "CB 1A",
-        "Chi bộ 1A - Khu vực A",
-        "16.0540,108.2030",
-        "Trần Thị B",
-        "0987654321",
-        120,
-        "#1976D2",
-    ],
-    [
-        3,
-        "CB 2A",
-        "Chi bộ 2A - Khu vực B",
-        "16.0520,108.2040",
-        "Lê Văn C",
-        "0912345678",
-        100,
-        "#1565C0",
-    ],
-]
-
-for row_data in example_cb:
-    ws_cb.append(row_data)
-
-# Adjust column widths
-ws_cb.column_dimensions["B"].width = 25
-ws_cb.column_dimensions["C"].width = 35
-ws_cb.column_dimensions["D"].width = 25
-ws_cb.column_dimensions["E"].width = 20
-ws_cb.column_dimensions["F"].width = 15
-ws_cb.column_dimensions["I"].width = 15
-
-# Sheet 2: Tổ dân phố
-ws_tdp = wb.create_sheet("Tổ dân phố")
-
-headers_tdp = [
+TO_HEADERS = [
     "STT",
     "Tên tổ",
     "Chi bộ",
@@ -100,144 +70,377 @@ headers_tdp = [
     "Số hộ dân",
     "Màu hiển thị",
 ]
+TO_WIDTHS = {"B": 12, "C": 25, "D": 45, "E": 25, "F": 25, "G": 15, "I": 15}
 
-# Add headers
-for col, header in enumerate(headers_tdp, 1):
-    cell = ws_tdp.cell(row=1, column=col, value=header)
-    cell.font = Font(bold=True, color="FFFFFF")
-    cell.fill = PatternFill(start_color="FF9800", end_color="FF9800", fill_type="solid")
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-
-# Add example data
-example_tdp = [
-    [
-        1,
-        "Tổ 230",
-        "Chi bộ Khuê Đông",
-        "Tổ dân phố 230",
-        "16.0535,108.2025",
-        "Phạm Văn D",
-        "0901234567",
-        50,
-        "#FF9800",
-    ],
-    [
-        2,
-        "Tổ 259",
-        "Chi bộ Khuê Đông",
-        "Tổ dân phố 259",
-        "16.0545,108.2035",
-        "Hoàng Thị E",
-        "0923456789",
-        45,
-        "#F57C00",
-    ],
-    [
-        3,
-        "Tổ 258",
-        "Chi bộ Khuê Đông",
-        "Tổ dân phố 258",
-        "16.0525,108.2015",
-        "Ngô Văn F",
-        "0934567890",
-        40,
-        "#E65100",
-    ],
-    [
-        4,
-        "Tổ 66",
-        "CB 1A",
-        "Tổ dân phố 66",
-        "16.0555,108.2045",
-        "Đặng Thị G",
-        "0945678901",
-        35,
-        "#EF6C00",
-    ],
+CHI_BO_COLORS = ["#2196F3", "#1976D2", "#1565C0", "#0D47A1"]
+TO_COLORS = ["#FF9800", "#F57C00", "#E65100", "#EF6C00"]
+PALETTE = [
+    "#2196F3",
+    "#1976D2",
+    "#1565C0",
+    "#FF9800",
+    "#F57C00",
+    "#E65100",
+    "#4CAF50",
+    "#388E3C",
+    "#2E7D32",
+    "#F44336",
+    "#D32F2F",
+    "#C62828",
+    "#9C27B0",
+    "#7B1FA2",
+    "#6A1B9A",
 ]
 
-for row_data in example_tdp:
-    ws_tdp.append(row_data)
-
-# Adjust column widths
-ws_tdp.column_dimensions["B"].width = 20
-ws_tdp.column_dimensions["C"].width = 25
-ws_tdp.column_dimensions["D"].width = 30
-ws_tdp.column_dimensions["E"].width = 25
-ws_tdp.column_dimensions["F"].width = 20
-ws_tdp.column_dimensions["G"].width = 15
-ws_tdp.column_dimensions["J"].width = 15
-
-# Sheet 3: Hướng dẫn
-ws_guide = wb.create_sheet("Hướng dẫn")
-
-guide_text = [
-    ["HƯỚNG DẪN NHẬP LIỆU"],
-    [""],
-    ["1. NHẬP THÔNG TIN CHI BỘ (Sheet 'Chi bộ'):"],
-    ["   - STT: Số thứ tự tự động"],
-    ["   - Tên chi bộ: Tên đầy đủ của chi bộ"],
-    ["   - Mô tả: Mô tả chi tiết về chi bộ"],
-    ["   - Tọa độ: Định dạng 'latitude,longitude' (VD: 16.0530,108.2020)"],
-    ["   - Lãnh đạo: Họ tên lãnh đạo chi bộ"],
-    ["   - Số điện thoại: Số điện thoại liên lạc"],
-    ["   - Số thành viên: Tổng số đảng viên trong chi bộ"],
-    ["   - Màu hiển thị: Mã màu hex (VD: #2196F3 - xanh dương)"],
-    [""],
-    ["2. NHẬP THÔNG TIN TỔ DÂN PHỐ (Sheet 'Tổ dân phố'):"],
-    ["   - STT: Số thứ tự tự động"],
-    ["   - Tên tổ: Tên tổ dân phố (VD: Tổ 230)"],
-    ["   - Chi bộ: Tên chi bộ quản lý (phải trùng với tên trong sheet Chi bộ)"],
-    ["   - Mô tả: Mô tả về khu vực"],
-    ["   - Tọa độ: Định dạng 'latitude,longitude'"],
-    ["   - Lãnh đạo: Họ tên tổ trưởng"],
-    ["   - Số điện thoại: Số điện thoại liên lạc"],
-    ["   - Số hộ dân: Số hộ gia đình trong tổ"],
-    ["   - Màu hiển thị: Mã màu hex (VD: #FF9800 - cam)"],
-    [""],
-    ["3. LẤY TỌA ĐỘ:"],
-    ["   - Mở Google Maps: https://maps.google.com"],
-    ["   - Click chuột phải vào vị trí → Copy coordinates"],
-    ["   - Paste vào cột 'Tọa độ trung tâm'"],
-    ["   - Hoặc nhìn từ AutoCAD và ước lượng vị trí"],
-    [""],
-    ["4. MÃ MÀU GỢI Ý:"],
-    ["   - Xanh dương: #2196F3, #1976D2, #1565C0"],
-    ["   - Cam: #FF9800, #F57C00, #E65100"],
-    ["   - Xanh lá: #4CAF50, #388E3C, #2E7D32"],
-    ["   - Đỏ: #F44336, #D32F2F, #C62828"],
-    ["   - Tím: #9C27B0, #7B1FA2, #6A1B9A"],
-    [""],
-    ["5. SAU KHI NHẬP XONG:"],
-    ["   - Lưu file Excel"],
-    ["   - Chạy script: node scripts/upload_excel_to_firebase.js"],
-    ["   - Script sẽ tự động import vào Firebase Firestore"],
-    [""],
-    ["6. LƯU Ý:"],
-    ["   - Không xóa dòng tiêu đề (dòng 1)"],
-    ["   - Không thay đổi tên các cột"],
-    ["   - Tọa độ phải nằm trong phạm vi Đà Nẵng (~16.0°N, 108.2°E)"],
-    ["   - Tên chi bộ phải khớp giữa 2 sheet"],
+# Rows kept open for manual entry below the prefilled data
+SPARE_ROWS = 500
+
+GUIDE_TEXT = [
+    "HƯỚNG DẪN NHẬP LIỆU",
+    "",
+    "1. NHẬP THÔNG TIN CHI BỘ (Sheet 'Chi bộ'):",
+    "   - STT: Số thứ tự tự động",
+    "   - Tên chi bộ: Tên đầy đủ của chi bộ",
+    "   - Mô tả: Mô tả chi tiết về chi bộ",
+    "   - Tọa độ: Định dạng 'latitude,longitude' (VD: 16.0530,108.2020)",
+    "   - Lãnh đạo: Họ tên lãnh đạo chi bộ",
+    "   - Số điện thoại: Số điện thoại liên lạc",
+    "   - Số thành viên: Tổng số đảng viên trong chi bộ",
+    "   - Màu hiển thị: Mã màu hex (VD: #2196F3 - xanh dương)",
+    "",
+    "2. NHẬP THÔNG TIN TỔ DÂN PHỐ (Sheet 'Tổ dân phố'):",
+    "   - STT: Số thứ tự tự động",
+    "   - Tên tổ: Tên tổ dân phố (VD: Tổ 230)",
+    "   - Chi bộ: Chọn từ danh sách (lấy từ sheet Chi bộ)",
+    "   - Mô tả: Mô tả về khu vực",
+    "   - Tọa độ: Định dạng 'latitude,longitude'",
+    "   - Lãnh đạo: Họ tên tổ trưởng",
+    "   - Số điện thoại: Số điện thoại liên lạc",
+    "   - Số hộ dân: Số hộ gia đình trong tổ",
+    "   - Màu hiển thị: Mã màu hex (VD: #FF9800 - cam)",
+    "",
+    "3. LẤY TỌA ĐỘ:",
+    "   - Các dòng có sẵn đã được tính từ bản đồ (điểm nằm trong ranh giới tổ)",
+    "   - Mở Google Maps: https://maps.google.com",
+    "   - Click chuột phải vào vị trí → Copy coordinates",
+    "   - Paste vào cột 'Tọa độ trung tâm'",
+    "",
+    "4. MÃ MÀU GỢI Ý:",
+    "   - Xanh dương: #2196F3, #1976D2, #1565C0",
+    "   - Cam: #FF9800, #F57C00, #E65100",
+    "   - Xanh lá: #4CAF50, #388E3C, #2E7D32",
+    "   - Đỏ: #F44336, #D32F2F, #C62828",
+    "   - Tím: #9C27B0, #7B1FA2, #6A1B9A",
+    "",
+    "5. SAU KHI NHẬP XONG:",
+    "   - Lưu file Excel",
+    "   - Chạy script: node scripts/upload_excel_to_firebase.js",
+    "   - Script sẽ tự động import vào Firebase Firestore",
+    "",
+    "6. LƯU Ý:",
+    "   - Không xóa dòng tiêu đề (dòng 1)",
+    "   - Không thay đổi tên các cột",
+    "   - Tọa độ phải nằm trong phạm vi Đà Nẵng (~16.0°N, 108.2°E)",
+    "   - Tên chi bộ phải khớp giữa 2 sheet",
 ]
 
-for row_idx, row_data in enumerate(guide_text, 1):
-    cell = ws_guide.cell(row=row_idx, column=1, value=row_data[0])
-    if row_idx == 1:
-        cell.font = Font(bold=True, size=14, color="FFFFFF")
-        cell.fill = PatternFill(
-            start_color="4CAF50", end_color="4CAF50", fill_type="solid"
-        )
-    elif ":" in str(row_data[0]) and row_data[0][0].isdigit():
-        cell.font = Font(bold=True, size=12)
-
-ws_guide.column_dimensions["A"].width = 80
-
-# Save file
-output_file = "tools/template_admin_units.xlsx"
-wb.save(output_file)
-
-print(f"✅ Excel template created: {output_file}")
-print("\nNext steps:")
-print("1. Open the Excel file and fill in your data")
-print("2. Save the file as: assets/admin_units_data.xlsx")
-print("3. Run: python tools/import_excel_to_firebase.py")
+# "Bí thư: Name - 0905..." / "Bí thư chi bộ: Name 0905..."
+PERSON_PATTERN = re.compile(r"^\s*(.*?)\s*[-–]?\s*(0[\d .]{8,})?\s*$")
+SECRETARY_PATTERN = re.compile(r"^\s*Bí thư(?: chi bộ)?\s*:\s*(.*)$", re.I)
+LEADER_PATTERN = re.compile(r"^\s*Tổ trưởng(?: tổ)?(?: số)?\s*(\d*)\s*:\s*(.*)$", re.I)
+
+
+def register_styles(workbook):
+    """Header/title styles shared by every cell instead of per-cell fonts."""
+    centered = Alignment(horizontal="center", vertical="center")
+    for name, color in (("header_chi_bo", "2196F3"), ("header_to", "FF9800")):
+        style = NamedStyle(name=name)
+        style.font = Font(bold=True, color="FFFFFF")
+        style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        style.alignment = centered
+        workbook.add_named_style(style)
+
+    title = NamedStyle(name="guide_title")
+    title.font = Font(bold=True, size=14, color="FFFFFF")
+    title.fill = PatternFill(
+        start_color="4CAF50", end_color="4CAF50", fill_type="solid"
+    )
+    workbook.add_named_style(title)
+
+    section = NamedStyle(name="guide_section")
+    section.font = Font(bold=True, size=12)
+    workbook.add_named_style(section)
+
+
+def styled(sheet, value, style):
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.style = style
+    return cell
+
+
+def chi_bo_key(name):
+    """'Chi bộ 02 An Thượng' and 'Chi bộ 2  An Thượng' name the same unit."""
+    name = " ".join(str(name).split())
+    m = CHI_BO_PATTERN.match(name)
+    if m:
+        name = f"Chi bộ {m.group(2)}".strip()
+    return re.sub(r"^Chi bộ 0+(?=\d)", "Chi bộ ", name).casefold()
+
+
+def to_number(name):
+    m = re.search(r"\d+", name)
+    return int(m.group()) if m else sys.maxsize
+
+
+def parse_person(text):
+    """'Name - 0905 123 456' -> (name, phone)."""
+    m = PERSON_PATTERN.match(text)
+    name, phone = m.group(1).strip(" -"), (m.group(2) or "").replace(" ", "")
+    return name, phone.replace(".", "")
+
+
+def parse_chi_bo_text(text):
+    """Leaders listed on a multi-line chi bộ label."""
+    info = {"secretary": None, "manager": None, "leaders": {}}
+    for line in text.split("\n")[1:]:
+        m = SECRETARY_PATTERN.match(line)
+        if m:
+            info["secretary"] = parse_person(m.group(1))
+            continue
+        m = LEADER_PATTERN.match(line)
+        if m:
+            info["leaders"][m.group(1) or None] = parse_person(m.group(2))
+            continue
+        if line.lower().startswith("cán bộ phụ trách"):
+            info["manager"] = line.strip()
+    return info
+
+
+def collect_units(polygon_file=POLYGON_FILE, label_files=LABEL_FILES):
+    """Return (chi bộ dict, tổ dict) keyed by normalised name."""
+    with open(polygon_file, "r", encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+
+    tos = {}
+    chi_bos = {}
+
+    def chi_bo(name):
+        key = chi_bo_key(name)
+        if key not in chi_bos:
+            label = " ".join(str(name).split())
+            chi_bos[key] = {"name": label, "centre": None, "secretary": None}
+            chi_bos[key].update(description="", members=set(), leaders={})
+        return chi_bos[key]
+
+    def to(name):
+        if name not in tos:
+            tos[name] = {"name": name, "chi_bo": None, "centre": None, "leader": None}
+        return tos[name]
+
+    # Boundaries: the chi bộ most of a tổ's lines are tagged with (a few CAD
+    # entities carry pasted-twice names such as "Chi bộ X 2Chi bộ X 2")
+    votes = defaultdict(Counter)
+
+    vertices = defaultdict(list)
+    for feature in features:
+        props = feature.get("properties") or {}
+        kind, name = classify(str(props.get("ToDP") or ""))
+        if kind != "ToDP":
+            continue
+        unit = to(name)
+        if props.get("ChiBo"):
+            votes[name][" ".join(str(props["ChiBo"]).split())] += 1
+        geom = feature.get("geometry") or {}
+        if geom.get("type") in ("LineString", "MultiLineString"):
+            coords = np.asarray(geom["coordinates"], dtype=np.float64)
+            vertices[name].append(coords.reshape(-1, coords.shape[-1])[:, :2])
+    for name, counter in votes.items():
+        tos[name]["chi_bo"] = chi_bo(counter.most_common(1)[0][0])["name"]
+    # Centre inside the polygon, or the vertex mean of open boundary lines
+    for anchor in compute_anchors(features):
+        kind, name = classify(str(anchor["ToDP"] or ""))
+        if kind == "ToDP" and tos[name]["centre"] is None:
+            tos[name]["centre"] = (anchor["lat"], anchor["lon"])
+    for name, parts in vertices.items():
+        if tos[name]["centre"] is None:
+            lon, lat = np.concatenate(parts).mean(axis=0)
+            tos[name]["centre"] = (float(lat), float(lon))
+
+    # Ward text labels: chi bộ leaders and tổ trưởng
+    for path in label_files:
+        with open(path, "r", encoding="utf-8") as f:
+            points = json.load(f).get("features", [])
+        for feature in points:
+            text = (feature.get("properties") or {}).get("Text_utf8") or ""
+            coords = (feature.get("geometry") or {}).get("coordinates")
+            kind, name = classify(clean_text(text))
+            if kind == "ToDP":
+                unit = to(name)
+                if unit["centre"] is None and coords:
+                    unit["centre"] = (coords[1], coords[0])
+            elif kind == "ChiBo":
+                unit = chi_bo(name)
+                info = parse_chi_bo_text(text)
+                unit["secretary"] = unit["secretary"] or info["secretary"]
+                unit["description"] = unit["description"] or info["manager"] or ""
+                unit["label_point"] = (coords[1], coords[0]) if coords else None
+                unit["leaders"].update(info["leaders"])
+
+    for unit in tos.values():
+        if unit["chi_bo"]:
+            chi_bos[chi_bo_key(unit["chi_bo"])]["members"].add(unit["name"])
+    for unit in chi_bos.values():
+        members = sorted(unit["members"], key=to_number)
+        for number, person in unit["leaders"].items():
+            if number is None and len(members) == 1:
+                tos[members[0]]["leader"] = person  # "Tổ trưởng:" of a one-tổ chi bộ
+            elif number is not None:
+                target = to(f"Tổ {int(number)}")
+                target["leader"] = person
+                if target["chi_bo"] is None:
+                    target["chi_bo"] = unit["name"]
+                    unit["members"].add(target["name"])
+        centres = [tos[m]["centre"] for m in unit["members"] if tos[m]["centre"]]
+        if centres:
+            unit["centre"] = tuple(np.mean(centres, axis=0).tolist())
+        else:
+            unit["centre"] = unit.get("label_point")
+    return chi_bos, tos
+
+
+def format_centre(centre):
+    return f"{centre[0]:.6f},{centre[1]:.6f}" if centre else ""
+
+
+def chi_bo_rows(chi_bos):
+    units = sorted(chi_bos.values(), key=lambda u: (to_number(u["name"]), u["name"]))
+    for i, unit in enumerate(units):
+        name, phone = unit["secretary"] or ("", "")
+        yield [
+            i + 1,
+            unit["name"],
+            unit["description"],
+            format_centre(unit["centre"]),
+            name,
+            phone,
+            None,
+            CHI_BO_COLORS[i % len(CHI_BO_COLORS)],
+        ]
+
+
+def to_rows(tos):
+    units = sorted(tos.values(), key=lambda u: (to_number(u["name"]), u["name"]))
+    for i, unit in enumerate(units):
+        name, phone = unit["leader"] or ("", "")
+        yield [
+            i + 1,
+            unit["name"],
+            unit["chi_bo"] or "",
+            f"Tổ dân phố {unit['name'].split(' ', 1)[-1]}",
+            format_centre(unit["centre"]),
+            name,
+            phone,
+            None,
+            TO_COLORS[i % len(TO_COLORS)],
+        ]
+
+
+def list_validation(formula, cells):
+    validation = DataValidation(type="list", formula1=formula, allow_blank=True)
+    validation.add(cells)
+    return validation
+
+
+def write_sheet(workbook, title, headers, widths, style, rows):
+    """Stream one data sheet; returns the number of data rows written."""
+    sheet = workbook.create_sheet(title)
+    for column, width in widths.items():
+        sheet.column_dimensions[column].width = width
+    sheet.freeze_panes = "A2"
+    sheet.append([styled(sheet, header, style) for header in headers])
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    return sheet, count
+
+
+def write_workbook(path, chi_bos, tos):
+    workbook = Workbook(write_only=True)
+    register_styles(workbook)
+
+    # Validations must be attached before the sheet is saved, so the ranges are
+    # computed from the row counts up front.
+    last_chi_bo = len(chi_bos) + SPARE_ROWS + 1
+    last_to = len(tos) + SPARE_ROWS + 1
+    palette = '"' + ",".join(PALETTE) + '"'
+
+    sheet, chi_bo_count = write_sheet(
+        workbook,
+        "Chi bộ",
+        CHI_BO_HEADERS,
+        CHI_BO_WIDTHS,
+        "header_chi_bo",
+        chi_bo_rows(chi_bos),
+    )
+    sheet.data_validations.append(list_validation(palette, f"H2:H{last_chi_bo}"))
+
+    sheet, to_count = write_sheet(
+        workbook,
+        "Tổ dân phố",
+        TO_HEADERS,
+        TO_WIDTHS,
+        "header_to",
+        to_rows(tos),
+    )
+    sheet.data_validations.append(
+        list_validation(f"'Chi bộ'!$B$2:$B${last_chi_bo}", f"C2:C{last_to}")
+    )
+    sheet.data_validations.append(list_validation(palette, f"I2:I{last_to}"))
+
+    guide = workbook.create_sheet("Hướng dẫn")
+    guide.column_dimensions["A"].width = 80
+    for i, line in enumerate(GUIDE_TEXT):
+        if i == 0:
+            guide.append([styled(guide, line, "guide_title")])
+        elif line[:1].isdigit() and ":" in line:
+            guide.append([styled(guide, line, "guide_section")])
+        else:
+            guide.append([line])
+
+    workbook.save(path)
+    return chi_bo_count, to_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the admin units workbook")
+    parser.add_argument(
+        "--output", default=os.path.join(ROOT, "tools", "template_admin_units.xlsx")
+    )
+    parser.add_argument("--polygons", default=POLYGON_FILE)
+    parser.add_argument("--labels", nargs="*", default=LABEL_FILES)
+    parser.add_argument(
+        "--empty", action="store_true", help="headers and dropdowns only, no data"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.empty:
+        chi_bos, tos = {}, {}
+    else:
+        chi_bos, tos = collect_units(args.polygons, args.labels)
+    chi_bo_count, to_count = write_workbook(args.output, chi_bos, tos)
+
+    located = sum(1 for unit in tos.values() if unit["centre"])
+    print(f"✅ Excel template created: {args.output}")
+    print(f"   Chi bộ:      {chi_bo_count:,}")
+    print(f"   Tổ dân phố:  {to_count:,} ({located:,} with centre coordinates)")
+    print(f"   Done in {time.perf_counter() - start:.2f}s")
+    print("\nNext steps:")
+    print("1. Open the Excel file and check / complete the data")
+    print("2. Save the file as: assets/admin_units_data.xlsx")
+    print("3. Run: python tools/import_excel_to_firebase.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Import the facility workbooks (scripts/*.xlsx) into point GeoJSON layers.
+
+  scripts/Cong_vien.xlsx      -> cong_vien.geojson
+  scripts/Giao_duc.xlsx       -> giao_duc.geojson
+  scripts/Ton_giao.xlsx       -> ton_giao.geojson
+  scripts/Y_te.xlsx           -> y_te.geojson
+  scripts/nha_sinh_hoat.xlsx  -> nha_sinh_hoat.geojson
+
+Mỗi workbook được đọc bằng openpyxl read_only (stream từng dòng), tìm dòng tiêu
+đề theo tên cột (Tên / Địa chỉ / Latitude / Longitude), bỏ các dòng nhóm
+("I", "1. PHẬT GIÁO", ...) và kiểm tra kiểu dữ liệu: toạ độ phải là số và nằm
+trong khung Đà Nẵng, tên không được rỗng. Các workbook chạy song song trong
+process pool; workbook không đổi (mtime/size, rồi sha256) được bỏ qua nhờ cache.
+Thuộc tính mỗi lớp giữ đúng schema của file trong assets/maps (vd. y_te,
+ton_giao, nha_sinh_hoat có latitude / longitude).
+
+Mặc định ghi vào tools/.geojson_cache/facility_import/, KHÔNG ghi đè assets/maps:
+các lớp đang ship đã được chỉnh tay sau khi xuất từ workbook và chưa khớp với
+workbook (search_index.py, nearest_facility.py và app đọc bản trong assets/maps):
+  - y_te: 3 điểm lệch kinh độ ~0.0026° (~275 m), 3 tên viết khác
+  - nha_sinh_hoat: 81 điểm trong app, workbook chỉ có 79 dòng hợp lệ; ~48 tên
+    viết khác, 7 điểm lệch tới ~1.6 km
+  - cong_vien: 24 điểm lệch tới ~0.0036° (~420 m)
+  - ton_giao: 1 điểm lệch ~0.15° (~19 km)
+  - chỉ giao_duc trùng khớp từng byte
+Sau mỗi lần import, các khác biệt so với assets/maps được in ra (số điểm, tên
+chỉ có ở một bên, độ lệch lớn nhất). Chỉ dùng --output-dir assets/maps khi
+workbook đã được đối chiếu lại với dữ liệu đang ship.
+
+Usage:
+    python tools/excel_to_geojson.py            # refresh every facility layer
+    python tools/excel_to_geojson.py y_te --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    print("❌ openpyxl not found. Install with: pip install openpyxl")
+    sys.exit(1)
+
+from validate_coordinates import DA_NANG_ENVELOPE
+from vn2000 import degrees_to_metres
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHIPPED_DIR = os.path.join(ROOT, "assets", "maps")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".geojson_cache")
+CACHE_FILE = os.path.join(CACHE_DIR, "excel_import.json")
+DEFAULT_OUTPUT_DIR = os.path.join(CACHE_DIR, "facility_import")
+
+# layer name -> (workbook, row properties, constant properties); property
+# names and order follow the layers shipped in assets/maps
+POINT_FIELDS = ("id", "name", "address", "latitude", "longitude")
+LAYERS = {
+    "cong_vien": (
+        "scripts/Cong_vien.xlsx",
+        ("name", "address"),
+        {"Layer": "CONG_VIEN"},
+    ),
+    "giao_duc": ("scripts/Giao_duc.xlsx", ("name", "address"), {"Layer": "GIAO_DUC"}),
+    "ton_giao": ("scripts/Ton_giao.xlsx", POINT_FIELDS, {"type": "Tôn giáo"}),
+    "y_te": ("scripts/Y_te.xlsx", POINT_FIELDS, {"type": "Y tế"}),
+    "nha_sinh_hoat": ("scripts/nha_sinh_hoat.xlsx", POINT_FIELDS, {}),
+}
+MAX_SHIFT_M = 1.0  # larger moves against the shipped layer are reported
+
+ADDRESS_HEADERS = ("địa chỉ", "địa điểm")
+
+
+def find_columns(row):
+    """Column indexes of name/address/lat/lon from a header row, or None."""
+    headers = [str(v).strip().lower() if v is not None else "" for v in row]
+    lat = next((i for i, h in enumerate(headers) if h.startswith("latitude")), None)
+    lon = next((i for i, h in enumerate(headers) if h.startswith("longitude")), None)
+    if lat is None or lon is None:
+        return None
+    address = next(
+        (i for i, h in enumerate(headers) if h.startswith(ADDRESS_HEADERS)), None
+    )
+    # Name is the first non-empty header after the STT column
+    name = next((i for i, h in enumerate(headers[1:], 1) if h), None)
+    return {"stt": 0, "name": name, "address": address, "lat": lat, "lon": lon}
+
+
+def parse_coordinate(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return float(value.strip().replace(",", "."))
+    raise ValueError(f"not a number: {value!r}")
+
+
+def _cell(row, index):
+    if index is None or index >= len(row):
+        return None
+    return row[index]
+
+
+def read_workbook(path, fields, extra, envelope=DA_NANG_ENVELOPE):
+    """Stream a workbook into (features, errors)."""
+    lon_min, lat_min, lon_max, lat_max = envelope
+    features = []
+    errors = []
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        columns = None
+        for row_number, row in enumerate(sheet.iter_rows(values_only=True), 1):
+            if columns is None:
+                columns = find_columns(row)
+                continue
+            lat_value = _cell(row, columns["lat"])
+            lon_value = _cell(row, columns["lon"])
+            name = _cell(row, columns["name"])
+            if lat_value in (None, "") and lon_value in (None, ""):
+                continue  # blank or group heading row
+
+            where = f"{os.path.basename(path)}:{row_number}"
+            if not isinstance(name, str) or not name.strip():
+                errors.append(f"{where}: missing name")
+                continue
+            try:
+                lat = parse_coordinate(lat_value)
+                lon = parse_coordinate(lon_value)
+            except ValueError as e:
+                errors.append(f"{where}: invalid coordinate ({e}) for {name.strip()}")
+                continue
+            if not (lat_min <= lat <= lat_max and lon_min <= lon <= lon_max):
+                errors.append(
+                    f"{where}: ({lat}, {lon}) outside Đà Nẵng for {name.strip()}"
+                )
+                continue
+
+            address = _cell(row, columns["address"])
+            values = {
+                "id": len(features) + 1,
+                "name": " ".join(name.split()),
+                "address": " ".join(str(address).split()) if address else "",
+                "latitude": lat,
+                "longitude": lon,
+            }
+            properties = {field: values[field] for field in fields}
+            properties.update(extra)
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                    "properties": properties,
+                }
+            )
+        if columns is None:
+            errors.append(f"{os.path.basename(path)}: no Latitude/Longitude header")
+    finally:
+        workbook.close()
+    return features, errors
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cache(path=CACHE_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_unchanged(entry, workbook, output):
+    """Cheap mtime/size check first, content hash only when those differ."""
+    if not entry or not os.path.exists(output) or entry.get("output") != output:
+        return False
+    stat = os.stat(workbook)
+    if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+        return True
+    if entry["sha256"] != file_hash(workbook):
+        return False
+    entry["mtime"] = stat.st_mtime  # touched but identical
+    return True
+
+
+def import_layer(name, output_dir):
+    """Worker: convert one workbook. Returns a result dict (never raises)."""
+    workbook, fields, extra = LAYERS[name]
+    workbook = os.path.join(ROOT, workbook)
+    output = os.path.join(output_dir, f"{name}.geojson")
+    start = time.perf_counter()
+    try:
+        features, errors = read_workbook(workbook, fields, extra)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"type": "FeatureCollection", "features": features},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    except Exception as e:
+        return {"name": name, "ok": False, "errors": [f"{workbook}: {e}"]}
+    stat = os.stat(workbook)
+    return {
+        "name": name,
+        "ok": True,
+        "output": output,
+        "features": len(features),
+        "errors": errors,
+        "seconds": time.perf_counter() - start,
+        "cache": {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha256": file_hash(workbook),
+            "output": output,
+        },
+    }
+
+
+def compare_with_shipped(output, shipped):
+    """Differences between an imported layer and the shipped one (list of str)."""
+    if os.path.abspath(output) == os.path.abspath(shipped) or not os.path.exists(
+        shipped
+    ):
+        return []
+    layers = []
+    for path in (output, shipped):
+        with open(path, "r", encoding="utf-8") as f:
+            layers.append(json.load(f).get("features", []))
+    imported, current = layers
+    differences = []
+    if len(imported) != len(current):
+        differences.append(f"{len(imported)} features, shipped {len(current)}")
+
+    def by_name(features):
+        points = {}
+        for feature in features:
+            name = (feature.get("properties") or {}).get("name")
+            points.setdefault(name, feature["geometry"]["coordinates"][:2])
+        return points
+
+    imported, current = by_name(imported), by_name(current)
+    only_imported = len(set(imported) - set(current))
+    only_shipped = len(set(current) - set(imported))
+    if only_imported or only_shipped:
+        differences.append(
+            f"{only_imported} names only in the workbook, {only_shipped} only shipped"
+        )
+    moved = [
+        float(degrees_to_metres(a[0] - b[0], a[1] - b[1], b[1]))
+        for name, a in imported.items()
+        if (b := current.get(name)) is not None
+    ]
+    moved = [m for m in moved if m > MAX_SHIFT_M]
+    if moved:
+        differences.append(f"{len(moved)} points moved, up to {max(moved):,.0f} m")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import facility workbooks")
+    parser.add_argument("layers", nargs="*", help=f"subset of {', '.join(LAYERS)}")
+    parser.add_argument(
+        "--output-dir",
+        default=DEFAULT_OUTPUT_DIR,
+        help="assets/maps replaces the shipped layers (see module docstring)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit 1 on any validation error"
+    )
+    args = parser.parse_args()
+    names = args.layers or list(LAYERS)
+    unknown = sorted(set(names) - set(LAYERS))
+    if unknown:
+        parser.error(f"unknown layers: {', '.join(unknown)}")
+    output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("=" * 80)
+    print("EXCEL -> GEOJSON IMPORT")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    cache = load_cache()  # entries of layers not refreshed now are kept
+    todo = []
+    for name in names:
+        workbook = os.path.join(ROOT, LAYERS[name][0])
+        output = os.path.join(output_dir, f"{name}.geojson")
+        if not args.force and is_unchanged(cache.get(name), workbook, output):
+            print(f"  {name:15} unchanged, skipped")
+        else:
+            todo.append(name)
+
+    results = []
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(import_layer, todo, [output_dir] * len(todo)))
+
+    error_count = 0
+    for result in results:
+        if result["ok"]:
+            print(
+                f"  {result['name']:15} {result['features']:4} features"
+                f"  -> {result['output']} ({result['seconds']:.2f}s)"
+            )
+            cache[result["name"]] = result["cache"]
+            shipped = os.path.join(SHIPPED_DIR, f"{result['name']}.geojson")
+            for difference in compare_with_shipped(result["output"], shipped):
+                print(f"      ≠ shipped layer: {difference}")
+        else:
+            print(f"  {result['name']:15} ❌ failed")
+        for error in result["errors"]:
+            print(f"      ⚠️ {error}")
+        error_count += len(result["errors"])
+
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+
+    print("=" * 80)
+    status = "✅" if not error_count else "⚠️"
+    print(
+        f"{status} {len(results)} imported, {len(names) - len(todo)} skipped, "
+        f"{error_count} validation errors in {time.perf_counter() - start:.2f}s"
+    )
+    failed = any(not r["ok"] for r in results)
+    return 1 if failed or (args.strict and error_count) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
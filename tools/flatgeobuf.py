@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+"""
+FlatGeobuf export / import with a packed Hilbert R-tree index.
+
+Xuất toàn bộ dữ liệu đã làm sạch (GeoJSON) cho các phần mềm GIS khác (QGIS,
+GDAL, ...) và cắt nhanh theo vùng:
+  - feature được sắp theo đường cong Hilbert của tâm bbox
+  - index là packed R-tree tĩnh (node 16 phần tử) ghi ngay sau header
+  - đọc theo bbox: duyệt index từ gốc, mỗi lần chỉ đọc các node cần thiết rồi
+    đọc đúng byte range của các feature trúng - không parse cả file
+FlatBuffers (header, feature) được mã hoá / giải mã trực tiếp, không cần thư
+viện flatbuffers. Nguồn đọc có thể là file hoặc URL (HTTP Range).
+
+Usage:
+    python tools/flatgeobuf.py write assets/maps/260to.geojson build/260to.fgb
+    python tools/flatgeobuf.py read build/260to.fgb --bbox 108.24 16.00 108.26 16.02 \\
+        --output cut.geojson
+    python tools/flatgeobuf.py info build/260to.fgb
+"""
+
+import argparse
+import json
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from columnar_cache import geometry_parts
+from pmtiles import FileSource, HttpSource
+
+MAGIC = b"fgb\x03fgb\x00"
+NODE_SIZE = 16
+READ_CHUNK = 1024 * 1024  # full scans read the feature section in chunks
+NODE_ITEM = struct.Struct("<4dQ")  # min x, min y, max x, max y, offset
+VN2000_EPSG = 5899  # same CRS as geojson_tiler.py
+
+GEOMETRY_TYPES = {
+    "Unknown": 0,
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+GEOMETRY_NAMES = {code: name for name, code in GEOMETRY_TYPES.items()}
+
+# Column types used here: Bool, Long, Double, String, Json
+BOOL, LONG, DOUBLE, STRING, JSON = 2, 7, 10, 11, 12
+Column = namedtuple("Column", "name type")
+
+
+# --- FlatBuffers encoding --------------------------------------------------
+#
+# Objects are laid out front to back: a table is followed by the strings,
+# vectors and sub-tables it references, so every uoffset points forward as
+# FlatBuffers requires. Field values are (kind, value) tuples.
+
+_SCALARS = {"u8": "<B", "bool": "<?", "u16": "<H", "i32": "<i", "u64": "<Q"}
+
+
+class _Builder:
+    def __init__(self):
+        self.buf = bytearray(4)  # root uoffset
+
+    def _pad(self, align, extra=0):
+        while (len(self.buf) + extra) % align:
+            self.buf.append(0)
+
+    def finish(self, fields):
+        root = self.table(fields)
+        struct.pack_into("<I", self.buf, 0, root)
+        return bytes(self.buf)
+
+    def table(self, fields):
+        """fields: {index: (kind, value)}; returns the table position."""
+        fields = {i: f for i, f in fields.items() if f[1] is not None}
+        slots = max(fields, default=-1) + 1
+        self._pad(2)
+        vtable = len(self.buf)
+        self.buf += bytes(4 + 2 * slots)
+        self._pad(8, 4)  # 8-byte fields right after the soffset stay aligned
+        start = len(self.buf)
+        self.buf += struct.pack("<i", start - vtable)
+
+        # Inline part: biggest scalars first, references as 4-byte uoffsets
+        def size(kind):
+            return struct.calcsize(_SCALARS[kind]) if kind in _SCALARS else 4
+
+        refs = []
+        for index in sorted(fields, key=lambda i: -size(fields[i][0])):
+            kind, value = fields[index]
+            self._pad(size(kind))
+            struct.pack_into(
+                "<H", self.buf, vtable + 4 + 2 * index, len(self.buf) - start
+            )
+            if kind in _SCALARS:
+                self.buf += struct.pack(_SCALARS[kind], value)
+            else:
+                refs.append((len(self.buf), kind, value))
+                self.buf += bytes(4)
+        struct.pack_into("<HH", self.buf, vtable, 4 + 2 * slots, len(self.buf) - start)
+
+        for position, kind, value in refs:
+            target = self._reference(kind, value)
+            struct.pack_into("<I", self.buf, position, target - position)
+        return start
+
+    def _vector(self, data, count, align):
+        self._pad(max(align, 4), 4)
+        position = len(self.buf)
+        self.buf += struct.pack("<I", count) + data
+        return position
+
+    def _reference(self, kind, value):
+        if kind == "string":
+            data = value.encode("utf-8")
+            position = self._vector(data, len(data), 4)
+            self.buf.append(0)
+            return position
+        if kind == "table":
+            return self.table(value)
+        if kind == "tables":
+            position = self._vector(bytes(4 * len(value)), len(value), 4)
+            for i, fields in enumerate(value):
+                slot = position + 4 + 4 * i
+                struct.pack_into("<I", self.buf, slot, self.table(fields) - slot)
+            return position
+        array = np.ascontiguousarray(
+            value, dtype={"u8": "<u1", "u32": "<u4", "f64": "<f8"}[kind[4:]]
+        )
+        return self._vector(array.tobytes(), len(array), array.itemsize)
+
+
+class _Table:
+    """Read access to one FlatBuffers table."""
+
+    __slots__ = ("buf", "pos", "vtable", "slots")
+
+    def __init__(self, buf, pos):
+        self.buf = buf
+        self.pos = pos
+        self.vtable = pos - struct.unpack_from("<i", buf, pos)[0]
+        self.slots = (struct.unpack_from("<H", buf, self.vtable)[0] - 4) // 2
+
+    @classmethod
+    def root(cls, buf):
+        return cls(buf, struct.unpack_from("<I", buf, 0)[0])
+
+    def _field(self, index):
+        if index >= self.slots:
+            return 0
+        return struct.unpack_from("<H", self.buf, self.vtable + 4 + 2 * index)[0]
+
+    def scalar(self, index, fmt, default=0):
+        offset = self._field(index)
+        return (
+            struct.unpack_from(fmt, self.buf, self.pos + offset)[0]
+            if offset
+            else default
+        )
+
+    def _target(self, index):
+        offset = self._field(index)
+        if not offset:
+            return None
+        position = self.pos + offset
+        return position + struct.unpack_from("<I", self.buf, position)[0]
+
+    def string(self, index):
+        vector = self._target(index)
+        if vector is None:
+            return None
+        length = struct.unpack_from("<I", self.buf, vector)[0]
+        return bytes(self.buf[vector + 4 : vector + 4 + length]).decode("utf-8")
+
+    def vector(self, index, dtype):
+        vector = self._target(index)
+        if vector is None:
+            return np.empty(0, dtype=dtype)
+        length = struct.unpack_from("<I", self.buf, vector)[0]
+        return np.frombuffer(self.buf, dtype=dtype, count=length, offset=vector + 4)
+
+    def table(self, index):
+        target = self._target(index)
+        return None if target is None else _Table(self.buf, target)
+
+    def tables(self, index):
+        vector = self._target(index)
+        if vector is None:
+            return []
+        length = struct.unpack_from("<I", self.buf, vector)[0]
+        slots = range(vector + 4, vector + 4 + 4 * length, 4)
+        return [
+            _Table(self.buf, s + struct.unpack_from("<I", self.buf, s)[0])
+            for s in slots
+        ]
+
+
+# --- Geometry and properties -----------------------------------------------
+
+
+def has_z(geom):
+    parts = geometry_parts(geom)
+    return any(len(c) > 2 for part in parts for ring in part for c in ring)
+
+
+def encode_geometry(geom, with_z=False):
+    """GeoJSON geometry -> Geometry table fields (type always set)."""
+    geom_type = geom["type"]
+    if geom_type == "MultiPolygon":
+        parts = [
+            encode_geometry({"type": "Polygon", "coordinates": p}, with_z)
+            for p in geom["coordinates"]
+        ]
+        return {6: ("u8", GEOMETRY_TYPES[geom_type]), 7: ("tables", parts)}
+    rings = [ring for part in geometry_parts(geom) for ring in part]
+    xy = np.array([c[:2] for ring in rings for c in ring], dtype=np.float64).reshape(-1)
+    fields = {1: ("vec_f64", xy), 6: ("u8", GEOMETRY_TYPES[geom_type])}
+    if with_z:
+        fields[2] = (
+            "vec_f64",
+            [c[2] if len(c) > 2 else 0.0 for ring in rings for c in ring],
+        )
+    if geom_type in ("Polygon", "MultiLineString") and len(rings) > 1:
+        fields[0] = ("vec_u32", np.cumsum([len(ring) for ring in rings]))
+    return fields
+
+
+def decode_geometry(table, geom_type=0):
+    geom_type = table.scalar(6, "<B", geom_type)
+    name = GEOMETRY_NAMES.get(geom_type)
+    if name == "MultiPolygon":
+        return {
+            "type": name,
+            "coordinates": [
+                decode_geometry(part, 3)["coordinates"] for part in table.tables(7)
+            ],
+        }
+    xy = table.vector(1, "<f8").reshape(-1, 2)
+    z = table.vector(2, "<f8")
+    coords = np.column_stack([xy, z]) if len(z) else xy
+    ends = table.vector(0, "<u4")
+    rings = np.split(coords, ends[:-1]) if len(ends) else [coords]
+    rings = [ring.tolist() for ring in rings]
+    if name == "Point":
+        return {"type": name, "coordinates": rings[0][0]}
+    if name in ("LineString", "MultiPoint"):
+        return {"type": name, "coordinates": rings[0]}
+    if name in ("Polygon", "MultiLineString"):
+        return {"type": name, "coordinates": rings}
+    raise ValueError(f"unsupported geometry type {geom_type}")
+
+
+def infer_columns(features):
+    """One column per property key, typed from the values seen."""
+    kinds = {}
+    for feature in features:
+        for key, value in (feature.get("properties") or {}).items():
+            if value is None:
+                kinds.setdefault(key, set())
+                continue
+            if isinstance(value, bool):
+                kind = BOOL
+            elif isinstance(value, int) and -(2**63) <= value < 2**63:
+                kind = LONG
+            elif isinstance(value, float):
+                kind = DOUBLE
+            elif isinstance(value, str):
+                kind = STRING
+            else:
+                kind = JSON
+            kinds.setdefault(key, set()).add(kind)
+    columns = []
+    for key, seen in kinds.items():
+        if len(seen) <= 1:
+            kind = seen.pop() if seen else STRING
+        elif seen <= {LONG, DOUBLE}:
+            kind = DOUBLE
+        elif seen <= {STRING, LONG, DOUBLE, BOOL}:
+            kind = STRING
+        else:
+            kind = JSON
+        columns.append(Column(key, kind))
+    return columns
+
+
+def encode_properties(props, columns):
+    out = bytearray()
+    for i, column in enumerate(columns):
+        value = props.get(column.name)
+        if value is None:
+            continue
+        out += struct.pack("<H", i)
+        if column.type == BOOL:
+            out += struct.pack("<?", value)
+        elif column.type == LONG:
+            out += struct.pack("<q", value)
+        elif column.type == DOUBLE:
+            out += struct.pack("<d", value)
+        else:
+            if column.type == JSON:
+                text = json.dumps(value, ensure_ascii=False)
+            else:
+                text = value if isinstance(value, str) else json.dumps(value)
+            data = text.encode("utf-8")
+            out += struct.pack("<I", len(data)) + data
+    return bytes(out)
+
+
+def decode_properties(data, columns):
+    props = {}
+    pos = 0
+    while pos < len(data):
+        column = columns[struct.unpack_from("<H", data, pos)[0]]
+        pos += 2
+        if column.type == BOOL:
+            value = struct.unpack_from("<?", data, pos)[0]
+            pos += 1
+        elif column.type == LONG:
+            value = struct.unpack_from("<q", data, pos)[0]
+            pos += 8
+        elif column.type == DOUBLE:
+            value = struct.unpack_from("<d", data, pos)[0]
+            pos += 8
+        elif column.type in (STRING, JSON):
+            length = struct.unpack_from("<I", data, pos)[0]
+            value = bytes(data[pos + 4 : pos + 4 + length]).decode("utf-8")
+            pos += 4 + length
+            if column.type == JSON:
+                value = json.loads(value)
+        else:
+            raise ValueError(f"unsupported column type {column.type}")
+        props[column.name] = value
+    return props
+
+
+# --- Packed Hilbert R-tree -------------------------------------------------
+
+
+def hilbert(x, y):
+    """Hilbert value of 16-bit grid coordinates (uint32 arrays), as in flatbush."""
+    x = np.asarray(x, dtype=np.uint32)
+    y = np.asarray(y, dtype=np.uint32)
+    a = x ^ y
+    b = 0xFFFF ^ a
+    c = 0xFFFF ^ (x | y)
+    d = x & (y ^ 0xFFFF)
+
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 2)) ^ (b & (b >> 2))
+    B = (a & (b >> 2)) ^ (b & ((a ^ b) >> 2))
+    C ^= (a & (c >> 2)) ^ (b & (d >> 2))
+    D ^= (b & (c >> 2)) ^ ((a ^ b) & (d >> 2))
+
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 4)) ^ (b & (b >> 4))
+    B = (a & (b >> 4)) ^ (b & ((a ^ b) >> 4))
+    C ^= (a & (c >> 4)) ^ (b & (d >> 4))
+    D ^= (b & (c >> 4)) ^ ((a ^ b) & (d >> 4))
+
+    a, b, c, d = A, B, C, D
+    C ^= (a & (c >> 8)) ^ (b & (d >> 8))
+    D ^= (b & (c >> 8)) ^ ((a ^ b) & (d >> 8))
+
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+    i0 = x ^ y
+    i1 = b | (0xFFFF ^ (i0 | a))
+    for shift, mask in (
+        (8, 0x00FF00FF),
+        (4, 0x0F0F0F0F),
+        (2, 0x33333333),
+        (1, 0x55555555),
+    ):
+        i0 = (i0 | (i0 << shift)) & mask
+        i1 = (i1 | (i1 << shift)) & mask
+    return ((i1 << 1) | i0).astype(np.uint32)
+
+
+def level_bounds(num_items, node_size=NODE_SIZE):
+    """[(start, end)] node ranges per level, leaves first; root is node 0."""
+    counts = [num_items]
+    n = num_items
+    while True:
+        n = -(-n // node_size)
+        counts.append(n)
+        if n == 1:
+            break
+    bounds = []
+    end = sum(counts)
+    for count in counts:
+        bounds.append((end - count, end))
+        end -= count
+    return bounds
+
+
+def build_index(boxes, offsets, node_size=NODE_SIZE):
+    """Packed R-tree bytes from sorted leaf boxes (n, 4) and feature offsets."""
+    levels = level_bounds(len(boxes), node_size)
+    total = levels[0][1]
+    nodes = np.zeros((total, 4), dtype=np.float64)
+    refs = np.zeros(total, dtype=np.uint64)
+    start, end = levels[0]
+    nodes[start:end] = boxes
+    refs[start:end] = offsets
+    for (start, end), (parent, _) in zip(levels[:-1], levels[1:]):
+        for i, first in enumerate(range(start, end, node_size)):
+            block = nodes[first : min(first + node_size, end)]
+            nodes[parent + i] = [*block[:, :2].min(axis=0), *block[:, 2:].max(axis=0)]
+            refs[parent + i] = first
+    packed = np.zeros(total, dtype=[("box", "<f8", 4), ("offset", "<u8")])
+    packed["box"] = nodes
+    packed["offset"] = refs
+    return packed.tobytes()
+
+
+# --- Writer ----------------------------------------------------------------
+
+
+def _bbox(geom):
+    xy = np.array(
+        [c[:2] for part in geometry_parts(geom) for ring in part for c in ring],
+        dtype=np.float64,
+    )
+    return [*xy.min(axis=0), *xy.max(axis=0)]
+
+
+def write_fgb(path, features, name="", crs=None, node_size=NODE_SIZE):
+    """Write GeoJSON features sorted on the Hilbert curve, with an R-tree index."""
+    features = [f for f in features if (f.get("geometry") or {}).get("coordinates")]
+    if not features:
+        raise ValueError("no features with geometry")
+    columns = infer_columns(features)
+    boxes = np.array([_bbox(f["geometry"]) for f in features], dtype=np.float64)
+    extent = [*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0)]
+
+    width = max(extent[2] - extent[0], 1e-12)
+    height = max(extent[3] - extent[1], 1e-12)
+    cx = ((boxes[:, 0] + boxes[:, 2]) / 2 - extent[0]) / width * 0xFFFF
+    cy = ((boxes[:, 1] + boxes[:, 3]) / 2 - extent[1]) / height * 0xFFFF
+    order = np.argsort(
+        -hilbert(np.floor(cx), np.floor(cy)).astype(np.int64), kind="stable"
+    )
+
+    types = {f["geometry"]["type"] for f in features}
+    header_type = GEOMETRY_TYPES[types.pop()] if len(types) == 1 else 0
+    # Z is all or nothing in FlatGeobuf; missing heights are written as 0
+    with_z = any(has_z(f["geometry"]) for f in features)
+    if crs is None:
+        crs = 4326 if np.abs(extent).max() <= 180 else VN2000_EPSG
+
+    encoded = []
+    offsets = np.zeros(len(features), dtype=np.uint64)
+    offset = 0
+    for i, index in enumerate(order):
+        feature = features[index]
+        data = _Builder().finish(
+            {
+                0: ("table", encode_geometry(feature["geometry"], with_z)),
+                1: (
+                    "vec_u8",
+                    np.frombuffer(
+                        encode_properties(feature.get("properties") or {}, columns),
+                        dtype=np.uint8,
+                    ),
+                ),
+            }
+        )
+        offsets[i] = offset
+        encoded.append(data)
+        offset += 4 + len(data)
+
+    header = _Builder().finish(
+        {
+            0: ("string", name),
+            1: ("vec_f64", extent),
+            2: ("u8", header_type),
+            3: ("bool", with_z),
+            7: (
+                "tables",
+                [{0: ("string", c.name), 1: ("u8", c.type)} for c in columns],
+            ),
+            8: ("u64", len(features)),
+            9: ("u16", node_size),
+            10: ("table", {0: ("string", "EPSG"), 1: ("i32", crs)}),
+        }
+    )
+    index = build_index(boxes[order], offsets, node_size)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)) + header)
+        f.write(index)
+        for data in encoded:
+            f.write(struct.pack("<I", len(data)) + data)
+    return {
+        "features": len(features),
+        "columns": len(columns),
+        "index_bytes": len(index),
+    }
+
+
+# --- Reader ----------------------------------------------------------------
+
+
+class FlatGeobufReader:
+    """Header + R-tree search over a byte-range source (file path or URL)."""
+
+    def __init__(self, source):
+        if isinstance(source, str):
+            is_url = source.startswith(("http://", "https://"))
+            source = HttpSource(source) if is_url else FileSource(source)
+        self.source = source
+        head = source(0, 12)
+        if head[:3] != b"fgb" or head[4:7] != b"fgb":
+            raise ValueError("not a FlatGeobuf file")
+        size = struct.unpack_from("<I", head, 8)[0]
+        header = _Table.root(source(12, size))
+        self.name = header.string(0)
+        self.extent = header.vector(1, "<f8").tolist()
+        self.geometry_type = header.scalar(2, "<B")
+        self.columns = [
+            Column(c.string(0), c.scalar(1, "<B")) for c in header.tables(7)
+        ]
+        self.count = header.scalar(8, "<Q")
+        self.node_size = header.scalar(9, "<H", 16)
+        crs = header.table(10)
+        self.crs = crs.scalar(1, "<i") if crs else None
+
+        self.index_offset = 12 + size
+        self.index_size = 0
+        if self.node_size and self.count:
+            self.levels = level_bounds(self.count, self.node_size)
+            self.index_size = self.levels[0][1] * NODE_ITEM.size
+        self.data_offset = self.index_offset + self.index_size
+
+    def _nodes(self, start, end):
+        data = self.source(
+            self.index_offset + start * NODE_ITEM.size, (end - start) * NODE_ITEM.size
+        )
+        return np.frombuffer(data, dtype=[("box", "<f8", 4), ("offset", "<u8")])
+
+    def search(self, bbox):
+        """
+        (offset, end) of the features whose bbox intersects (min x, min y,
+        max x, max y); `end` comes from the next leaf, None for the last one.
+        """
+        if not self.index_size:
+            raise ValueError("file has no spatial index")
+        min_x, min_y, max_x, max_y = bbox
+        found = []
+        queue = [(0, len(self.levels) - 1)]  # (node, level), root first
+        while queue:
+            # Children of the same level are read in one contiguous range
+            level = queue[0][1]
+            batch = sorted(node for node, lvl in queue if lvl == level)
+            queue = [(node, lvl) for node, lvl in queue if lvl != level]
+            level_end = self.levels[level][1]
+            ranges = []
+            for node in batch:
+                end = min(node + self.node_size, level_end)
+                if ranges and ranges[-1][1] >= node:
+                    ranges[-1][1] = max(ranges[-1][1], end)
+                else:
+                    ranges.append([node, end])
+            for start, end in ranges:
+                # One extra leaf tells where the last feature of the block ends
+                extra = level == 0 and end < level_end
+                nodes = self._nodes(start, end + extra)
+                box = nodes["box"][: end - start]
+                hit = (
+                    (box[:, 0] <= max_x)
+                    & (box[:, 2] >= min_x)
+                    & (box[:, 1] <= max_y)
+                    & (box[:, 3] >= min_y)
+                )
+                offsets = nodes["offset"].tolist()
+                if level == 0:
+                    offsets.append(None)
+                    found.extend(
+                        (offsets[i], offsets[i + 1]) for i in np.flatnonzero(hit)
+                    )
+                else:
+                    queue.extend((offsets[i], level - 1) for i in np.flatnonzero(hit))
+        return sorted(found, key=lambda item: item[0])
+
+    def _decode(self, data, position=0):
+        table = _Table.root(memoryview(data)[position:])
+        geometry = table.table(0)
+        props = table.vector(1, "<u1").tobytes()
+        return {
+            "type": "Feature",
+            "properties": decode_properties(props, self.columns),
+            "geometry": (
+                decode_geometry(geometry, self.geometry_type) if geometry else None
+            ),
+        }
+
+    def _split(self, data):
+        """Size-prefixed features in `data`; returns (features, bytes used)."""
+        features = []
+        position = 0
+        while position + 4 <= len(data):
+            size = struct.unpack_from("<I", data, position)[0]
+            if position + 4 + size > len(data):
+                break
+            features.append(self._decode(data, position + 4))
+            position += 4 + size
+        return features, position
+
+    def features(self, bbox=None):
+        """Stream features, optionally only those whose bbox intersects `bbox`."""
+        if bbox is not None:
+            # Adjacent hits are fetched together in one range read
+            runs = []  # [start, end, start of the last feature]
+            for offset, end in self.search(bbox):
+                if runs and runs[-1][1] == offset:
+                    runs[-1][1:] = [end, offset]
+                else:
+                    runs.append([offset, end, offset])
+            for offset, end, last in runs:
+                if end is None:  # run ends at the last feature: size prefix first
+                    end = last + 4 + struct.unpack("<I", self._read(last, 4))[0]
+                yield from self._split(self._read(offset, end - offset))[0]
+            return
+        offset = 0
+        remaining = self.count
+        buffer = b""
+        while remaining:
+            chunk = self._read(offset + len(buffer), READ_CHUNK)
+            if not chunk:
+                raise ValueError("truncated FlatGeobuf file")
+            buffer += chunk
+            features, used = self._split(buffer)
+            yield from features[:remaining]
+            remaining -= min(len(features), remaining)
+            offset += used
+            buffer = buffer[used:]
+
+    def _read(self, offset, length):
+        return self.source(self.data_offset + offset, length)
+
+    def close(self):
+        self.source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FlatGeobuf export / bbox reads")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("write", help="GeoJSON -> FlatGeobuf")
+    p.add_argument("input_file")
+    p.add_argument("output")
+    p.add_argument("--crs", type=int, help="EPSG code (default: detected)")
+    p = sub.add_parser("read", help="FlatGeobuf -> GeoJSON")
+    p.add_argument("input_file", help="path or URL")
+    p.add_argument(
+        "--bbox", type=float, nargs=4, metavar=("MINX", "MINY", "MAXX", "MAXY")
+    )
+    p.add_argument("--output")
+    p = sub.add_parser("info")
+    p.add_argument("input_file", help="path or URL")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print("=" * 80)
+    if args.command == "write":
+        with open(args.input_file, "r", encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+        name = args.input_file.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+        stats = write_fgb(args.output, features, name=name, crs=args.crs)
+        print(f"✅ FlatGeobuf written: {args.output}")
+        print(f"   Features: {stats['features']:,}, columns: {stats['columns']}")
+        print(f"   Index:    {stats['index_bytes'] / 1024:.1f} KB")
+    elif args.command == "read":
+        reader = FlatGeobufReader(args.input_file)
+        features = list(reader.features(args.bbox))
+        print(
+            f"{len(features):,} of {reader.count:,} features, {reader.source.requests:,} range reads"
+        )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"type": "FeatureCollection", "features": features},
+                    f,
+                    ensure_ascii=False,
+                )
+            print(f"✅ Saved to: {args.output}")
+        reader.close()
+    else:
+        reader = FlatGeobufReader(args.input_file)
+        print(f"Name:      {reader.name}")
+        print(f"Features:  {reader.count:,}")
+        print(f"Geometry:  {GEOMETRY_NAMES.get(reader.geometry_type)}")
+        print(f"CRS:       EPSG:{reader.crs}")
+        print(f"Extent:    {reader.extent}")
+        print(
+            f"Index:     node size {reader.node_size}, {reader.index_size / 1024:.1f} KB"
+        )
+        print("Columns:   " + ", ".join(c.name for c in reader.columns))
+        reader.close()
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 """
-Generate pubspec.yaml asset entries for all tile directories
+Generate pubspec.yaml asset entries for the map tiles
+
+Tiles packed with pack_tile_bundles.py need a single entry; the
+per-directory list is only printed for an unpacked tile tree.
 """
 
 import os
-import json
+
+from pack_tile_bundles import TABLE_NAME, pubspec_entries
 
 
 def generate_asset_entries():
     tiles_dir = os.path.join("assets", "maps", "tiles")
+    bundle_dir = os.path.join("assets", "maps", "tile_bundles")
 
     print("# Generated tile asset entries")
+    if os.path.exists(os.path.join(bundle_dir, TABLE_NAME)):
+        print("\n".join(pubspec_entries()))
+        return
+
+    print("    # ⚠️ Unpacked tiles - run tools/pack_tile_bundles.py pack")
     print("    - assets/maps/tiles/index.json")
 
     # Walk through zoom levels
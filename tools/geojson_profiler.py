@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Single-pass streaming GeoJSON profiler.
+
+Thay cho analyze_geojson.py, analyze_properties.py và extract_text_labels.py:
+đọc file một lần (bộ nhớ giới hạn, xem geojson_stream.py) trên TOÀN BỘ feature,
+tính cùng lúc:
+  - số feature theo layer, tập khoá properties theo layer, mẫu properties
+  - histogram kiểu geometry (toàn file và theo layer)
+  - bbox và số đỉnh theo layer
+  - trích xuất nhãn text (định dạng tools/text_labels.json)
+Có thể chạy song song theo các khoảng byte (--workers).
+
+Usage:
+    python tools/geojson_profiler.py assets/maps/nhs.geojson
+    python tools/geojson_profiler.py assets/maps/nhs.geojson --workers 8 \\
+        --report tools/geojson_profile.json --labels tools/text_labels.json
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+
+from geojson_stream import flatten_coords, iter_features, split_ranges
+
+BOUNDARY_KEYWORDS = ["ranh", "gioi", "boundary", "ward", "phuong", "admin"]
+
+
+class LayerStats:
+    __slots__ = ("features", "vertices", "bbox", "keys", "geometry_types", "sample")
+
+    def __init__(self):
+        self.features = 0
+        self.vertices = 0
+        self.bbox = None
+        self.keys = set()
+        self.geometry_types = Counter()
+        self.sample = None
+
+    def merge(self, other):
+        self.features += other.features
+        self.vertices += other.vertices
+        self.keys |= other.keys
+        self.geometry_types.update(other.geometry_types)
+        if self.sample is None:
+            self.sample = other.sample
+        if other.bbox is not None:
+            self.extend(other.bbox)
+
+    def extend(self, bbox):
+        if self.bbox is None:
+            self.bbox = list(bbox)
+        else:
+            self.bbox[0] = min(self.bbox[0], bbox[0])
+            self.bbox[1] = min(self.bbox[1], bbox[1])
+            self.bbox[2] = max(self.bbox[2], bbox[2])
+            self.bbox[3] = max(self.bbox[3], bbox[3])
+
+
+class Profile:
+    """Accumulates statistics over a stream of features; mergeable."""
+
+    def __init__(self):
+        self.features = 0
+        self.layers = defaultdict(LayerStats)
+        self.geometry_types = Counter()
+        self.text_labels = []
+
+    def add(self, feature):
+        self.features += 1
+        props = feature.get("properties") or {}
+        geom = feature.get("geometry") or {}
+        layer = props.get("Layer", "None")
+        geom_type = geom.get("type", "None")
+
+        stats = self.layers[layer]
+        stats.features += 1
+        stats.keys.update(props.keys())
+        stats.geometry_types[geom_type] += 1
+        if stats.sample is None:
+            stats.sample = props
+        self.geometry_types[geom_type] += 1
+
+        flat = []
+        flatten_coords(geom.get("coordinates"), flat)
+        if flat:
+            xs = flat[0::2]
+            ys = flat[1::2]
+            stats.vertices += len(xs)
+            stats.extend((min(xs), min(ys), max(xs), max(ys)))
+
+        text = props.get("Text")
+        if text:
+            self.text_labels.append(
+                {
+                    "text": text,
+                    "layer": layer,
+                    "coords": geom.get("coordinates"),
+                    "properties": props,
+                }
+            )
+
+    def merge(self, other):
+        self.features += other.features
+        self.geometry_types.update(other.geometry_types)
+        self.text_labels.extend(other.text_labels)
+        for name, stats in other.layers.items():
+            self.layers[name].merge(stats)
+        return self
+
+    def to_dict(self):
+        layers = sorted(
+            self.layers.items(), key=lambda kv: kv[1].features, reverse=True
+        )
+        upper = [label["text"].upper() for label in self.text_labels]
+        return {
+            "features": self.features,
+            "geometry_types": dict(self.geometry_types.most_common()),
+            "property_keys": sorted(
+                set().union(*(s.keys for s in self.layers.values()))
+            ),
+            "boundary_layers": [
+                name
+                for name, _ in layers
+                if any(kw in name.lower() for kw in BOUNDARY_KEYWORDS)
+            ],
+            "text_labels": {
+                "total": len(self.text_labels),
+                "to_dan_pho": sum(1 for t in upper if "TỔ" in t or "TO" in t),
+                "chi_bo": sum(1 for t in upper if "CHI BỘ" in t or "CB" in t),
+            },
+            "layers": {
+                name: {
+                    "features": s.features,
+                    "vertices": s.vertices,
+                    "bbox": s.bbox,
+                    "geometry_types": dict(s.geometry_types.most_common()),
+                    "property_keys": sorted(s.keys),
+                    "sample_properties": s.sample,
+                }
+                for name, s in layers
+            },
+        }
+
+
+def profile_range(args):
+    """Worker: profile the features in one byte range."""
+    path, start, end = args
+    profile = Profile()
+    for feature in iter_features(path, start, end):
+        profile.add(feature)
+    return profile
+
+
+def profile_file(path, workers=1):
+    """Profile a GeoJSON file in one streaming pass (optionally in parallel)."""
+    if workers <= 1:
+        return profile_range((path, None, None))
+
+    ranges = split_ranges(path, workers * 4)
+    profile = Profile()
+    with Pool(workers) as pool:
+        # imap keeps range order, so text labels stay in file order
+        for part in pool.imap(profile_range, [(path, s, e) for s, e in ranges]):
+            profile.merge(part)
+    return profile
+
+
+def print_summary(report):
+    print(f"Total features: {report['features']:,}")
+    print("\nGeometry types:")
+    for geom_type, count in report["geometry_types"].items():
+        print(f"  {geom_type:20} {count:10,}")
+
+    print("\n" + "=" * 80)
+    print("Layers (top 30):")
+    for name, layer in list(report["layers"].items())[:30]:
+        print(
+            f"  {name[:40]:40} {layer['features']:8,} features {layer['vertices']:10,} vertices"
+        )
+
+    print("\nLayers that might contain ward boundaries:")
+    for name in report["boundary_layers"]:
+        print(f"  {name}: {report['layers'][name]['features']} features")
+
+    labels = report["text_labels"]
+    print("\n" + "=" * 80)
+    print(f"Text labels: {labels['total']:,}")
+    print(f"  Tổ dân phố labels: {labels['to_dan_pho']:,}")
+    print(f"  Chi bộ labels:     {labels['chi_bo']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming GeoJSON profiler")
+    parser.add_argument("input_file", nargs="?", default="assets/maps/nhs.geojson")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--report", default="tools/geojson_profile.json")
+    parser.add_argument("--labels", default="tools/text_labels.json")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(
+        f"Profiling {args.input_file} ({os.path.getsize(args.input_file) / 1024 / 1024:.1f} MB)"
+    )
+    print("=" * 80)
+
+    start = time.perf_counter()
+    profile = profile_file(args.input_file, args.workers)
+    report = profile.to_dict()
+    report["file"] = args.input_file
+    report["seconds"] = round(time.perf_counter() - start, 3)
+
+    print_summary(report)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(args.labels, "w", encoding="utf-8") as f:
+        json.dump(profile.text_labels, f, ensure_ascii=False, indent=2)
+
+    print("\n" + "=" * 80)
+    print(f"Profile saved to:     {args.report}")
+    print(f"Text labels saved to: {args.labels}")
+    print(f"Done in {report['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
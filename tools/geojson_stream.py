@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Streaming GeoJSON reader with bounded memory.
+
+Đọc FeatureCollection theo từng khối byte, cắt ra từng feature mà không cần
+json.load cả file. Chỉ theo dõi chuỗi và dấu ngoặc nhọn, nên mảng toạ độ lớn
+được bỏ qua rất nhanh. Có thể chia file thành các khoảng byte để xử lý song song
+(yêu cầu mỗi feature bắt đầu bằng `{"type": "Feature"` như file GDAL/QGIS xuất).
+"""
+
+import json
+import os
+import re
+
+BLOCK_SIZE = 1 << 20
+
+# A string token (escapes included) or an object brace
+TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}]')
+SEPARATOR = re.compile(rb"[\s,]*")
+FEATURES_KEY = re.compile(rb"\s*:\s*\[")
+# Inside a JSON string every quote is escaped, so this only matches real objects
+FEATURE_START = re.compile(rb'\{\s*"type"\s*:\s*"Feature"\s*[,}]')
+
+
+def _find_features_array(f, block_size=BLOCK_SIZE):
+    """File offset just after the '[' of the top-level "features" array."""
+    f.seek(0)
+    buf = b""
+    while True:
+        chunk = f.read(block_size)
+        buf += chunk
+        depth = 0
+        pos = 0
+        while True:
+            m = TOKEN.search(buf, pos)
+            if m is None or buf.find(b'"', pos, m.start()) != -1:
+                break
+            tok = m.group()
+            pos = m.end()
+            if tok == b"{":
+                depth += 1
+            elif tok == b"}":
+                depth -= 1
+            elif depth == 1 and tok == b'"features"':
+                key = FEATURES_KEY.match(buf, pos)
+                if key:
+                    return key.end()
+                if pos + 64 >= len(buf):
+                    break  # ':' / '[' may be in the next block
+        if not chunk:
+            return None
+
+
+def iter_feature_bytes(path, start=None, end=None, block_size=BLOCK_SIZE):
+    """
+    Yield the raw bytes of each feature object.
+
+    Without `start`, reads the whole "features" array. With `start` (a feature
+    start offset, see split_ranges) yields features starting before `end`.
+    """
+    with open(path, "rb") as f:
+        if start is None:
+            start = _find_features_array(f, block_size)
+            if start is None:
+                return
+        f.seek(start)
+        buf = f.read(block_size)
+        base = start  # file offset of buf[0]
+        pos = 0
+        depth = 0
+        feature_start = 0
+
+        while True:
+            if depth == 0:
+                pos = SEPARATOR.match(buf, pos).end()
+                if pos >= len(buf):
+                    chunk = f.read(block_size)
+                    if not chunk:
+                        return
+                    base += pos
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    continue
+                if buf[pos : pos + 1] != b"{":
+                    return  # closing ']' of the features array
+                if end is not None and base + pos >= end:
+                    return
+                feature_start = pos
+                depth = 1
+                pos += 1
+                continue
+
+            m = TOKEN.search(buf, pos)
+            if m is None or buf.find(b'"', pos, m.start()) != -1:
+                # Token may straddle the block boundary: keep the feature, read more
+                chunk = f.read(block_size)
+                if not chunk:
+                    raise ValueError(f"Truncated GeoJSON at offset {base + pos}")
+                base += feature_start
+                pos -= feature_start
+                buf = buf[feature_start:] + chunk
+                feature_start = 0
+                continue
+
+            tok = m.group()
+            pos = m.end()
+            if tok == b"{":
+                depth += 1
+            elif tok == b"}":
+                depth -= 1
+                if depth == 0:
+                    yield buf[feature_start:pos]
+
+
+def iter_features(path, start=None, end=None, block_size=BLOCK_SIZE):
+    """Yield each feature as a dict (see iter_feature_bytes)."""
+    for raw in iter_feature_bytes(path, start, end, block_size):
+        yield json.loads(raw)
+
+
+def _find_feature_start(f, offset, block_size=BLOCK_SIZE):
+    """Offset of the first feature starting at or after `offset`."""
+    f.seek(offset)
+    window = b""
+    while True:
+        chunk = f.read(block_size)
+        if not chunk:
+            return None
+        window += chunk
+        m = FEATURE_START.search(window)
+        if m:
+            return offset + m.start()
+        # keep a small tail in case the pattern straddles blocks
+        keep = min(64, len(window))
+        offset += len(window) - keep
+        window = window[-keep:]
+
+
+def split_ranges(path, chunks, block_size=BLOCK_SIZE):
+    """
+    Split the features array into about `chunks` byte ranges [start, end),
+    each starting exactly at a feature. `end` is None for the last range.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        first = _find_features_array(f, block_size)
+        if first is None:
+            return []
+        f.seek(first)
+        head = f.read(block_size)
+        m = FEATURE_START.search(head)
+        if m is None:
+            return [(first, None)]
+        offsets = [first + m.start()]
+
+        for i in range(1, chunks):
+            found = _find_feature_start(
+                f, max(offsets[-1] + 1, size * i // chunks), block_size
+            )
+            if found is None:
+                break
+            offsets.append(found)
+
+    offsets = sorted(set(offsets))
+    return [(s, e) for s, e in zip(offsets, offsets[1:] + [None])]
+
+
+def flatten_coords(coords, out):
+    """Append every [x, y] pair of a nested coordinate array to `out` (flat)."""
+    if not coords:
+        return
+    if isinstance(coords[0], (int, float)):
+        if len(coords) >= 2:
+            out.append(coords[0])
+            out.append(coords[1])
+        return
+    for item in coords:
+        flatten_coords(item, out)
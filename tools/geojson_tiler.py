@@ -4,11 +4,20 @@ GeoJSON Tiler - Chia GeoJSON lớn thành các tiles nhỏ
 Dùng cho Flutter app để load on-demand theo zoom level
 """
 
+import argparse
 import json
 import os
 import math
+import subprocess
+import threading
+from array import array
 from collections import defaultdict
 
+import numpy as np
+
+from columnar_cache import geometry_parts
+from vn2000 import vn2000_to_wgs84_np
+
 # Try to use pyproj for accurate coordinate conversion
 try:
     from pyproj import (
@@ -33,41 +42,6 @@ def deg2num(lat, lon, zoom):
     return (xtile, ytile)
 
 
-def get_feature_bounds(feature):
-    """Get bounding box of a feature"""
-    coords = feature["geometry"]["coordinates"]
-    geom_type = feature["geometry"]["type"]
-
-    def flatten_coords(coords, depth=0):
-        """Flatten nested coordinate arrays"""
-        if not coords:
-            return []
-        if isinstance(coords[0], (int, float)):
-            return [coords]
-        result = []
-        for item in coords:
-            result.extend(flatten_coords(item, depth + 1))
-        return result
-
-    flat_coords = flatten_coords(coords)
-
-    if not flat_coords:
-        return None
-
-    lons = [c[0] for c in flat_coords if len(c) >= 2]
-    lats = [c[1] for c in flat_coords if len(c) >= 2]
-
-    if not lons or not lats:
-        return None
-
-    return {
-        "min_lon": min(lons),
-        "max_lon": max(lons),
-        "min_lat": min(lats),
-        "max_lat": max(lats),
-    }
-
-
 def convert_vn2000_to_wgs84(x, y):
     """
     Convert VN2000 TM-3 107-45 (EPSG:5899) to WGS84 (EPSG:4326)
@@ -132,90 +106,257 @@ def convert_coordinates(coords, depth=0):
     return [convert_coordinates(item, depth + 1) for item in coords]
 
 
-def simplify_feature(feature, tolerance=10):
-    """Simplify feature geometry by taking every Nth point"""
-    coords = feature["geometry"]["coordinates"]
-    geom_type = feature["geometry"]["type"]
-
-    def simplify_line(line):
-        if not line or len(line) <= 2:
-            return line
-        # Keep first, last, and every Nth point
-        result = [line[0]]
-        for i in range(tolerance, len(line) - 1, tolerance):
-            result.append(line[i])
-        if line[-1] != result[-1]:
-            result.append(line[-1])
-        return result
-
-    def simplify_coords(coords, depth=0):
-        if not coords:
-            return coords
-        if isinstance(coords[0], (int, float)):
-            return coords
-        if isinstance(coords[0][0], (int, float)):
-            return simplify_line(coords)
-        return [simplify_coords(item, depth + 1) for item in coords]
-
-    feature["geometry"]["coordinates"] = simplify_coords(coords)
-    return feature
-
-
-def tile_geojson(input_file, output_dir, max_zoom=16, simplify_tolerance=10):
+# Copies of a vertex closer than this (metres) share one projection
+VERTEX_QUANTUM = 0.001
+
+
+class VertexPool:
     """
-    Tile a large GeoJSON file into smaller tiles
+    Hash table of quantized VN-2000 vertices. Adjacent polygons and joined
+    polylines repeat the same vertices; each distinct vertex is projected once.
+    """
+
+    def __init__(self, quantum=VERTEX_QUANTUM):
+        self.quantum = quantum
+        self.index = {}
+        self.xs = array("d")
+        self.ys = array("d")
+        self.total = 0
+
+    def __len__(self):
+        return len(self.xs)
+
+    def add(self, x, y):
+        self.total += 1
+        key = (round(x / self.quantum), round(y / self.quantum))
+        vertex = self.index.get(key)
+        if vertex is None:
+            vertex = self.index[key] = len(self.xs)
+            self.xs.append(x)
+            self.ys.append(y)
+        return vertex
+
+    @property
+    def dedup_ratio(self):
+        return self.total / len(self) if len(self) else 1.0
+
+    def project(self):
+        """Project every unique vertex in one batch. Returns (lon, lat) arrays."""
+        xs = np.frombuffer(self.xs, dtype=np.float64)
+        ys = np.frombuffer(self.ys, dtype=np.float64)
+        if USE_PYPROJ:
+            return transformer.transform(xs, ys)
+        return vn2000_to_wgs84_np(xs, ys)
+
+
+class PropertyTable:
+    """Interns property dicts as shared tuples; equal properties share one object."""
+
+    def __init__(self):
+        self.table = {}
+
+    def intern(self, props):
+        props = props or {}
+        key = json.dumps(props, sort_keys=True, ensure_ascii=False)
+        return self.table.setdefault(key, tuple(props.items()))
+
+
+class Feature:
+    """
+    Compact tiler feature. Geometry is a flat (N, 3) lon/lat/z buffer with
+    part -> ring and ring -> vertex offsets (vertex ids until projected);
+    properties are an interned tuple. GeoJSON is only built when writing.
+    """
+
+    __slots__ = (
+        "geom_type",
+        "coords",
+        "ids",
+        "zs",
+        "part_rings",
+        "ring_vertices",
+        "props",
+    )
+
+    def __init__(self, geom_type, ids, zs, part_rings, ring_vertices, props):
+        self.geom_type = geom_type
+        self.ids = ids
+        self.zs = zs
+        self.coords = None
+        self.part_rings = part_rings
+        self.ring_vertices = ring_vertices
+        self.props = props
+
+    @classmethod
+    def from_geojson(cls, feature, pool, properties):
+        """Flatten a GeoJSON feature, interning its vertices in `pool`."""
+        geom = feature["geometry"]
+        geom_type = geom["type"]
+        ids = array("q")
+        zs = array("d")
+        part_rings = array("q", [0])
+        ring_vertices = array("q", [0])
+        for part in geometry_parts(geom):
+            for ring in part:
+                for coord in ring:
+                    if len(coord) < 2:
+                        raise ValueError(f"Invalid coordinate: {coord}")
+                    ids.append(pool.add(coord[0], coord[1]))
+                    zs.append(coord[2] if len(coord) > 2 else 0)
+                ring_vertices.append(len(ids))
+            part_rings.append(len(ring_vertices) - 1)
+        if not ids:
+            raise ValueError(f"Empty {geom_type} geometry")
+        return cls(
+            geom_type,
+            ids,
+            zs,
+            part_rings,
+            ring_vertices,
+            properties.intern(feature.get("properties")),
+        )
+
+    def project(self, lon, lat):
+        """Gather projected vertices into the flat coordinate buffer."""
+        ids = np.frombuffer(self.ids, dtype=np.int64)
+        self.coords = np.column_stack(
+            [lon[ids], lat[ids], np.frombuffer(self.zs, dtype=np.float64)]
+        )
+        self.ids = self.zs = None
+
+    def simplify(self, tolerance):
+        """Keep first, last and every Nth vertex of each line / ring."""
+        if tolerance <= 1 or self.geom_type in ("Point", "MultiPoint"):
+            return
+        offsets = np.frombuffer(self.ring_vertices, dtype=np.int64)
+        counts = np.diff(offsets)
+        pos = np.arange(len(self.coords)) - np.repeat(offsets[:-1], counts)
+        n = np.repeat(counts, counts)
+        keep = (n <= 2) | (pos % tolerance == 0) | (pos == n - 1)
+        ring = np.repeat(np.arange(len(counts)), counts)
+        kept = np.bincount(ring[keep], minlength=len(counts))
+        if self.geom_type in ("Polygon", "MultiPolygon"):
+            # Never reduce a ring below a valid polygon
+            small = kept < 4
+            keep |= small[ring]
+            kept = np.where(small, counts, kept)
+        self.coords = self.coords[keep]
+        self.ring_vertices = array("q", [0, *np.cumsum(kept).tolist()])
+
+    def bounds(self):
+        (min_lon, min_lat), (max_lon, max_lat) = (
+            self.coords[:, :2].min(axis=0),
+            self.coords[:, :2].max(axis=0),
+        )
+        return min_lon, min_lat, max_lon, max_lat
+
+    @property
+    def nbytes(self):
+        return self.coords.nbytes + 8 * (len(self.part_rings) + len(self.ring_vertices))
+
+    def to_geojson(self):
+        parts = []
+        for p in range(len(self.part_rings) - 1):
+            rings = []
+            for r in range(self.part_rings[p], self.part_rings[p + 1]):
+                start, end = self.ring_vertices[r], self.ring_vertices[r + 1]
+                rings.append(self.coords[start:end].tolist())
+            parts.append(rings)
+        if self.geom_type == "Point":
+            coords = parts[0][0][0]
+        elif self.geom_type == "LineString":
+            coords = parts[0][0]
+        elif self.geom_type == "Polygon":
+            coords = parts[0]
+        elif self.geom_type == "MultiPoint":
+            coords = [part[0][0] for part in parts]
+        elif self.geom_type == "MultiLineString":
+            coords = [part[0] for part in parts]
+        else:
+            coords = parts
+        return {
+            "type": "Feature",
+            "properties": dict(self.props),
+            "geometry": {"type": self.geom_type, "coordinates": coords},
+        }
+
+
+def load_features(input_file):
+    """
+    Read and flatten a VN-2000 GeoJSON file. Returns (features, properties,
+    lon, lat): unique vertices are already projected, features are not yet.
     """
     print(f"Loading GeoJSON from {input_file}...")
 
     with open(input_file, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    features = data.get("features", [])
-    total = len(features)
+    total = len(data.get("features", []))
     print(f"Found {total} features")
 
+    # Flatten features, interning vertices (shared CAD vertices are
+    # projected only once) and properties
+    print("Interning vertices...")
+    pool = VertexPool()
+    properties = PropertyTable()
+    features = []
+    for i, feature in enumerate(data.get("features", [])):
+        try:
+            features.append(Feature.from_geojson(feature, pool, properties))
+        except Exception as e:
+            print(f"Error converting feature {i}: {e}")
+    data = None  # drop the nested dicts, only flat buffers remain
+
+    print(
+        f"Vertices: {pool.total:,} total, {len(pool):,} unique "
+        f"(dedup ratio {pool.dedup_ratio:.2f}x)"
+    )
+    lon, lat = pool.project()
+    return features, properties, lon, lat
+
+
+def tile_geojson(
+    input_file, output_dir, max_zoom=16, simplify_tolerance=10, min_zoom=12
+):
+    """
+    Tile a large GeoJSON file into smaller tiles
+    """
+    features, properties, lon, lat = load_features(input_file)
+    total = len(features)
+
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
 
     # Group features by tile
     tiles = defaultdict(list)
-    converted_count = 0
 
     print("Converting coordinates and tiling...")
     for i, feature in enumerate(features):
         if i % 1000 == 0:
             print(f"Processing feature {i}/{total}...")
 
-        # Convert VN2000 to WGS84
-        try:
-            feature["geometry"]["coordinates"] = convert_coordinates(
-                feature["geometry"]["coordinates"]
-            )
-            converted_count += 1
-        except Exception as e:
-            print(f"Error converting feature {i}: {e}")
-            continue
-
-        # Simplify geometry
-        feature = simplify_feature(feature, simplify_tolerance)
-
-        # Get feature bounds
-        bounds = get_feature_bounds(feature)
-        if not bounds:
-            continue
+        # Convert VN2000 to WGS84, then simplify
+        feature.project(lon, lat)
+        feature.simplify(simplify_tolerance)
 
         # Calculate center point
-        center_lat = (bounds["min_lat"] + bounds["max_lat"]) / 2
-        center_lon = (bounds["min_lon"] + bounds["max_lon"]) / 2
+        min_lon, min_lat, max_lon, max_lat = feature.bounds()
+        center_lat = (min_lat + max_lat) / 2
+        center_lon = (min_lon + max_lon) / 2
 
         # Assign to tiles at different zoom levels
-        for zoom in range(12, max_zoom + 1):
+        for zoom in range(min_zoom, max_zoom + 1):
             x, y = deg2num(center_lat, center_lon, zoom)
             tile_key = f"{zoom}/{x}/{y}"
             tiles[tile_key].append(feature)
 
+    converted_count = len(features)
     print(f"\nConverted {converted_count} features")
     print(f"Created {len(tiles)} tiles")
+    print(
+        f"Geometry buffers: {sum(f.nbytes for f in features) / 1024 / 1024:.2f} MB, "
+        f"{len(properties.table):,} distinct property sets"
+    )
 
     # Write tiles
     print("\nWriting tiles...")
@@ -228,10 +369,12 @@ def tile_geojson(input_file, output_dir, max_zoom=16, simplify_tolerance=10):
         tile_dir = os.path.join(output_dir, zoom, x)
         os.makedirs(tile_dir, exist_ok=True)
 
-        # Write tile
+        # Write tile (GeoJSON is only materialized here)
         tile_file = os.path.join(tile_dir, f"{y}.json")
-        tile_data = {"type": "FeatureCollection", "features": tile_features}
-
+        tile_data = {
+            "type": "FeatureCollection",
+            "features": [feature.to_geojson() for feature in tile_features],
+        }
         with open(tile_file, "w", encoding="utf-8") as f:
             json.dump(tile_data, f, separators=(",", ":"))
 
@@ -253,16 +396,150 @@ def tile_geojson(input_file, output_dir, max_zoom=16, simplify_tolerance=10):
     print(f"   Total size: {total_size / 1024 / 1024:.2f} MB")
 
 
+def _feed_geojsonseq(features, lon, lat, simplify_tolerance, stdin, errors):
+    """Project features and write them as GeoJSONSeq into tippecanoe's stdin."""
+    try:
+        for feature in features:
+            feature.project(lon, lat)
+            feature.simplify(simplify_tolerance)
+            line = json.dumps(
+                feature.to_geojson(), ensure_ascii=False, separators=(",", ":")
+            )
+            stdin.write(line.encode("utf-8") + b"\n")
+    except BrokenPipeError:
+        pass  # tippecanoe exited early, its return code tells why
+    except Exception as e:
+        errors.append(e)
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def tile_with_tippecanoe(
+    input_file,
+    output_path,
+    min_zoom=12,
+    max_zoom=16,
+    simplify_tolerance=0,
+    executable="tippecanoe",
+    layer=None,
+    extra_args=(),
+    on_progress=None,
+):
+    """
+    Tile with a local tippecanoe instead of the Python tiler.
+
+    Features still go through the interning / projection (and optional
+    simplification) above, then stream as GeoJSONSeq through a pipe into
+    tippecanoe - no intermediate file. Returns the MBTiles path.
+    """
+    features, _, lon, lat = load_features(input_file)
+    layer = layer or os.path.splitext(os.path.basename(input_file))[0]
+    command = [
+        executable,
+        "-o",
+        output_path,
+        "--force",
+        "--layer",
+        layer,
+        "--minimum-zoom",
+        str(min_zoom),
+        "--maximum-zoom",
+        str(max_zoom),
+        "--json-progress",
+        "--progress-interval",
+        "1",
+        *extra_args,
+    ]
+    print(f"Running: {' '.join(command)}")
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Feed from a thread so stderr keeps draining while tippecanoe reads
+    errors = []
+    feeder = threading.Thread(
+        target=_feed_geojsonseq,
+        args=(features, lon, lat, simplify_tolerance, proc.stdin, errors),
+        daemon=True,
+    )
+    feeder.start()
+
+    messages = []
+    for line in proc.stderr:
+        text = line.decode("utf-8", "replace").strip()
+        try:
+            progress = json.loads(text)
+        except ValueError:
+            progress = None
+        if isinstance(progress, dict) and "progress" in progress:
+            if on_progress:
+                on_progress(progress["progress"])
+            else:
+                print(f"  tippecanoe: {progress['progress']:5.1f}%")
+        elif text:
+            messages.append(text)
+    proc.wait()
+    proc.stderr.close()
+    feeder.join()
+
+    if errors:
+        raise errors[0]
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"tippecanoe exited with status {proc.returncode}: "
+            + "\n".join(messages[-10:])
+        )
+    print(f"\n✅ MBTiles written: {output_path}")
+    print(f"   Size: {os.path.getsize(output_path) / 1024 / 1024:.2f} MB")
+    return output_path
+
+
 if __name__ == "__main__":
-    input_file = r"d:\NHS_APP\assets\maps\nhs.geojson"
-    output_dir = r"d:\NHS_APP\assets\maps\tiles"
+    parser = argparse.ArgumentParser(description="GeoJSON Tiler for Flutter")
+    parser.add_argument(
+        "input_file", nargs="?", default=r"d:\NHS_APP\assets\maps\nhs.geojson"
+    )
+    parser.add_argument(
+        "output",
+        nargs="?",
+        help="tile directory (python) or .mbtiles file (tippecanoe)",
+    )
+    parser.add_argument("--backend", choices=("python", "tippecanoe"), default="python")
+    parser.add_argument("--min-zoom", type=int, default=12)
+    parser.add_argument("--max-zoom", type=int, default=16)
+    parser.add_argument("--simplify", type=int, default=None)
+    parser.add_argument("--tippecanoe", default="tippecanoe", help="executable")
+    parser.add_argument(
+        "--tippecanoe-arg",
+        action="append",
+        default=[],
+        help="extra tippecanoe argument (repeatable)",
+    )
+    args = parser.parse_args()
 
     print("=" * 60)
     print("GeoJSON Tiler for Flutter")
     print("=" * 60)
 
-    tile_geojson(
-        input_file=input_file, output_dir=output_dir, max_zoom=16, simplify_tolerance=10
-    )
+    if args.backend == "tippecanoe":
+        tile_with_tippecanoe(
+            input_file=args.input_file,
+            output_path=args.output
+            or os.path.splitext(args.input_file)[0] + ".mbtiles",
+            min_zoom=args.min_zoom,
+            max_zoom=args.max_zoom,
+            simplify_tolerance=args.simplify or 0,  # tippecanoe simplifies per zoom
+            executable=args.tippecanoe,
+            extra_args=args.tippecanoe_arg,
+        )
+    else:
+        tile_geojson(
+            input_file=args.input_file,
+            output_dir=args.output or r"d:\NHS_APP\assets\maps\tiles",
+            max_zoom=args.max_zoom,
+            min_zoom=args.min_zoom,
+            simplify_tolerance=10 if args.simplify is None else args.simplify,
+        )
 
     print("\n🎉 Done! You can now use the tiles in your Flutter app.")
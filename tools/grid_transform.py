@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Grid transform VN-2000 -> WGS84 cho vùng Ngũ Hành Sơn / Đà Nẵng.
+
+Lấy mẫu phép chuyển đổi chính xác (pyproj hoặc kernel NumPy trong vn2000.py)
+trên một lưới đều phủ vùng nghiên cứu, lưu thành file .npz nhỏ gọn rồi nội suy
+song tuyến (bilinear) vector hoá. Nhanh hơn pyproj nhiều lần, sai số dưới 1 mm.
+
+Lưu trữ:
+  - phần affine (lon/lat = c0 + c1*dE + c2*dN) bằng float64
+  - phần dư phi tuyến tại các nút lưới bằng float32 (biên độ ~1e-5°,
+    sai số lượng tử hoá ~1e-12°, không đáng kể)
+
+Sai số nội suy song tuyến bị chặn bởi
+    |f - I f| <= hx²/8 * max|f_xx| + hy²/8 * max|f_yy|
+đạo hàm bậc hai được ước lượng bằng sai phân trên chính lưới mẫu.
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+
+from vn2000 import (
+    A,
+    STUDY_AREA,
+    degrees_to_metres,
+    vn2000_to_wgs84_exact,
+    vn2000_to_wgs84_np,
+)
+
+DEFAULT_GRID_FILE = os.path.join(os.path.dirname(__file__), "vn2000_grid.npz")
+DEFAULT_TOLERANCE = 0.0005  # metres
+SAFETY_FACTOR = 1.25
+M_PER_DEG = math.pi * A / 180
+
+
+class GridTransform:
+    """Bilinear-interpolated VN-2000 -> WGS84 transform over a regular grid."""
+
+    def __init__(
+        self, origin, step, affine_lon, affine_lat, res_lon, res_lat, error_bound=None
+    ):
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.step = float(step)
+        self.affine_lon = np.asarray(affine_lon, dtype=np.float64)
+        self.affine_lat = np.asarray(affine_lat, dtype=np.float64)
+        self.res_lon = np.asarray(res_lon, dtype=np.float32)
+        self.res_lat = np.asarray(res_lat, dtype=np.float32)
+        self.error_bound = error_bound
+        self.shape = self.res_lon.shape  # (rows=northing, cols=easting)
+
+    @property
+    def bbox(self):
+        rows, cols = self.shape
+        e0, n0 = self.origin
+        return (e0, n0, e0 + (cols - 1) * self.step, n0 + (rows - 1) * self.step)
+
+    def contains(self, easting, northing):
+        min_e, min_n, max_e, max_n = self.bbox
+        return (
+            (easting >= min_e)
+            & (easting <= max_e)
+            & (northing >= min_n)
+            & (northing <= max_n)
+        )
+
+    def transform(self, easting, northing):
+        """
+        Transform VN-2000 arrays to WGS84 (lon, lat) degrees.
+        Points outside the grid fall back to the exact NumPy kernel.
+        """
+        easting = np.asarray(easting, dtype=np.float64)
+        northing = np.asarray(northing, dtype=np.float64)
+        lon = np.empty(np.broadcast(easting, northing).shape)
+        lat = np.empty_like(lon)
+        easting, northing = np.broadcast_arrays(easting, northing)
+
+        inside = self.contains(easting, northing)
+        if inside.all():
+            lon[...], lat[...] = self._interpolate(easting, northing)
+        else:
+            lon[inside], lat[inside] = self._interpolate(
+                easting[inside], northing[inside]
+            )
+            outside = ~inside
+            lon[outside], lat[outside] = vn2000_to_wgs84_np(
+                easting[outside], northing[outside]
+            )
+        return lon, lat
+
+    def _interpolate(self, easting, northing):
+        rows, cols = self.shape
+        de = easting - self.origin[0]
+        dn = northing - self.origin[1]
+        fx = de / self.step
+        fy = dn / self.step
+        ix = np.clip(fx.astype(np.intp), 0, cols - 2)
+        iy = np.clip(fy.astype(np.intp), 0, rows - 2)
+        tx = fx - ix
+        ty = fy - iy
+
+        idx = iy * cols + ix
+
+        def bilinear(grid):
+            flat = grid.ravel()
+            g00 = flat.take(idx)
+            g01 = flat.take(idx + 1)
+            g10 = flat.take(idx + cols)
+            g11 = flat.take(idx + cols + 1)
+            return (g00 * (1 - tx) + g01 * tx) * (1 - ty) + (
+                g10 * (1 - tx) + g11 * tx
+            ) * ty
+
+        lon = _affine(self.affine_lon, de, dn) + bilinear(self.res_lon)
+        lat = _affine(self.affine_lat, de, dn) + bilinear(self.res_lat)
+        return lon, lat
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            origin=np.array(self.origin),
+            step=np.array(self.step),
+            affine_lon=self.affine_lon,
+            affine_lat=self.affine_lat,
+            res_lon=self.res_lon,
+            res_lat=self.res_lat,
+            error_bound=np.array(
+                np.nan if self.error_bound is None else self.error_bound
+            ),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            bound = float(data["error_bound"])
+            return cls(
+                data["origin"],
+                float(data["step"]),
+                data["affine_lon"],
+                data["affine_lat"],
+                data["res_lon"],
+                data["res_lat"],
+                error_bound=None if math.isnan(bound) else bound,
+            )
+
+
+def _affine(coeffs, de, dn):
+    return coeffs[0] + coeffs[1] * de + coeffs[2] * dn
+
+
+def _sample(bbox, step, exact):
+    min_e, min_n, max_e, max_n = bbox
+    cols = int(math.ceil((max_e - min_e) / step)) + 1
+    rows = int(math.ceil((max_n - min_n) / step)) + 1
+    de, dn = np.meshgrid(np.arange(cols) * step, np.arange(rows) * step)
+    lon, lat = exact(min_e + de, min_n + dn)
+    return de, dn, np.asarray(lon), np.asarray(lat)
+
+
+def _second_derivative_bound(lon, lat, step):
+    """Max |f_xx|, |f_yy| (in metres per metre²) from second differences."""
+    lat0 = np.radians(lat.min())
+    lon_m = lon * M_PER_DEG * math.cos(lat0)
+    lat_m = lat * M_PER_DEG
+    fxx = fyy = 0.0
+    for grid in (lon_m, lat_m):
+        fxx = max(fxx, np.abs(np.diff(grid, 2, axis=1)).max() / step**2)
+        fyy = max(fyy, np.abs(np.diff(grid, 2, axis=0)).max() / step**2)
+    return fxx, fyy
+
+
+def _bound(fxx, fyy, step):
+    # Two components (lon, lat) each bounded by h²/8 (fxx + fyy)
+    return math.sqrt(2) * step**2 / 8 * (fxx + fyy) * SAFETY_FACTOR
+
+
+def choose_step(
+    bbox=STUDY_AREA, tolerance=DEFAULT_TOLERANCE, exact=vn2000_to_wgs84_exact
+):
+    """Largest grid step (rounded down to 10 m) whose error bound fits `tolerance`."""
+    _, _, lon, lat = _sample(bbox, 1000.0, exact)
+    fxx, fyy = _second_derivative_bound(lon, lat, 1000.0)
+    step = math.sqrt(8 * tolerance / (math.sqrt(2) * (fxx + fyy) * SAFETY_FACTOR))
+    return max(10.0, math.floor(step / 10) * 10)
+
+
+def build_grid(
+    bbox=STUDY_AREA, step=None, tolerance=DEFAULT_TOLERANCE, exact=vn2000_to_wgs84_exact
+):
+    """
+    Sample `exact` on a regular lattice covering `bbox` (VN-2000 metres).
+    Returns (GridTransform, report dict).
+    """
+    if step is None:
+        step = choose_step(bbox, tolerance, exact)
+
+    de, dn, lon, lat = _sample(bbox, step, exact)
+
+    # Affine part in float64, non-linear residual in float32
+    design = np.column_stack([np.ones(de.size), de.ravel(), dn.ravel()])
+    affine_lon = np.linalg.lstsq(design, lon.ravel(), rcond=None)[0]
+    affine_lat = np.linalg.lstsq(design, lat.ravel(), rcond=None)[0]
+    res_lon = (lon - _affine(affine_lon, de, dn)).astype(np.float32)
+    res_lat = (lat - _affine(affine_lat, de, dn)).astype(np.float32)
+
+    quant_lon = np.abs(
+        res_lon.astype(np.float64) - (lon - _affine(affine_lon, de, dn))
+    ).max()
+    quant_lat = np.abs(
+        res_lat.astype(np.float64) - (lat - _affine(affine_lat, de, dn))
+    ).max()
+    quant_m = float(degrees_to_metres(quant_lon, quant_lat, lat.min()))
+
+    fxx, fyy = _second_derivative_bound(lon, lat, step)
+    bound = _bound(fxx, fyy, step) + quant_m
+
+    grid = GridTransform(
+        (bbox[0], bbox[1]), step, affine_lon, affine_lat, res_lon, res_lat, bound
+    )
+
+    # Bilinear error peaks at cell centres: measure it there
+    cy, cx = de.shape[0] - 1, de.shape[1] - 1
+    ce = grid.origin[0] + (np.arange(cx) + 0.5) * step
+    cn = grid.origin[1] + (np.arange(cy) + 0.5) * step
+    ce, cn = np.meshgrid(ce, cn)
+    ref_lon, ref_lat = exact(ce, cn)
+    got_lon, got_lat = grid.transform(ce, cn)
+    measured = float(
+        degrees_to_metres(got_lon - ref_lon, got_lat - ref_lat, ref_lat).max()
+    )
+
+    report = {
+        "bbox": list(grid.bbox),
+        "step_m": step,
+        "shape": list(grid.shape),
+        "nodes": int(res_lon.size),
+        "error_bound_m": bound,
+        "measured_max_error_m": measured,
+        "quantization_error_m": quant_m,
+        "residual_max_deg": float(max(np.abs(res_lon).max(), np.abs(res_lat).max())),
+    }
+    if measured > bound:
+        raise ValueError(f"Measured error {measured:.6f} m exceeds bound {bound:.6f} m")
+    return grid, report
+
+
+def load_grid(path=DEFAULT_GRID_FILE):
+    """Load a saved grid, or None if the file does not exist."""
+    if not os.path.exists(path):
+        return None
+    return GridTransform.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build VN-2000 -> WGS84 interpolation grid"
+    )
+    parser.add_argument(
+        "--bbox",
+        type=float,
+        nargs=4,
+        default=STUDY_AREA,
+        metavar=("MIN_E", "MIN_N", "MAX_E", "MAX_N"),
+    )
+    parser.add_argument(
+        "--step",
+        type=float,
+        default=None,
+        help="grid step in metres (auto from tolerance)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="target max error in metres",
+    )
+    parser.add_argument("--output", default=DEFAULT_GRID_FILE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VN-2000 -> WGS84 grid transform builder")
+    print("=" * 60)
+
+    grid, report = build_grid(tuple(args.bbox), args.step, args.tolerance)
+    grid.save(args.output)
+
+    print(f"Bbox (VN-2000):     {report['bbox']}")
+    print(f"Step:               {report['step_m']:.0f} m")
+    print(
+        f"Grid:               {report['shape'][0]} x {report['shape'][1]} ({report['nodes']:,} nodes)"
+    )
+    print(f"Error bound:        {report['error_bound_m'] * 1000:.3f} mm")
+    print(f"Measured max error: {report['measured_max_error_m'] * 1000:.3f} mm")
+    print(
+        f"File:               {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)"
+    )
+    print("\n✅ Grid transform ready")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Aggregate household statistics (scripts/So_ho.xlsx) onto the tổ dân phố polygons.
+
+Bước tổng hợp offline để app tô màu bản đồ mà không phải tự cộng dồn:
+  1. stream workbook số hộ (openpyxl read_only), tìm cột theo tiêu đề
+  2. group-by vector hoá (np.unique + np.bincount) theo tổ dân phố và chi bộ
+  3. ghép với ranh giới tổ trong 260to.geojson; diện tích tính trong VN-2000
+     (mét), mật độ = hộ / km², nhân khẩu / km²
+  4. chia mật độ hộ thành các lớp theo phân vị (thuộc tính "class")
+  5. ghi layer choropleth nhẹ: chỉ polygon + thống kê, toạ độ làm tròn, và
+     tile {z}/{x}/{y}.json (polygon vào mọi tile mà bbox của nó chạm tới)
+
+Cột "Số hộ" dùng số do TDP báo cáo (Công văn 603), nếu trống thì lấy số cũ.
+
+Usage:
+    python tools/household_choropleth.py
+    python tools/household_choropleth.py --level chi_bo --output-dir assets/maps/choropleth_chi_bo
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    print("❌ openpyxl not found. Install with: pip install openpyxl")
+    sys.exit(1)
+
+from geojson_tiler import deg2num
+from label_join import classify
+from polygon_index import feature_polygons, ring_area
+from vn2000 import wgs84_to_vn2000_np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOK = os.path.join(ROOT, "scripts", "So_ho.xlsx")
+POLYGON_FILE = os.path.join(ROOT, "assets", "maps", "260to.geojson")
+
+CLASSES = 5
+MIN_ZOOM = 12
+MAX_ZOOM = 16
+DECIMALS = 6
+
+# header substring -> column
+COLUMNS = {
+    "name": "tổ dân phố",
+    "households_old": "(cũ)",
+    "households_reported": "báo cáo",
+    "population": "nhân khẩu",
+}
+TDP_NUMBER = re.compile(r"(?:số\s*)?0*(\d+\w*)\s*$", re.I)
+
+
+def find_columns(row):
+    headers = [" ".join(str(v).split()).lower() if v is not None else "" for v in row]
+    columns = {}
+    for key, needle in COLUMNS.items():
+        columns[key] = next((i for i, h in enumerate(headers) if needle in h), None)
+    return columns if columns["name"] is not None else None
+
+
+def _number(value):
+    """Cell value as float; blanks and formulas ("=SUM(...)") are NaN."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().replace(",", ""))
+        except ValueError:
+            pass
+    return np.nan
+
+
+def read_households(path=WORKBOOK):
+    """Stream the workbook into column arrays keyed by tổ name ("Tổ 12")."""
+    names, old, reported, population = [], [], [], []
+    skipped = []
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        columns = None
+        for row_number, row in enumerate(
+            workbook.worksheets[0].iter_rows(values_only=True), 1
+        ):
+            if columns is None:
+                columns = find_columns(row)
+                continue
+            label = row[columns["name"]] if columns["name"] < len(row) else None
+            m = TDP_NUMBER.search(str(label or ""))
+            if not m:
+                if label:
+                    skipped.append(f"{row_number}: {label}")  # totals row
+                continue
+            values = {
+                key: _number(row[i]) if i is not None and i < len(row) else np.nan
+                for key, i in columns.items()
+                if key != "name"
+            }
+            names.append(f"Tổ {m.group(1)}")
+            old.append(values["households_old"])
+            reported.append(values["households_reported"])
+            population.append(values["population"])
+    finally:
+        workbook.close()
+    old = np.array(old, dtype=np.float64)
+    reported = np.array(reported, dtype=np.float64)
+    return {
+        "name": np.array(names, dtype=object),
+        "households": np.where(np.isnan(reported), old, reported),
+        "households_old": old,
+        "population": np.array(population, dtype=np.float64),
+    }, skipped
+
+
+def group_sum(keys, table):
+    """Vectorized group-by: unique keys and per-key sums of every column."""
+    unique, inverse = np.unique(keys.astype(str), return_inverse=True)
+    sums = {}
+    for column, values in table.items():
+        if column == "name":
+            continue
+        present = ~np.isnan(values)
+        sums[column] = np.bincount(
+            inverse[present], weights=values[present], minlength=len(unique)
+        )
+        sums[f"{column}_missing"] = np.bincount(
+            inverse[~present], minlength=len(unique)
+        )
+    sums["rows"] = np.bincount(inverse, minlength=len(unique))
+    return unique, sums
+
+
+def load_boundaries(path=POLYGON_FILE):
+    """Tổ polygons (lon/lat) from the closed boundary lines, and tổ -> chi bộ."""
+    with open(path, "r", encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+    polygons = defaultdict(list)
+    votes = defaultdict(Counter)
+    for feature in features:
+        props = feature.get("properties") or {}
+        kind, name = classify(str(props.get("ToDP") or ""))
+        if kind != "ToDP":
+            continue
+        if props.get("ChiBo"):
+            votes[name][" ".join(str(props["ChiBo"]).split())] += 1
+        polygons[name].extend(feature_polygons(feature))
+    chi_bo = {name: counter.most_common(1)[0][0] for name, counter in votes.items()}
+    return {name: rings for name, rings in polygons.items() if rings}, chi_bo
+
+
+def projected_area_km2(polygons):
+    """Area of lon/lat polygons, measured in VN-2000 metres."""
+    total = 0.0
+    for rings in polygons:
+        for i, ring in enumerate(rings):
+            x, y = wgs84_to_vn2000_np(ring[:, 0], ring[:, 1])
+            area = abs(ring_area(np.column_stack([x, y])))
+            total += area if i == 0 else -area  # holes
+    return total / 1e6
+
+
+def quantile_breaks(values, classes=CLASSES):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return []
+    return np.unique(np.quantile(values, np.linspace(0, 1, classes + 1)[1:-1])).tolist()
+
+
+def aggregate(table, polygons, chi_bo, level="to"):
+    """Per-unit features with counts, area and densities. Returns (features, report)."""
+    if level == "chi_bo":
+        keys = np.array([chi_bo.get(n, "") for n in table["name"]], dtype=object)
+        members = defaultdict(list)
+        for name, unit in chi_bo.items():
+            members[unit].append(name)
+        unit_polygons = {
+            unit: [p for name in names for p in polygons.get(name, [])]
+            for unit, names in members.items()
+        }
+    else:
+        keys = table["name"]
+        unit_polygons = polygons
+
+    units, sums = group_sum(keys, table)
+    # Densities only count tổ that have a boundary, so a chi bộ that is partly
+    # drawn is not divided by the area of its mapped tổ alone
+    drawn = np.array([name in polygons for name in table["name"]])
+    _, drawn_sums = group_sum(
+        keys,
+        {c: np.where(drawn, table[c], np.nan) for c in ("households", "population")},
+    )
+    areas = np.array(
+        [projected_area_km2(unit_polygons.get(u, [])) for u in units], dtype=np.float64
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        household_density = np.where(
+            areas > 0, drawn_sums["households"] / areas, np.nan
+        )
+        population_density = np.where(
+            areas > 0, drawn_sums["population"] / areas, np.nan
+        )
+    breaks = quantile_breaks(household_density)
+    classes = np.searchsorted(breaks, household_density, side="right")
+
+    features = []
+    for i, unit in enumerate(units):
+        if not unit or areas[i] <= 0:
+            continue
+        props = {
+            "name": unit,
+            "households": int(sums["households"][i]),
+            "households_old": int(sums["households_old"][i]),
+            "population": int(sums["population"][i]),
+            "area_km2": round(float(areas[i]), 4),
+            "household_density": round(float(household_density[i]), 1),
+            "population_density": round(float(population_density[i]), 1),
+            "class": int(classes[i]),
+        }
+        if level == "to":
+            props["ChiBo"] = chi_bo.get(unit)
+        if sums["population_missing"][i] or sums["households_missing"][i]:
+            props["incomplete"] = True
+        rings = unit_polygons[unit]
+        geometry = {
+            "type": "MultiPolygon" if len(rings) > 1 else "Polygon",
+            "coordinates": [
+                [np.round(ring, DECIMALS).tolist() for ring in polygon]
+                for polygon in rings
+            ],
+        }
+        if len(rings) == 1:
+            geometry["coordinates"] = geometry["coordinates"][0]
+        features.append({"type": "Feature", "properties": props, "geometry": geometry})
+
+    known = set(table["name"])
+    report = {
+        "rows": len(table["name"]),
+        "units": len(units),
+        "mapped": len(features),
+        "without_polygon": sorted(
+            (u for u, a in zip(units, areas) if u and a <= 0), key=_tdp_order
+        ),
+        "without_households": sorted(set(polygons) - known, key=_tdp_order),
+        "breaks": [round(b, 1) for b in breaks],
+    }
+    return features, report
+
+
+def _tdp_order(name):
+    m = re.search(r"\d+", name)
+    return (int(m.group()) if m else sys.maxsize, name)
+
+
+def _bbox(geometry):
+    coords = geometry["coordinates"]
+    polygons = coords if geometry["type"] == "MultiPolygon" else [coords]
+    flat = np.concatenate([np.asarray(r)[:, :2] for p in polygons for r in p])
+    return flat.min(axis=0).tolist() + flat.max(axis=0).tolist()
+
+
+def write_tiles(features, output_dir, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """{z}/{x}/{y}.json tiles; each polygon goes into every tile its bbox touches."""
+    tiles = defaultdict(list)
+    for feature in features:
+        min_lon, min_lat, max_lon, max_lat = _bbox(feature["geometry"])
+        for zoom in range(min_zoom, max_zoom + 1):
+            x0, y0 = deg2num(max_lat, min_lon, zoom)
+            x1, y1 = deg2num(min_lat, max_lon, zoom)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    tiles[(zoom, x, y)].append(feature)
+
+    index = {}
+    for (zoom, x, y), tile_features in tiles.items():
+        tile_dir = os.path.join(output_dir, str(zoom), str(x))
+        os.makedirs(tile_dir, exist_ok=True)
+        tile_file = os.path.join(tile_dir, f"{y}.json")
+        with open(tile_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"type": "FeatureCollection", "features": tile_features},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        index[f"{zoom}/{x}/{y}"] = {
+            "features": len(tile_features),
+            "size": os.path.getsize(tile_file),
+        }
+    with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Household choropleth layer")
+    parser.add_argument("--workbook", default=WORKBOOK)
+    parser.add_argument("--polygons", default=POLYGON_FILE)
+    parser.add_argument("--level", choices=("to", "chi_bo"), default="to")
+    parser.add_argument(
+        "--output-dir", default=os.path.join(ROOT, "assets", "maps", "choropleth")
+    )
+    parser.add_argument("--min-zoom", type=int, default=MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=MAX_ZOOM)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("HOUSEHOLD STATISTICS -> CHOROPLETH")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    table, skipped = read_households(args.workbook)
+    polygons, chi_bo = load_boundaries(args.polygons)
+    features, report = aggregate(table, polygons, chi_bo, args.level)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    layer_file = os.path.join(args.output_dir, f"households_{args.level}.geojson")
+    with open(layer_file, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "type": "FeatureCollection",
+                "breaks": report["breaks"],
+                "features": features,
+            },
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    index = write_tiles(features, args.output_dir, args.min_zoom, args.max_zoom)
+
+    print(f"Workbook rows:          {report['rows']:,} ({len(skipped)} skipped)")
+    print(f"{f'Units ({args.level}):':24}{report['units']:,}")
+    print(f"  with polygon:         {report['mapped']:,}")
+    print(f"  without polygon:      {len(report['without_polygon']):,}")
+    print(f"Polygons w/o households: {len(report['without_households']):,}")
+    print(f"Density breaks (hộ/km²): {report['breaks']}")
+    missing = report["without_polygon"]
+    if missing:
+        more = f" (+{len(missing) - 20} more)" if len(missing) > 20 else ""
+        print(f"⚠️ No boundary: {', '.join(missing[:20])}{more}")
+    print(f"\n✅ Layer saved to: {layer_file}")
+    print(
+        f"   {len(index):,} tiles, "
+        f"{sum(t['size'] for t in index.values()) / 1024:.1f} KB"
+    )
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
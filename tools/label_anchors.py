@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Precompute label anchor points (pole of inaccessibility) per polygon and zoom.
+
+Với mỗi polygon (ranh giới tổ trong 260to.geojson, polygon phường, ...):
+  - tìm "pole of inaccessibility" kiểu polylabel: tìm kiếm ô theo hàng đợi
+    ưu tiên (heapq), khoảng cách tới biên tính vector hoá bằng NumPy
+  - ghi khoảng cách tới biên (mét, trong hệ VN-2000)
+  - suy ra zoom nhỏ nhất mà nhãn vừa trong polygon
+rồi ghi một layer điểm nhỏ cho từng zoom (labels/{z}.geojson), để app không phải
+tự tính tâm hay đọc geometry đầy đủ chỉ để đặt chữ.
+
+Usage:
+    python tools/label_anchors.py assets/maps/260to.geojson --output assets/maps/labels
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+
+import numpy as np
+
+from polygon_index import feature_polygons, ring_area
+from vn2000 import vn2000_to_wgs84_np, wgs84_to_vn2000_np
+
+PRECISION_M = 1.0
+MIN_ZOOM = 12
+MAX_ZOOM = 18
+CHAR_WIDTH_PX = 7
+LABEL_PADDING_PX = 8
+EARTH_MPP_Z0 = 156543.03392  # Web Mercator metres per pixel at zoom 0, equator
+LABEL_KEYS = ("ToDP", "ChiBo", "name", "Text_utf8")
+
+
+def _edges(rings):
+    starts = np.concatenate([r[:-1] for r in rings])
+    ends = np.concatenate([r[1:] for r in rings])
+    return starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+
+
+def signed_distance(px, py, edges):
+    """Distance from each point to the polygon boundary, negative outside."""
+    x1, y1, x2, y2 = (e[None, :] for e in edges)
+    qx = np.asarray(px, dtype=np.float64)[:, None]
+    qy = np.asarray(py, dtype=np.float64)[:, None]
+
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip(((qx - x1) * dx + (qy - y1) * dy) / length2, 0, 1)
+    t = np.where(length2 > 0, t, 0)
+    dist = np.hypot(qx - (x1 + t * dx), qy - (y1 + t * dy)).min(axis=1)
+
+    straddle = (y1 > qy) != (y2 > qy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (qy - y1) * dx / dy
+    inside = (straddle & (qx < x_cross)).sum(axis=1) % 2 == 1
+    return np.where(inside, dist, -dist)
+
+
+def _centroid(ring):
+    x, y = ring[:-1, 0], ring[:-1, 1]
+    x2, y2 = ring[1:, 0], ring[1:, 1]
+    cross = x * y2 - x2 * y
+    area = cross.sum() * 3
+    if area == 0:
+        return float(ring[:, 0].mean()), float(ring[:, 1].mean())
+    return float(((x + x2) * cross).sum() / area), float(
+        ((y + y2) * cross).sum() / area
+    )
+
+
+def polylabel(rings, precision=PRECISION_M):
+    """
+    Pole of inaccessibility of a polygon (exterior + holes, closed rings).
+    Returns (x, y, distance_to_boundary).
+    """
+    edges = _edges(rings)
+    outer = rings[0]
+    min_x, min_y = outer[:, 0].min(), outer[:, 1].min()
+    max_x, max_y = outer[:, 0].max(), outer[:, 1].max()
+    width, height = max_x - min_x, max_y - min_y
+    cell = min(width, height)
+    if cell == 0:
+        return float(min_x), float(min_y), 0.0
+
+    # Initial cover of the bbox
+    h = cell / 2
+    xs = np.arange(min_x, max_x, cell) + h
+    ys = np.arange(min_y, max_y, cell) + h
+    cx, cy = (a.ravel() for a in np.meshgrid(xs, ys))
+    d = signed_distance(cx, cy, edges)
+    queue = [(-(di + h * math.sqrt(2)), x, y, h, di) for x, y, di in zip(cx, cy, d)]
+    heapq.heapify(queue)
+
+    # Seed with the centroid and the bbox centre
+    seeds_x, seeds_y = zip(_centroid(outer), (min_x + width / 2, min_y + height / 2))
+    seed_d = signed_distance(seeds_x, seeds_y, edges)
+    k = int(np.argmax(seed_d))
+    best = (seeds_x[k], seeds_y[k], float(seed_d[k]))
+
+    while queue:
+        neg_max, x, y, h, di = heapq.heappop(queue)
+        if di > best[2]:
+            best = (x, y, float(di))
+        if -neg_max - best[2] <= precision:
+            # Queue is ordered by potential: nothing left can beat `best`
+            break
+        h /= 2
+        qx = np.array([x - h, x + h, x - h, x + h])
+        qy = np.array([y - h, y - h, y + h, y + h])
+        qd = signed_distance(qx, qy, edges)
+        for x2, y2, d2 in zip(qx, qy, qd):
+            heapq.heappush(queue, (-(d2 + h * math.sqrt(2)), x2, y2, h, d2))
+
+    return float(best[0]), float(best[1]), best[2]
+
+
+def label_text(props):
+    for key in LABEL_KEYS:
+        if props.get(key):
+            return str(props[key]).split("\n")[0].strip()
+    labels = props.get("labels") or []
+    return labels[0] if labels else None
+
+
+def fit_zoom(distance_m, lat, text, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """Smallest zoom at which the label box fits inside the inscribed circle."""
+    label_px = len(text) * CHAR_WIDTH_PX + LABEL_PADDING_PX
+    if distance_m <= 0:
+        return None
+    # 2 * distance / mpp(z) >= label_px  <=>  2^z >= label_px * mpp0 * cos / (2 d)
+    needed = label_px * EARTH_MPP_Z0 * math.cos(math.radians(lat)) / (2 * distance_m)
+    zoom = max(min_zoom, math.ceil(math.log2(needed)))
+    return zoom if zoom <= max_zoom else None
+
+
+def compute_anchors(features, precision=PRECISION_M, source=None):
+    """
+    Anchor point records for every labelled polygon of a feature list: lon/lat
+    is always WGS84, x/y the same point in VN-2000 metres, whatever the input CRS.
+    """
+    anchors = []
+    for feature in features:
+        props = feature.get("properties") or {}
+        text = label_text(props)
+        if not text:
+            continue
+        polygons = feature_polygons(feature)
+        if not polygons:
+            continue
+        # Label the largest part of multi-polygons
+        rings = max(polygons, key=lambda poly: abs(ring_area(poly[0])))
+        lonlat = np.abs(rings[0][:, 0]).max() <= 180
+        if lonlat:
+            rings = [
+                np.column_stack(wgs84_to_vn2000_np(r[:, 0], r[:, 1])) for r in rings
+            ]
+
+        x, y, dist = polylabel(rings, precision)
+        lon, lat = (float(v) for v in vn2000_to_wgs84_np(x, y))
+        anchors.append(
+            {
+                "label": text,
+                "lon": lon,
+                "lat": lat,
+                "x": round(float(x), 3),
+                "y": round(float(y), 3),
+                "distance_m": round(dist, 2),
+                "min_zoom": fit_zoom(dist, lat, text),
+                "ToDP": props.get("ToDP"),
+                "ChiBo": props.get("ChiBo"),
+                "source": source,
+            }
+        )
+    return anchors
+
+
+def write_label_layers(anchors, output_dir, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """One small point layer per zoom with the labels that fit at that zoom."""
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {}
+    for zoom in range(min_zoom, max_zoom + 1):
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [a["lon"], a["lat"]]},
+                "properties": {
+                    k: a[k]
+                    for k in ("label", "distance_m", "min_zoom", "ToDP", "ChiBo")
+                    if a[k] is not None
+                },
+            }
+            for a in anchors
+            if a["min_zoom"] is not None and a["min_zoom"] <= zoom
+        ]
+        path = os.path.join(output_dir, f"{zoom}.geojson")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"type": "FeatureCollection", "features": features},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        counts[zoom] = len(features)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute polygon label anchors")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=[
+            "assets/maps/260to.geojson",
+            "assets/maps/HOAHAI.geojson",
+            "assets/maps/HOAQUY.geojson",
+            "assets/maps/KM.geojson",
+            "assets/maps/MYAN.geojson",
+        ],
+    )
+    parser.add_argument("--output", default="assets/maps/labels")
+    parser.add_argument("--precision", type=float, default=PRECISION_M)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("LABEL ANCHORS (pole of inaccessibility)")
+    print("=" * 80)
+
+    anchors = []
+    for path in args.inputs:
+        with open(path, "r", encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+        found = compute_anchors(features, args.precision, os.path.basename(path))
+        print(f"  {path:45} {len(found):5} labelled polygons")
+        anchors.extend(found)
+
+    counts = write_label_layers(anchors, args.output)
+    with open(os.path.join(args.output, "anchors.json"), "w", encoding="utf-8") as f:
+        json.dump(anchors, f, ensure_ascii=False, indent=2)
+
+    print("\nLabels per zoom:")
+    for zoom, count in counts.items():
+        print(f"  z{zoom:<3} {count:6}")
+    print(f"\n✅ Label layers saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Spatial join: gán nhãn text CAD (Tổ dân phố / Chi bộ) cho polygon chứa nó.
+
+Thay cho bước thủ công "create mapping between text labels and polygons":
+  1. gom polygon (kể cả LineString khép kín như 260to.geojson) vào mảng NumPy
+  2. lưới đều trên bbox polygon -> cặp (điểm, polygon) ứng viên
+  3. kiểm tra even-odd vector hoá, điểm thuộc polygon nhỏ nhất chứa nó
+  4. ghi layer polygon đã gắn nhãn (labels, ToDP, ChiBo)
+
+Nhãn đọc từ file điểm (HOAHAI.geojson, KM.geojson, ...) hoặc text_labels.json.
+Nếu nhãn là lon/lat còn polygon là VN-2000 (hoặc ngược lại), nhãn được chuyển
+sang hệ của polygon.
+
+Usage:
+    python tools/label_join.py --polygons assets/maps/260to.geojson \\
+        --labels assets/maps/HOAHAI.geojson assets/maps/HOAQUY.geojson \\
+                 assets/maps/KM.geojson assets/maps/MYAN.geojson \\
+        --output assets/maps/260to_labelled.geojson
+"""
+
+import argparse
+import json
+import re
+import time
+
+import numpy as np
+
+from polygon_index import PolygonSet, locate_points
+from vn2000 import vn2000_to_wgs84_np, wgs84_to_vn2000_np
+
+MTEXT_CODE = re.compile(r"\\[A-Za-z][^;\\]*;|[{}]")
+TO_PATTERN = re.compile(r"^\s*T[ỔổOo]\s*(?:DÂN PHỐ\s*|dân phố\s*)?0*(\d+\w*)", re.I)
+CHI_BO_PATTERN = re.compile(r"^\s*(CHI BỘ|Chi bộ|Chi Bộ|CB)\b\s*(.*)$")
+
+
+def clean_text(text):
+    """First line of a CAD (M)Text value, without formatting codes."""
+    text = MTEXT_CODE.sub("", text.replace("\\P", "\n"))
+    return text.strip().split("\n")[0].strip()
+
+
+def classify(text):
+    """('ToDP', 'Tổ 12') / ('ChiBo', 'Chi bộ 1 An Thượng') / (None, text)."""
+    m = TO_PATTERN.match(text)
+    if m:
+        return "ToDP", f"Tổ {m.group(1)}"
+    m = CHI_BO_PATTERN.match(text)
+    if m:
+        return "ChiBo", f"Chi bộ {m.group(2)}".strip()
+    return None, text
+
+
+def _anchor(coords):
+    """Point coordinate, or vertex mean for non-point text geometry (hatches)."""
+    if isinstance(coords[0], (int, float)):
+        return coords[0], coords[1]
+    coords = np.asarray(coords, dtype=np.float64)
+    flat = coords.reshape(-1, coords.shape[-1])  # any nesting depth
+    return float(flat[:, 0].mean()), float(flat[:, 1].mean())
+
+
+def load_labels(paths):
+    """Read text points from GeoJSON files or text_labels.json dumps."""
+    labels = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            items = [(d.get("text"), d.get("coords")) for d in data]
+        else:
+            items = []
+            for feature in data.get("features", []):
+                props = feature.get("properties") or {}
+                geom = feature.get("geometry") or {}
+                text = props.get("Text_utf8") or props.get("Text") or props.get("name")
+                items.append((text, geom.get("coordinates")))
+        for text, coords in items:
+            if not text or not coords:
+                continue
+            try:
+                x, y = _anchor(coords)
+            except ValueError:
+                continue  # ragged multi-ring text geometry
+            labels.append({"text": clean_text(text), "x": x, "y": y, "source": path})
+    return labels
+
+
+def _norm(text):
+    return " ".join(str(text).split()).casefold()
+
+
+def _is_lonlat(values):
+    return values.size == 0 or np.abs(values).max() <= 180
+
+
+def join_labels(features, labels):
+    """Assign labels to polygons. Returns (labelled features, report)."""
+    polygons = PolygonSet.from_features(features)
+    x = np.array([label["x"] for label in labels], dtype=np.float64)
+    y = np.array([label["y"] for label in labels], dtype=np.float64)
+
+    poly_lonlat = _is_lonlat(polygons.xy[:, 0])
+    if poly_lonlat and not _is_lonlat(x):
+        x, y = vn2000_to_wgs84_np(x, y)
+    elif not poly_lonlat and _is_lonlat(x):
+        x, y = wgs84_to_vn2000_np(x, y)
+
+    owner = locate_points(polygons, x, y)
+
+    assigned = [[] for _ in range(len(polygons))]
+    for i in np.flatnonzero(owner >= 0):
+        assigned[owner[i]].append(labels[i]["text"])
+
+    output = []
+    conflicts = 0
+    for p in range(len(polygons)):
+        props = dict(features[polygons.feature[p]].get("properties") or {})
+        props["labels"] = assigned[p]
+        for text in assigned[p]:
+            key, value = classify(text)
+            if key is None:
+                continue
+            if props.get(key) in (None, ""):
+                props[key] = value
+            elif _norm(props[key]) != _norm(value) and key not in props.get(
+                "label_conflicts", {}
+            ):
+                props.setdefault("label_conflicts", {})[key] = value
+                conflicts += 1
+        output.append(
+            {
+                "type": "Feature",
+                "properties": props,
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [ring.tolist() for ring in polygons.rings(p)],
+                },
+            }
+        )
+
+    counts = np.array([len(a) for a in assigned])
+    report = {
+        "polygons": len(polygons),
+        "labels": len(labels),
+        "labels_matched": int((owner >= 0).sum()),
+        "labels_unmatched": int((owner < 0).sum()),
+        "polygons_labelled": int((counts > 0).sum()),
+        "polygons_multiple_labels": int((counts > 1).sum()),
+        "conflicts": conflicts,
+    }
+    return output, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign CAD text labels to polygons")
+    parser.add_argument("--polygons", default="assets/maps/260to.geojson")
+    parser.add_argument("--labels", nargs="+", default=["tools/text_labels.json"])
+    parser.add_argument("--output", default="assets/maps/260to_labelled.geojson")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("SPATIAL JOIN: TEXT LABELS -> POLYGONS")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    with open(args.polygons, "r", encoding="utf-8") as f:
+        source = json.load(f)
+    labels = load_labels(args.labels)
+    features, report = join_labels(source.get("features", []), labels)
+
+    collection = {"type": "FeatureCollection", "features": features}
+    if "crs" in source:
+        collection["crs"] = source["crs"]
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(collection, f, ensure_ascii=False, separators=(",", ":"))
+
+    print(f"Polygons:           {report['polygons']:,}")
+    print(f"Text labels:        {report['labels']:,}")
+    print(f"  matched:          {report['labels_matched']:,}")
+    print(f"  unmatched:        {report['labels_unmatched']:,}")
+    print(f"Polygons labelled:  {report['polygons_labelled']:,}")
+    print(f"  with >1 label:    {report['polygons_multiple_labels']:,}")
+    print(f"Conflicts:          {report['conflicts']:,}")
+    print(f"\n✅ Labelled polygons saved to: {args.output}")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Merge fragmented CAD polylines into continuous lines, per layer.
+
+Bản xuất DWG -> GeoJSON cắt đường giao thông / ranh giới thành rất nhiều
+LineString 2 điểm. Bước này chạy trước khi tile:
+  1. gom các đoạn theo Layer + các properties còn lại (bỏ fid, EntityHandle, path)
+  2. snap đầu mút bằng bảng băm ô lưới (kích thước ô = tolerance, xét 3x3 ô)
+  3. dựng đồ thị đầu mút, nối các đoạn thành đường dài nhất có thể:
+     đi từ nút bậc != 2 tới nút bậc != 2, phần còn lại là chu trình
+  4. một thành phần liên thông -> LineString (một đường) hoặc MultiLineString
+Line đã khép kín (ranh giới tổ) được giữ nguyên để vẫn nhận ra là polygon.
+
+Usage:
+    python tools/merge_lines.py assets/maps/260to.geojson
+    python tools/merge_lines.py nhs.geojson --output nhs_merged.geojson --tolerance 0.01
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from clean_geometry import fix_mojibake
+from polygon_index import is_closed_line
+
+IGNORED_KEYS = ("fid", "EntityHandle", "path")
+
+
+def default_tolerance(xy):
+    """About 1 cm: 1e-7 degree for lon/lat, 0.01 for projected metres."""
+    if xy.size and np.abs(xy[:, 0]).max() <= 180:
+        return 1e-7
+    return 0.01
+
+
+def group_key(props, ignored=IGNORED_KEYS):
+    return json.dumps(
+        {k: v for k, v in sorted(props.items()) if k not in ignored},
+        ensure_ascii=False,
+    )
+
+
+def snap_endpoints(xy, tolerance):
+    """
+    Cluster id for every endpoint: endpoints closer than `tolerance` share an
+    id. Endpoints are hashed to grid cells; only the 3x3 neighbouring cells
+    are compared.
+    """
+    parent = np.arange(len(xy))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    cells = np.floor(xy / tolerance).astype(np.int64)
+    buckets = defaultdict(list)
+    for i, (cx, cy) in enumerate(cells.tolist()):
+        buckets[(cx, cy)].append(i)
+
+    for (cx, cy), members in buckets.items():
+        members = np.asarray(members)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                other = buckets.get((cx + dx, cy + dy))
+                if other is None or (dx, dy) < (0, 0):
+                    continue  # each pair of cells is visited once
+                other = np.asarray(other)
+                d = np.hypot(
+                    xy[members, None, 0] - xy[None, other, 0],
+                    xy[members, None, 1] - xy[None, other, 1],
+                )
+                for a, b in zip(*np.nonzero(d <= tolerance)):
+                    ra, rb = find(members[a]), find(other[b])
+                    if ra != rb:
+                        parent[max(ra, rb)] = min(ra, rb)
+
+    roots = np.array([find(i) for i in range(len(xy))], dtype=np.int64)
+    return np.unique(roots, return_inverse=True)[1].reshape(-1)
+
+
+def stitch(segments, nodes):
+    """
+    Chain segments into maximal paths.
+
+    segments: list of coordinate lists; nodes: (len(segments), 2) node ids of
+    their start/end. Returns a list of components, each a list of paths.
+    """
+    adjacency = defaultdict(list)  # node -> [(segment, end)]
+    for s, (a, b) in enumerate(nodes.tolist()):
+        adjacency[a].append((s, 0))
+        adjacency[b].append((s, 1))
+    used = np.zeros(len(segments), dtype=bool)
+
+    def walk(node, segment, end):
+        coords = []
+        while True:
+            used[segment] = True
+            line = segments[segment] if end == 0 else segments[segment][::-1]
+            coords.extend(line if not coords else line[1:])
+            node = nodes[segment][1 - end]
+            if len(adjacency[node]) != 2:
+                return coords
+            nxt = [(s, e) for s, e in adjacency[node] if not used[s]]
+            if not nxt:
+                return coords
+            segment, end = nxt[0]
+
+    paths = []
+    path_nodes = []
+    # Paths start and end at nodes of degree != 2
+    for node, edges in adjacency.items():
+        if len(edges) == 2:
+            continue
+        for segment, end in edges:
+            if not used[segment]:
+                paths.append(walk(node, segment, end))
+                path_nodes.append(node)
+    # What is left are cycles
+    for segment in range(len(segments)):
+        if not used[segment]:
+            paths.append(walk(nodes[segment][0], segment, 0))
+            path_nodes.append(nodes[segment][0])
+
+    # Group paths into connected components via their start node
+    component = _components(nodes, int(nodes.max()) + 1 if len(nodes) else 0)
+    grouped = defaultdict(list)
+    for path, node in zip(paths, path_nodes):
+        grouped[component[node]].append(path)
+    return list(grouped.values())
+
+
+def _components(nodes, n):
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in nodes.tolist():
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+    return [find(i) for i in range(n)]
+
+
+def merge_lines(features, tolerance=None, ignored=IGNORED_KEYS, multi=True):
+    """Merge open LineStrings per layer/properties. Returns (features, report)."""
+    groups = defaultdict(list)  # key -> [(props, coords)]
+    output = []
+    for feature in features:
+        geom = feature.get("geometry") or {}
+        props = feature.get("properties") or {}
+        if geom.get("type") == "LineString":
+            lines = [geom["coordinates"]]
+        elif geom.get("type") == "MultiLineString":
+            lines = geom["coordinates"]
+        else:
+            output.append(feature)
+            continue
+        key = group_key(props, ignored)
+        for line in lines:
+            if len(line) < 2:
+                continue
+            if is_closed_line(line):
+                output.append(
+                    {
+                        "type": "Feature",
+                        "properties": props,
+                        "geometry": {"type": "LineString", "coordinates": line},
+                    }
+                )
+            else:
+                groups[key].append((props, line))
+
+    if tolerance is None:
+        points = [c[:2] for items in groups.values() for _, line in items for c in line]
+        tolerance = default_tolerance(np.asarray(points, dtype=np.float64))
+
+    for items in groups.values():
+        segments = [line for _, line in items]
+        endpoints = np.array(
+            [[s[0][:2], s[-1][:2]] for s in segments], dtype=np.float64
+        ).reshape(-1, 2)
+        nodes = snap_endpoints(endpoints, tolerance).reshape(-1, 2)
+        props = dict(items[0][0])
+        for paths in stitch(segments, nodes):
+            if len(paths) == 1 or not multi:
+                geoms = [{"type": "LineString", "coordinates": p} for p in paths]
+            else:
+                geoms = [{"type": "MultiLineString", "coordinates": paths}]
+            for geometry in geoms:
+                output.append(
+                    {"type": "Feature", "properties": props, "geometry": geometry}
+                )
+
+    def layer_counts(items):
+        return Counter(
+            fix_mojibake((f.get("properties") or {}).get("Layer") or "None")
+            for f in items
+        )
+
+    before, after = layer_counts(features), layer_counts(output)
+    report = {
+        "tolerance": tolerance,
+        "features_before": len(features),
+        "features_after": len(output),
+        "groups": len(groups),
+        "layers": {
+            layer: {"before": before[layer], "after": after.get(layer, 0)}
+            for layer, _ in before.most_common()
+        },
+    }
+    return output, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge fragmented polylines")
+    parser.add_argument("input_file")
+    parser.add_argument("--output")
+    parser.add_argument("--tolerance", type=float, help="endpoint snapping distance")
+    parser.add_argument(
+        "--ignore",
+        nargs="*",
+        default=list(IGNORED_KEYS),
+        help="properties that may differ between merged segments",
+    )
+    parser.add_argument(
+        "--no-multi",
+        action="store_true",
+        help="write branching components as separate LineStrings",
+    )
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    features, report = merge_lines(
+        data.get("features", []), args.tolerance, tuple(args.ignore), not args.no_multi
+    )
+
+    output = args.output or os.path.splitext(args.input_file)[0] + "_merged.geojson"
+    collection = {k: v for k, v in data.items() if k != "features"}
+    collection["features"] = features
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(collection, f, ensure_ascii=False, separators=(",", ":"))
+
+    print("=" * 80)
+    print(f"{'Layer':50} {'before':>10} {'after':>10}")
+    print("=" * 80)
+    for layer, counts in report["layers"].items():
+        print(f"{layer[:50]:50} {counts['before']:10,} {counts['after']:10,}")
+    print("=" * 80)
+    print(
+        f"{'TOTAL':50} {report['features_before']:10,} {report['features_after']:10,}"
+    )
+    print(f"Snapping tolerance: {report['tolerance']}")
+    print(f"\n✅ Merged lines saved to: {output}")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Nearest facilities (y tế, trường học, nhà sinh hoạt cộng đồng) per tổ dân phố.
+
+Mỗi lớp cơ sở được đưa về VN-2000 (mét) và dựng một KD-tree; truy vấn k điểm
+gần nhất chạy vector hoá cho cả lô điểm (điểm nhãn của mọi tổ, hoặc điểm bất
+kỳ). Kết quả theo tổ ghi vào một file JSON gọn:
+
+    {
+      "k": 3,
+      "layers": {"y_te": {"name": [...], "address": [...], "lon": [...], "lat": [...]}, ...},
+      "to": {"Tổ 12": {"y_te": [[chỉ số, mét], ...], ...,
+                       "meeting": [chỉ số nha_sinh_hoat, mét]}, ...}
+    }
+
+"meeting" là nhà sinh hoạt được phân cho tổ trong scripts/tdp_meeting_locations.json
+(khớp tên với nha_sinh_hoat.geojson để lấy toạ độ), không nhất thiết là nhà gần nhất.
+Điểm nhãn tổ lấy giống search_index.py (polylabel ranh giới 260to, hoặc nhãn text).
+
+KD-tree: tách theo trung vị trục dài hơn tới khi lá còn <= leaf_size điểm. Truy
+vấn lô duyệt các lá theo khoảng cách tới bbox lá tăng dần (mỗi điểm một thứ tự)
+và bỏ qua lá xa hơn điểm thứ k đã tìm được; vòng lặp Python chỉ chạy theo số lá,
+mọi phép tính khoảng cách là mảng NumPy trên cả lô.
+
+Usage:
+    python tools/nearest_facility.py build
+    python tools/nearest_facility.py query 108.2452 16.0405 --layer y_te -k 3
+    python tools/nearest_facility.py bench --points 100000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from search_index import (
+    FACILITY_FILES,
+    MAPS,
+    MEETING_FILE,
+    _number,
+    collect_units,
+    fold,
+)
+from vn2000 import wgs84_to_vn2000_np
+
+OUTPUT_FILE = os.path.join(MAPS, "nearest_facilities.json")
+LAYERS = ["y_te", "giao_duc", "nha_sinh_hoat"]
+DEFAULT_K = 3
+LEAF_SIZE = 16
+QUERY_BLOCK = 4_000_000  # (query points x leaves) box distances per chunk
+
+
+class KDTree:
+    """Static bucket KD-tree over 2-D points with vectorized batch k-NN."""
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if not len(self.points):
+            raise ValueError("KDTree needs at least one point")
+        leaves = []
+        stack = [np.arange(len(self.points))]
+        while stack:
+            ids = stack.pop()
+            if len(ids) <= leaf_size:
+                leaves.append(ids)
+                continue
+            span = np.ptp(self.points[ids], axis=0)
+            axis = int(np.argmax(span))
+            order = np.argsort(self.points[ids, axis], kind="stable")
+            half = len(ids) // 2
+            stack += [ids[order[:half]], ids[order[half:]]]
+
+        # Leaves padded to leaf_size with points at infinity
+        self.leaf_ids = np.full((len(leaves), leaf_size), -1, dtype=np.int64)
+        self.leaf_points = np.full((len(leaves), leaf_size, 2), np.inf)
+        self.leaf_min = np.empty((len(leaves), 2))
+        self.leaf_max = np.empty((len(leaves), 2))
+        for i, ids in enumerate(leaves):
+            self.leaf_ids[i, : len(ids)] = ids
+            self.leaf_points[i, : len(ids)] = self.points[ids]
+            self.leaf_min[i] = self.points[ids].min(axis=0)
+            self.leaf_max[i] = self.points[ids].max(axis=0)
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, x, y, k=1):
+        """
+        k nearest points of every query point: (distances (n, k), indices (n, k)),
+        sorted by distance. k is capped at the number of points in the tree.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        k = min(k, len(self))
+        distances = np.empty((len(x), k))
+        indices = np.empty((len(x), k), dtype=np.int64)
+        step = max(1, QUERY_BLOCK // len(self.leaf_ids))
+        for start in range(0, len(x), step):
+            chunk = slice(start, start + step)
+            distances[chunk], indices[chunk] = self._query(x[chunk], y[chunk], k)
+        return distances, indices
+
+    def _query(self, x, y, k):
+        q = np.column_stack([x, y])
+        # Squared distance from each query to each leaf box; visit nearest first
+        gap = np.maximum(self.leaf_min[None] - q[:, None], 0) + np.maximum(
+            q[:, None] - self.leaf_max[None], 0
+        )
+        box_d2 = (gap**2).sum(axis=2)
+        order = np.argsort(box_d2, axis=1)
+        box_d2 = np.take_along_axis(box_d2, order, axis=1)
+
+        best_d2 = np.full((len(q), k), np.inf)
+        best_id = np.full((len(q), k), -1, dtype=np.int64)
+        rows = np.arange(len(q))
+        for step in range(order.shape[1]):
+            active = rows[box_d2[rows, step] < best_d2[rows, -1]]
+            if not len(active):
+                break  # leaves are visited by increasing box distance
+            leaves = order[active, step]
+            d2 = ((self.leaf_points[leaves] - q[active, None]) ** 2).sum(axis=2)
+            merged_d2 = np.concatenate([best_d2[active], d2], axis=1)
+            merged_id = np.concatenate([best_id[active], self.leaf_ids[leaves]], axis=1)
+            top = np.argsort(merged_d2, axis=1, kind="stable")[:, :k]
+            best_d2[active] = np.take_along_axis(merged_d2, top, axis=1)
+            best_id[active] = np.take_along_axis(merged_id, top, axis=1)
+            rows = active
+        return np.sqrt(best_d2), best_id
+
+
+class FacilityLayer:
+    """Facilities of one layer with their KD-tree in VN-2000 metres."""
+
+    def __init__(self, name, records, leaf_size=LEAF_SIZE):
+        self.name = name
+        self.records = records
+        lon = np.array([r["lon"] for r in records])
+        lat = np.array([r["lat"] for r in records])
+        x, y = wgs84_to_vn2000_np(lon, lat)
+        self.tree = KDTree(np.column_stack([x, y]), leaf_size)
+
+    @classmethod
+    def from_geojson(cls, name, path, leaf_size=LEAF_SIZE):
+        with open(path, "r", encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+        records = []
+        for feature in features:
+            props = feature.get("properties") or {}
+            geom = feature.get("geometry") or {}
+            if geom.get("type") != "Point" or not props.get("name"):
+                continue
+            lon, lat = geom["coordinates"][:2]
+            records.append(
+                {
+                    "name": " ".join(str(props["name"]).split()),
+                    "address": props.get("address"),
+                    "lon": float(lon),
+                    "lat": float(lat),
+                }
+            )
+        return cls(name, records, leaf_size)
+
+    def __len__(self):
+        return len(self.records)
+
+    def nearest(self, lon, lat, k=1):
+        """(distances in metres (n, k), record indices (n, k)) for lon/lat points."""
+        x, y = wgs84_to_vn2000_np(
+            np.atleast_1d(np.asarray(lon, dtype=np.float64)),
+            np.atleast_1d(np.asarray(lat, dtype=np.float64)),
+        )
+        return self.tree.query(x, y, k)
+
+
+def load_layers(files=FACILITY_FILES, layers=LAYERS, leaf_size=LEAF_SIZE):
+    return {
+        name: FacilityLayer.from_geojson(name, files[name], leaf_size)
+        for name in layers
+        if os.path.exists(files[name])
+    }
+
+
+def meeting_assignments(houses, meeting_file=MEETING_FILE):
+    """{tổ number: index of its meeting house in the nha_sinh_hoat layer}."""
+    if houses is None or not os.path.exists(meeting_file):
+        return {}
+    with open(meeting_file, "r", encoding="utf-8") as f:
+        meetings = json.load(f)
+    by_name = {fold(r["name"]): i for i, r in enumerate(houses.records)}
+    assigned = {}
+    for meeting in meetings.values():
+        house = by_name.get(fold(meeting["name"]))
+        if house is None:
+            continue
+        for number in meeting.get("tdpNumbers") or []:
+            assigned.setdefault(number, house)
+    return assigned
+
+
+def compute_nearest(layers, k=DEFAULT_K):
+    """Per-tổ nearest facilities of every layer, plus the assigned meeting house."""
+    tos, _, _ = collect_units()
+    tos = [t for t in tos if t["lon"] is not None]
+    lon = np.array([t["lon"] for t in tos])
+    lat = np.array([t["lat"] for t in tos])
+
+    result = {t["name"]: {} for t in tos}
+    for name, layer in layers.items():
+        distances, indices = layer.nearest(lon, lat, k)
+        for t, dist, idx in zip(tos, distances, indices):
+            result[t["name"]][name] = [
+                [int(i), int(round(d))] for i, d in zip(idx, dist)
+            ]
+
+    houses = layers.get("nha_sinh_hoat")
+    assigned = meeting_assignments(houses)
+    if assigned:
+        x, y = wgs84_to_vn2000_np(lon, lat)
+        for t, tx, ty in zip(tos, x, y):
+            house = assigned.get(_number(t["name"]))
+            if house is not None:
+                hx, hy = houses.tree.points[house]
+                result[t["name"]]["meeting"] = [
+                    house,
+                    int(round(np.hypot(hx - tx, hy - ty))),
+                ]
+    return result
+
+
+def save(layers, per_to, k, path=OUTPUT_FILE):
+    output = {
+        "k": k,
+        "layers": {
+            name: {
+                "name": [r["name"] for r in layer.records],
+                "address": [r["address"] for r in layer.records],
+                "lon": [round(r["lon"], 7) for r in layer.records],
+                "lat": [round(r["lat"], 7) for r in layer.records],
+            }
+            for name, layer in layers.items()
+        },
+        "to": dict(sorted(per_to.items(), key=lambda item: _number(item[0]) or 0)),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nearest facilities per tổ dân phố")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--output", default=OUTPUT_FILE)
+    p.add_argument("-k", type=int, default=DEFAULT_K)
+    p = sub.add_parser("query", help="nearest facilities of one lon/lat point")
+    p.add_argument("lon", type=float)
+    p.add_argument("lat", type=float)
+    p.add_argument("--layer", action="append", choices=LAYERS)
+    p.add_argument("-k", type=int, default=DEFAULT_K)
+    p = sub.add_parser("bench", help="batch query vs. brute force")
+    p.add_argument("--points", type=int, default=100000)
+    p.add_argument("-k", type=int, default=DEFAULT_K)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print("=" * 80)
+    layers = load_layers()
+    if args.command == "build":
+        per_to = compute_nearest(layers, args.k)
+        save(layers, per_to, args.k, args.output)
+        print(f"✅ Nearest facilities saved: {args.output}")
+        for name, layer in layers.items():
+            nearest = [v[name][0][1] for v in per_to.values() if v.get(name)]
+            print(
+                f"   {name}: {len(layer):,} facilities, nearest median "
+                f"{np.median(nearest):,.0f} m, max {max(nearest):,} m"
+            )
+        assigned = [v["meeting"][1] for v in per_to.values() if "meeting" in v]
+        print(
+            f"   Tổ: {len(per_to):,} ({len(assigned):,} with an assigned meeting house)"
+        )
+        if assigned:
+            print(f"   Assigned meeting house median {np.median(assigned):,.0f} m away")
+    elif args.command == "query":
+        for name in args.layer or LAYERS:
+            layer = layers[name]
+            distances, indices = layer.nearest(args.lon, args.lat, args.k)
+            print(f"{name}:")
+            for d, i in zip(distances[0], indices[0]):
+                record = layer.records[i]
+                print(f"   {d:8,.0f} m  {record['name']}")
+                if record["address"]:
+                    print(f"              {record['address']}")
+    else:
+        rng = np.random.default_rng(1)
+        for name, layer in layers.items():
+            points = layer.tree.points
+            low, high = points.min(axis=0) - 2000, points.max(axis=0) + 2000
+            q = rng.uniform(low, high, size=(args.points, 2))
+            t0 = time.perf_counter()
+            distances, indices = layer.tree.query(q[:, 0], q[:, 1], args.k)
+            elapsed = time.perf_counter() - t0
+            # Brute force on a sample
+            sample = q[:2000]
+            d = np.sqrt(((sample[:, None] - points[None]) ** 2).sum(axis=2))
+            expected = np.sort(d, axis=1)[:, : distances.shape[1]]
+            ok = np.allclose(expected, distances[:2000])
+            print(
+                f"   {name}: {len(layer):,} facilities, {args.points:,} points in "
+                f"{elapsed * 1000:.1f} ms ({args.points / elapsed:,.0f} points/s) "
+                + ("✅" if ok else "❌ differs from brute force")
+            )
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Pack GeoJSON tiles into bundle files for Flutter assets.
+
+Thay vì khai báo từng thư mục assets/maps/tiles/{z}/{x}/ trong pubspec.yaml
+(hàng nghìn file nhỏ trong AssetManifest), các tile được nối vào vài file
+bundle cho mỗi zoom + một bảng offset/length nhị phân:
+
+    assets/maps/tile_bundles/
+        index.json      # metadata tile (giống tiles/index.json)
+        tiles.idx       # bảng tra: z/x/y -> bundle, offset, length
+        z12-0.bin ...   # nội dung tile nối liền, tối đa --max-bundle-mb mỗi file
+
+Chỉ cần một dòng trong pubspec.yaml (- assets/maps/tile_bundles/);
+TileService load bundle bằng rootBundle.load() và cắt tile theo bảng tra.
+
+tiles.idx (little endian):
+    header  "TBDL" u16 version, u16 bundle count, u32 tile count
+    bundles u8 name length + ascii name, per bundle
+    tiles   u8 z, pad, u16 bundle, u32 x, u32 y, u32 offset, u32 length
+            (20 bytes, sorted by z, x, y)
+
+Usage:
+    python tools/pack_tile_bundles.py pack assets/maps/tiles assets/maps/tile_bundles
+    python tools/pack_tile_bundles.py verify assets/maps/tile_bundles --tiles assets/maps/tiles
+"""
+
+import argparse
+import json
+import os
+import shutil
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"TBDL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+ENTRY = np.dtype(
+    [
+        ("z", "<u1"),
+        ("pad", "<u1"),
+        ("bundle", "<u2"),
+        ("x", "<u4"),
+        ("y", "<u4"),
+        ("offset", "<u4"),
+        ("length", "<u4"),
+    ]
+)
+TABLE_NAME = "tiles.idx"
+INDEX_NAME = "index.json"
+MAX_BUNDLE_BYTES = 8 * 1024 * 1024
+BUNDLE_ASSET_DIR = "assets/maps/tile_bundles/"
+
+
+def list_tiles(tiles_dir):
+    """Sorted (z, x, y, path) of every {z}/{x}/{y}.json under tiles_dir."""
+    tiles = []
+    for z in os.listdir(tiles_dir):
+        zoom_dir = os.path.join(tiles_dir, z)
+        if not (z.isdigit() and os.path.isdir(zoom_dir)):
+            continue
+        for x in os.listdir(zoom_dir):
+            x_dir = os.path.join(zoom_dir, x)
+            if not (x.isdigit() and os.path.isdir(x_dir)):
+                continue
+            for name in os.listdir(x_dir):
+                y, ext = os.path.splitext(name)
+                if ext == ".json" and y.isdigit():
+                    tiles.append((int(z), int(x), int(y), os.path.join(x_dir, name)))
+    tiles.sort()
+    return tiles
+
+
+def pack(tiles_dir, output_dir, max_bundle_bytes=MAX_BUNDLE_BYTES):
+    tiles = list_tiles(tiles_dir)
+    if not tiles:
+        raise ValueError(f"no tiles found in {tiles_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):  # stale bundles from a previous build
+        if name.endswith(".bin") or name == TABLE_NAME:
+            os.remove(os.path.join(output_dir, name))
+
+    entries = np.zeros(len(tiles), dtype=ENTRY)
+    bundles = []
+    out = None
+    current_zoom = None
+    size = 0
+    for i, (z, x, y, path) in enumerate(tiles):
+        with open(path, "rb") as f:
+            data = f.read()
+        # New bundle per zoom, and whenever the current one is full
+        if z != current_zoom or (size and size + len(data) > max_bundle_bytes):
+            if out:
+                out.close()
+            part = 0 if z != current_zoom else part + 1
+            bundles.append(f"z{z}-{part}.bin")
+            out = open(os.path.join(output_dir, bundles[-1]), "wb")
+            current_zoom = z
+            size = 0
+        entries[i] = (z, 0, len(bundles) - 1, x, y, size, len(data))
+        out.write(data)
+        size += len(data)
+    out.close()
+
+    with open(os.path.join(output_dir, TABLE_NAME), "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(bundles), len(entries)))
+        for name in bundles:
+            encoded = name.encode("ascii")
+            f.write(struct.pack("<B", len(encoded)) + encoded)
+        f.write(entries.tobytes())
+
+    index_file = os.path.join(tiles_dir, INDEX_NAME)
+    if os.path.exists(index_file):
+        shutil.copyfile(index_file, os.path.join(output_dir, INDEX_NAME))
+    return {
+        "tiles": len(entries),
+        "bundles": bundles,
+        "bytes": int(entries["length"].sum()),
+    }
+
+
+class TileBundleReader:
+    """Reads tiles back out of a packed bundle directory."""
+
+    def __init__(self, bundle_dir):
+        self.bundle_dir = bundle_dir
+        with open(os.path.join(bundle_dir, TABLE_NAME), "rb") as f:
+            data = f.read()
+        magic, version, bundle_count, tile_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"unsupported tile table: {magic!r} v{version}")
+        position = HEADER.size
+        self.bundles = []
+        for _ in range(bundle_count):
+            length = data[position]
+            self.bundles.append(data[position + 1 : position + 1 + length].decode())
+            position += 1 + length
+        self.entries = np.frombuffer(
+            data, dtype=ENTRY, count=tile_count, offset=position
+        )
+        # (z, x, y) packed into one sortable key for binary search
+        self.keys = (
+            (self.entries["z"].astype(np.uint64) << np.uint64(58))
+            | (self.entries["x"].astype(np.uint64) << np.uint64(29))
+            | self.entries["y"].astype(np.uint64)
+        )
+        self._files = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def tiles(self):
+        """(z, x, y) of every packed tile, in table order."""
+        return [(int(e["z"]), int(e["x"]), int(e["y"])) for e in self.entries]
+
+    def get(self, z, x, y):
+        """Raw tile bytes, or None when the tile is not packed."""
+        key = np.uint64((z << 58) | (x << 29) | y)
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        entry = self.entries[i]
+        f = self._file(int(entry["bundle"]))
+        f.seek(int(entry["offset"]))
+        return f.read(int(entry["length"]))
+
+    def get_json(self, z, x, y):
+        data = self.get(z, x, y)
+        return None if data is None else json.loads(data)
+
+    def _file(self, bundle):
+        if bundle not in self._files:
+            path = os.path.join(self.bundle_dir, self.bundles[bundle])
+            self._files[bundle] = open(path, "rb")
+        return self._files[bundle]
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def verify(bundle_dir, tiles_dir):
+    """Compare every packed tile with its source file; returns mismatches."""
+    reader = TileBundleReader(bundle_dir)
+    source = {(z, x, y): path for z, x, y, path in list_tiles(tiles_dir)}
+    errors = []
+    for key in set(source) - set(reader.tiles()):
+        errors.append(f"{key[0]}/{key[1]}/{key[2]}: missing from bundles")
+    for z, x, y in reader.tiles():
+        path = source.get((z, x, y))
+        if path is None:
+            errors.append(f"{z}/{x}/{y}: not in {tiles_dir}")
+            continue
+        with open(path, "rb") as f:
+            if f.read() != reader.get(z, x, y):
+                errors.append(f"{z}/{x}/{y}: content differs")
+    reader.close()
+    return sorted(errors)
+
+
+def pubspec_entries():
+    """The pubspec.yaml lines needed for the packed tiles."""
+    return [
+        "    # Packed tiles (tools/pack_tile_bundles.py)",
+        f"    - {BUNDLE_ASSET_DIR}",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack tiles into asset bundles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("pack")
+    p.add_argument(
+        "tiles_dir", nargs="?", default=os.path.join("assets", "maps", "tiles")
+    )
+    p.add_argument(
+        "output_dir",
+        nargs="?",
+        default=os.path.join("assets", "maps", "tile_bundles"),
+    )
+    p.add_argument(
+        "--max-bundle-mb",
+        type=float,
+        default=MAX_BUNDLE_BYTES / 1024 / 1024,
+        help="split a zoom level into several bundles above this size",
+    )
+    p = sub.add_parser("verify")
+    p.add_argument(
+        "bundle_dir",
+        nargs="?",
+        default=os.path.join("assets", "maps", "tile_bundles"),
+    )
+    p.add_argument("--tiles", default=os.path.join("assets", "maps", "tiles"))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print("=" * 80)
+    if args.command == "pack":
+        stats = pack(
+            args.tiles_dir, args.output_dir, int(args.max_bundle_mb * 1024 * 1024)
+        )
+        print(
+            f"✅ Packed {stats['tiles']:,} tiles into {len(stats['bundles'])} bundles"
+        )
+        print(f"   Size: {stats['bytes'] / 1024 / 1024:.2f} MB -> {args.output_dir}")
+        for name in stats["bundles"]:
+            print(f"   - {name}")
+        print("\npubspec.yaml (replaces the per-directory tile entries):")
+        print("\n".join(pubspec_entries()))
+    else:
+        errors = verify(args.bundle_dir, args.tiles)
+        if errors:
+            print(f"❌ {len(errors)} mismatches")
+            for error in errors[:20]:
+                print(f"   {error}")
+        else:
+            print("✅ All tiles match their source files")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+    if args.command == "verify" and errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+PMTiles v3 single-file tile archive: writer, MBTiles / tile-directory converter
+and an HTTP-range reader.
+
+Web build (Vercel) không phục vụ tốt hàng nghìn file tile hay một file SQLite
+MBTiles; PMTiles là một file tĩnh duy nhất, client đọc bằng HTTP Range:
+  - tile id theo đường cong Hilbert (zoom tăng dần), dữ liệu tile ghi theo thứ
+    tự tile id (clustered)
+  - tile trùng nội dung (tile rỗng, tile mép biển, ...) chỉ lưu một lần; các tile
+    liên tiếp giống nhau gộp thành một entry với run_length
+  - root directory nằm trong 16 KB đầu file, phần còn lại chia thành các leaf
+    directory; directory và metadata được nén gzip
+
+Nguồn: file .mbtiles (tippecanoe, geojson_tiler --backend tippecanoe) hoặc thư
+mục {z}/{x}/{y}.json của geojson_tiler.py.
+
+Usage:
+    python tools/pmtiles.py convert assets/maps/nhs.mbtiles build/web/nhs.pmtiles
+    python tools/pmtiles.py convert assets/maps/tiles build/web/tiles.pmtiles
+    python tools/pmtiles.py verify build/web/nhs.pmtiles --against assets/maps/nhs.mbtiles
+    python tools/pmtiles.py show https://example.vercel.app/nhs.pmtiles
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import urllib.request
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
+
+HEADER_SIZE = 127
+ROOT_SIZE = 16384  # header + root directory are fetched in one request
+
+# Compression / tile type codes of the v3 header
+COMPRESSION = {"unknown": 0, "none": 1, "gzip": 2, "brotli": 3, "zstd": 4}
+TILE_TYPE = {"unknown": 0, "mvt": 1, "png": 2, "jpg": 3, "webp": 4, "avif": 5}
+MBTILES_FORMATS = {"pbf": "mvt", "png": "png", "jpg": "jpg", "webp": "webp"}
+
+HEADER_FORMAT = "<7sB11Q6B4iB2i"
+Entry = namedtuple("Entry", "tile_id offset length run_length")
+Header = namedtuple(
+    "Header",
+    "root_offset root_length metadata_offset metadata_length "
+    "leaf_offset leaf_length data_offset data_length "
+    "addressed_tiles tile_entries tile_contents clustered "
+    "internal_compression tile_compression tile_type min_zoom max_zoom "
+    "min_lon min_lat max_lon max_lat center_zoom center_lon center_lat",
+)
+
+
+# --- Tile ids --------------------------------------------------------------
+
+
+def zxy_to_tileid(z, x, y):
+    """Hilbert tile id: tiles of all lower zooms first, then Hilbert order."""
+    if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise ValueError(f"tile {z}/{x}/{y} out of range")
+    acc = ((1 << (2 * z)) - 1) // 3
+    s = 1 << z >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        acc += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return acc
+
+
+def tileid_to_zxy(tile_id):
+    z = 0
+    acc = 0
+    while acc + (1 << (2 * z)) <= tile_id:
+        acc += 1 << (2 * z)
+        z += 1
+    d = tile_id - acc
+    x = y = 0
+    s = 1
+    while s < 1 << z:
+        rx = 1 & (d // 2)
+        ry = 1 & (d ^ rx)
+        if ry == 0:
+            if rx == 1:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+        x += s * rx
+        y += s * ry
+        d //= 4
+        s <<= 1
+    return z, x, y
+
+
+# --- Directories -----------------------------------------------------------
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos):
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def serialize_directory(entries):
+    """Columnar varint encoding (delta ids, runs, lengths, offsets), gzipped."""
+    out = bytearray()
+    _write_varint(out, len(entries))
+    last_id = 0
+    for e in entries:
+        _write_varint(out, e.tile_id - last_id)
+        last_id = e.tile_id
+    for e in entries:
+        _write_varint(out, e.run_length)
+    for e in entries:
+        _write_varint(out, e.length)
+    for i, e in enumerate(entries):
+        prev = entries[i - 1] if i else None
+        if prev and e.offset == prev.offset + prev.length:
+            _write_varint(out, 0)  # contiguous with the previous entry
+        else:
+            _write_varint(out, e.offset + 1)
+    return gzip.compress(bytes(out), mtime=0)
+
+
+def deserialize_directory(data):
+    buf = gzip.decompress(data)
+    count, pos = _read_varint(buf, 0)
+    columns = []
+    for _ in range(3):
+        column = []
+        for _ in range(count):
+            value, pos = _read_varint(buf, pos)
+            column.append(value)
+        columns.append(column)
+    deltas, runs, lengths = columns
+    entries = []
+    tile_id = 0
+    for i in range(count):
+        tile_id += deltas[i]
+        value, pos = _read_varint(buf, pos)
+        if value == 0 and i:
+            offset = entries[-1].offset + entries[-1].length
+        else:
+            offset = value - 1
+        entries.append(Entry(tile_id, offset, lengths[i], runs[i]))
+    return entries
+
+
+def build_directories(entries, root_budget=ROOT_SIZE - HEADER_SIZE):
+    """(root bytes, leaf bytes, leaf count): leaves only when the root overflows."""
+    root = serialize_directory(entries)
+    if len(root) <= root_budget:
+        return root, b"", 0
+    leaf_size = 4096
+    while True:
+        root_entries = []
+        leaves = bytearray()
+        for i in range(0, len(entries), leaf_size):
+            leaf = serialize_directory(entries[i : i + leaf_size])
+            root_entries.append(Entry(entries[i].tile_id, len(leaves), len(leaf), 0))
+            leaves += leaf
+        root = serialize_directory(root_entries)
+        if len(root) <= root_budget:
+            return root, bytes(leaves), len(root_entries)
+        leaf_size *= 2
+
+
+def find_entry(entries, tile_id, ids=None):
+    """Entry covering tile_id (a leaf pointer has run_length 0), or None."""
+    if ids is None:
+        ids = [e.tile_id for e in entries]
+    i = bisect_right(ids, tile_id) - 1
+    if i < 0:
+        return None
+    entry = entries[i]
+    if entry.run_length == 0 or tile_id - entry.tile_id < entry.run_length:
+        return entry
+    return None
+
+
+# --- Writer ----------------------------------------------------------------
+
+
+def write_pmtiles(
+    path,
+    tiles,
+    tile_type="unknown",
+    tile_compression="none",
+    metadata=None,
+    bounds=None,
+    center=None,
+):
+    """
+    Write (z, x, y, bytes) tiles to a PMTiles v3 archive.
+
+    Tiles may come in any order: unique contents are spooled to a temp file,
+    then copied in tile id order. Returns a stats dict.
+    """
+    entries = []  # (tile_id, spool offset, length)
+    spool_offsets = {}  # content hash -> spool offset
+    min_zoom, max_zoom = 32, -1
+    with tempfile.TemporaryFile() as spool:
+        for z, x, y, data in tiles:
+            digest = hashlib.sha256(data).digest()
+            offset = spool_offsets.get(digest)
+            if offset is None:
+                offset = spool_offsets[digest] = spool.tell()
+                spool.write(data)
+            entries.append((zxy_to_tileid(z, x, y), offset, len(data)))
+            min_zoom, max_zoom = min(min_zoom, z), max(max_zoom, z)
+        if not entries:
+            raise ValueError("no tiles to write")
+        entries.sort()
+
+        # Lay out contents in order of first use, merging identical runs
+        directory = []
+        data_offsets = {}  # spool offset -> data offset
+        data_length = 0
+        tmp_path = path + ".data"
+        with open(tmp_path, "wb") as data_file:
+            for tile_id, spool_offset, length in entries:
+                offset = data_offsets.get(spool_offset)
+                if offset is None:
+                    spool.seek(spool_offset)
+                    data_file.write(spool.read(length))
+                    offset = data_offsets[spool_offset] = data_length
+                    data_length += length
+                last = directory[-1] if directory else None
+                if (
+                    last
+                    and last.offset == offset
+                    and last.tile_id + last.run_length == tile_id
+                ):
+                    directory[-1] = last._replace(run_length=last.run_length + 1)
+                else:
+                    directory.append(Entry(tile_id, offset, length, 1))
+
+    root, leaves, leaf_count = build_directories(directory)
+    meta = gzip.compress(
+        json.dumps(metadata or {}, ensure_ascii=False).encode("utf-8"), mtime=0
+    )
+    bounds = bounds or (-180.0, -85.0, 180.0, 85.0)
+    if center is None:
+        center = ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, min_zoom)
+
+    root_offset = HEADER_SIZE
+    metadata_offset = root_offset + len(root)
+    leaf_offset = metadata_offset + len(meta)
+    data_offset = leaf_offset + len(leaves)
+    header = struct.pack(
+        HEADER_FORMAT,
+        b"PMTiles",
+        3,
+        root_offset,
+        len(root),
+        metadata_offset,
+        len(meta),
+        leaf_offset,
+        len(leaves),
+        data_offset,
+        data_length,
+        len(entries),
+        len(directory),
+        len(data_offsets),
+        1,  # clustered
+        COMPRESSION["gzip"],
+        COMPRESSION[tile_compression],
+        TILE_TYPE[tile_type],
+        min_zoom,
+        max_zoom,
+        *(round(v * 1e7) for v in bounds),
+        int(center[2]),
+        round(center[0] * 1e7),
+        round(center[1] * 1e7),
+    )
+    try:
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(root)
+            f.write(meta)
+            f.write(leaves)
+            with open(tmp_path, "rb") as data_file:
+                while True:
+                    block = data_file.read(1 << 20)
+                    if not block:
+                        break
+                    f.write(block)
+    finally:
+        os.remove(tmp_path)
+    return {
+        "addressed_tiles": len(entries),
+        "tile_entries": len(directory),
+        "tile_contents": len(data_offsets),
+        "leaf_directories": leaf_count,
+        "root_bytes": len(root),
+        "data_bytes": data_length,
+        "size": os.path.getsize(path),
+    }
+
+
+# --- Sources ---------------------------------------------------------------
+
+
+def read_mbtiles(path):
+    """(tiles iterator, options) of an MBTiles file; rows are flipped from TMS."""
+    conn = sqlite3.connect(path)
+    metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+    if "json" in metadata:
+        metadata.update(json.loads(metadata.pop("json")))
+    first = conn.execute("SELECT tile_data FROM tiles LIMIT 1").fetchone()
+    gzipped = bool(first) and first[0][:2] == b"\x1f\x8b"
+
+    options = {
+        "tile_type": MBTILES_FORMATS.get(metadata.get("format"), "unknown"),
+        "tile_compression": "gzip" if gzipped else "none",
+        "metadata": metadata,
+    }
+    if "bounds" in metadata:
+        options["bounds"] = tuple(float(v) for v in metadata["bounds"].split(","))
+    if "center" in metadata:
+        options["center"] = tuple(float(v) for v in metadata["center"].split(","))
+
+    def tiles():
+        try:
+            rows = conn.execute(
+                "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+            )
+            for z, x, row, data in rows:
+                yield z, x, (1 << z) - 1 - row, bytes(data)
+        finally:
+            conn.close()
+
+    return tiles(), options
+
+
+def _tile_lonlat(z, x, y):
+    n = 1 << z
+    lon = x / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    return lon, lat
+
+
+def read_tile_directory(path, compress=True):
+    """(tiles iterator, options) of a geojson_tiler {z}/{x}/{y}.json directory."""
+    files = []
+    for z in sorted(os.listdir(path)):
+        if not z.isdigit():
+            continue
+        for x in os.listdir(os.path.join(path, z)):
+            for name in os.listdir(os.path.join(path, z, x)):
+                y, ext = os.path.splitext(name)
+                if y.isdigit():
+                    files.append((int(z), int(x), int(y), ext))
+    if not files:
+        raise ValueError(f"no {{z}}/{{x}}/{{y}} tiles in {path}")
+
+    top = min(z for z, _, _, _ in files)
+    corners = [_tile_lonlat(z, x, y) for z, x, y, _ in files if z == top]
+    corners += [_tile_lonlat(z, x + 1, y + 1) for z, x, y, _ in files if z == top]
+    lons, lats = [c[0] for c in corners], [c[1] for c in corners]
+    options = {
+        "tile_type": "unknown",  # GeoJSON tiles
+        "tile_compression": "gzip" if compress else "none",
+        "metadata": {"format": "json", "source": os.path.basename(path.rstrip("/"))},
+        "bounds": (min(lons), min(lats), max(lons), max(lats)),
+    }
+
+    def tiles():
+        for z, x, y, ext in files:
+            with open(os.path.join(path, str(z), str(x), f"{y}{ext}"), "rb") as f:
+                data = f.read()
+            yield z, x, y, gzip.compress(data, mtime=0) if compress else data
+
+    return tiles(), options
+
+
+def convert(source, output, compress_json=True):
+    if os.path.isdir(source):
+        tiles, options = read_tile_directory(source, compress_json)
+    else:
+        tiles, options = read_mbtiles(source)
+    return write_pmtiles(output, tiles, **options)
+
+
+# --- Reader ----------------------------------------------------------------
+
+
+class FileSource:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.requests = 0
+
+    def __call__(self, offset, length):
+        self.requests += 1
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def close(self):
+        self.file.close()
+
+
+class HttpSource:
+    """Byte ranges of a static file over HTTP (Range: bytes=a-b)."""
+
+    def __init__(self, url, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self.requests = 0
+
+    def __call__(self, offset, length):
+        self.requests += 1
+        request = urllib.request.Request(
+            self.url, headers={"Range": f"bytes={offset}-{offset + length - 1}"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = response.read()
+            if response.status == 200:  # server ignored the range
+                data = data[offset : offset + length]
+        return data
+
+    def close(self):
+        pass
+
+
+class PMTilesReader:
+    """
+    Random tile access through a range source; header and root directory come
+    from the first 16 KB, leaf directories are fetched on demand and cached.
+    """
+
+    def __init__(self, source, cache_size=64):
+        if isinstance(source, str):
+            is_url = source.startswith(("http://", "https://"))
+            source = HttpSource(source) if is_url else FileSource(source)
+        self.source = source
+        head = source(0, ROOT_SIZE)
+        magic, version, *fields = struct.unpack(HEADER_FORMAT, head[:HEADER_SIZE])
+        if magic != b"PMTiles" or version != 3:
+            raise ValueError("not a PMTiles v3 archive")
+        fields[17:21] = [v / 1e7 for v in fields[17:21]]  # bounds
+        fields[22:24] = [v / 1e7 for v in fields[22:24]]  # center lon/lat
+        self.header = Header(*fields)
+        h = self.header
+        self.root = self._indexed(
+            deserialize_directory(head[h.root_offset : h.root_offset + h.root_length])
+        )
+        self._leaves = OrderedDict()
+        self._cache_size = cache_size
+
+    def metadata(self):
+        h = self.header
+        return json.loads(
+            gzip.decompress(self.source(h.metadata_offset, h.metadata_length))
+        )
+
+    @staticmethod
+    def _indexed(entries):
+        return [e.tile_id for e in entries], entries
+
+    def _leaf(self, offset, length):
+        key = (offset, length)
+        directory = self._leaves.get(key)
+        if directory is None:
+            data = self.source(self.header.leaf_offset + offset, length)
+            directory = self._leaves[key] = self._indexed(deserialize_directory(data))
+            if len(self._leaves) > self._cache_size:
+                self._leaves.popitem(last=False)
+        else:
+            self._leaves.move_to_end(key)
+        return directory
+
+    def get_tile(self, z, x, y):
+        """Raw tile bytes (still tile-compressed), or None."""
+        tile_id = zxy_to_tileid(z, x, y)
+        ids, entries = self.root
+        for _ in range(4):  # root + at most three leaf levels
+            entry = find_entry(entries, tile_id, ids)
+            if entry is None:
+                return None
+            if entry.run_length:
+                return self.source(self.header.data_offset + entry.offset, entry.length)
+            ids, entries = self._leaf(entry.offset, entry.length)
+        raise ValueError("directory nesting too deep")
+
+    def get_tile_decoded(self, z, x, y):
+        data = self.get_tile(z, x, y)
+        if data is not None and self.header.tile_compression == COMPRESSION["gzip"]:
+            data = gzip.decompress(data)
+        return data
+
+    def entries(self):
+        """Every tile entry, expanding leaf directories."""
+
+        def walk(entries):
+            for entry in entries:
+                if entry.run_length:
+                    yield entry
+                else:
+                    yield from walk(self._leaf(entry.offset, entry.length)[1])
+
+        return walk(self.root[1])
+
+    def close(self):
+        self.source.close()
+
+
+def verify(path, against):
+    """Read every source tile back through the range reader."""
+    if os.path.isdir(against):
+        tiles, _ = read_tile_directory(against, compress=False)
+        decode = True
+    else:
+        tiles, _ = read_mbtiles(against)
+        decode = False
+    reader = PMTilesReader(path)
+    checked = mismatched = 0
+    for z, x, y, data in tiles:
+        got = reader.get_tile_decoded(z, x, y) if decode else reader.get_tile(z, x, y)
+        checked += 1
+        if got != data:
+            mismatched += 1
+            print(f"  ❌ {z}/{x}/{y}: {len(got or b'')} != {len(data)} bytes")
+    requests = reader.source.requests
+    reader.close()
+    return checked, mismatched, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PMTiles v3 archives")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert", help="MBTiles or tile directory -> PMTiles")
+    p.add_argument("source")
+    p.add_argument("output")
+    p.add_argument(
+        "--no-compress", action="store_true", help="store JSON tiles uncompressed"
+    )
+    p = sub.add_parser("verify", help="compare an archive with its source")
+    p.add_argument("archive")
+    p.add_argument("--against", required=True)
+    p = sub.add_parser("show", help="print header and metadata (file or URL)")
+    p.add_argument("archive")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    start = time.perf_counter()
+    if args.command == "convert":
+        stats = convert(args.source, args.output, not args.no_compress)
+        print(f"✅ PMTiles written: {args.output}")
+        print(f"   Addressed tiles:  {stats['addressed_tiles']:,}")
+        print(f"   Tile entries:     {stats['tile_entries']:,} (after run-length)")
+        print(f"   Unique contents:  {stats['tile_contents']:,}")
+        print(f"   Leaf directories: {stats['leaf_directories']:,}")
+        print(f"   Size:             {stats['size'] / 1024 / 1024:.2f} MB")
+    elif args.command == "verify":
+        checked, mismatched, requests = verify(args.archive, args.against)
+        status = "✅" if not mismatched else "❌"
+        print(
+            f"{status} {checked:,} tiles checked, {mismatched:,} mismatched, "
+            f"{requests:,} range reads"
+        )
+        if mismatched:
+            sys.exit(1)
+    else:
+        reader = PMTilesReader(args.archive)
+        for key, value in reader.header._asdict().items():
+            print(f"  {key:22} {value}")
+        print(json.dumps(reader.metadata(), ensure_ascii=False, indent=2)[:2000])
+        reader.close()
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Flat NumPy polygon arrays, uniform-grid index and vectorized point-in-polygon.
+
+Mọi polygon (Polygon, MultiPolygon và LineString khép kín của bản vẽ CAD như
+ranh giới tổ trong 260to.geojson) được gom vào các mảng phẳng:
+  xy            (V, 2)  đỉnh của mọi vòng (vòng luôn khép kín)
+  ring_offsets  (R+1,)  vòng -> đỉnh
+  poly_rings    (P+1,)  polygon -> vòng (vòng đầu là vòng ngoài)
+  feature       (P,)    chỉ số feature nguồn
+Phép thử even-odd chạy trên các cặp (điểm, polygon) ứng viên lấy từ lưới đều.
+"""
+
+import math
+
+import numpy as np
+
+PIP_CHUNK_EDGES = 4_000_000
+
+
+def _closed(ring):
+    ring = np.asarray(ring, dtype=np.float64)[:, :2]
+    if len(ring) and not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+    return ring
+
+
+def is_closed_line(line):
+    return len(line) >= 4 and line[0][:2] == line[-1][:2]
+
+
+def feature_polygons(feature, close_lines=True):
+    """List of polygons (each a list of closed (n, 2) ring arrays) of a feature."""
+    geom = feature.get("geometry") or {}
+    geom_type = geom.get("type")
+    coords = geom.get("coordinates")
+    if not coords:
+        return []
+    if geom_type == "Polygon":
+        polygons = [coords]
+    elif geom_type == "MultiPolygon":
+        polygons = coords
+    elif close_lines and geom_type == "LineString":
+        polygons = [[coords]] if is_closed_line(coords) else []
+    elif close_lines and geom_type == "MultiLineString":
+        polygons = [[line] for line in coords if is_closed_line(line)]
+    else:
+        return []
+    result = []
+    for rings in polygons:
+        rings = [_closed(ring) for ring in rings if len(ring) >= 3]
+        if rings:
+            result.append(rings)
+    return result
+
+
+def ring_area(ring):
+    """Signed shoelace area of a closed ring (positive = counter-clockwise)."""
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+class PolygonSet:
+    """All polygons of a feature collection as flat NumPy arrays."""
+
+    def __init__(self, polygons, feature_index):
+        rings = [ring for poly in polygons for ring in poly]
+        self.xy = np.concatenate(rings) if rings else np.zeros((0, 2))
+        self.ring_offsets = np.concatenate(
+            [[0], np.cumsum([len(r) for r in rings])]
+        ).astype(np.int64)
+        self.poly_rings = np.concatenate(
+            [[0], np.cumsum([len(p) for p in polygons])]
+        ).astype(np.int64)
+        self.feature = np.asarray(feature_index, dtype=np.int64)
+        self.area = np.array(
+            [
+                abs(ring_area(poly[0])) - sum(abs(ring_area(r)) for r in poly[1:])
+                for poly in polygons
+            ]
+        )
+
+        # Edges: every vertex except the closing one of each ring
+        is_last = np.zeros(len(self.xy), dtype=bool)
+        is_last[self.ring_offsets[1:] - 1] = True
+        self.edge_start = np.flatnonzero(~is_last)
+        ring_edges = np.diff(self.ring_offsets) - 1
+        poly_edges = np.zeros(len(polygons), dtype=np.int64)
+        if len(polygons):
+            poly_edges = np.add.reduceat(ring_edges, self.poly_rings[:-1])
+        self.edge_offsets = np.concatenate([[0], np.cumsum(poly_edges)]).astype(
+            np.int64
+        )
+
+        # Per-polygon bbox from its vertices
+        starts = self.ring_offsets[self.poly_rings[:-1]]
+        if len(polygons):
+            self.bbox = np.column_stack(
+                [
+                    np.minimum.reduceat(self.xy[:, 0], starts),
+                    np.minimum.reduceat(self.xy[:, 1], starts),
+                    np.maximum.reduceat(self.xy[:, 0], starts),
+                    np.maximum.reduceat(self.xy[:, 1], starts),
+                ]
+            )
+        else:
+            self.bbox = np.zeros((0, 4))
+
+    @classmethod
+    def from_features(cls, features, close_lines=True):
+        polygons = []
+        owners = []
+        for i, feature in enumerate(features):
+            for poly in feature_polygons(feature, close_lines):
+                polygons.append(poly)
+                owners.append(i)
+        return cls(polygons, owners)
+
+    def __len__(self):
+        return len(self.feature)
+
+    def rings(self, index):
+        """Closed ring arrays of polygon `index` (exterior first)."""
+        return [
+            self.xy[self.ring_offsets[r] : self.ring_offsets[r + 1]]
+            for r in range(self.poly_rings[index], self.poly_rings[index + 1])
+        ]
+
+    def contains(self, px, py, poly):
+        """Even-odd test for candidate pairs (px[i], py[i]) in polygon poly[i]."""
+        px = np.asarray(px, dtype=np.float64)
+        py = np.asarray(py, dtype=np.float64)
+        poly = np.asarray(poly, dtype=np.int64)
+        inside = np.zeros(len(poly), dtype=bool)
+        counts = np.diff(self.edge_offsets)[poly]
+
+        start = 0
+        while start < len(poly):
+            # Chunk so the expanded pair x edge arrays stay bounded
+            csum = np.cumsum(counts[start:])
+            stop = start + max(1, int(np.searchsorted(csum, PIP_CHUNK_EDGES)))
+            sl = slice(start, stop)
+            n_edges = counts[sl]
+            pair = np.repeat(np.arange(stop - start), n_edges)
+            first = np.repeat(self.edge_offsets[poly[sl]], n_edges)
+            within = np.arange(len(pair)) - np.repeat(
+                np.cumsum(n_edges) - n_edges, n_edges
+            )
+            edge = self.edge_start[first + within]
+
+            x1, y1 = self.xy[edge, 0], self.xy[edge, 1]
+            x2, y2 = self.xy[edge + 1, 0], self.xy[edge + 1, 1]
+            qx, qy = px[sl][pair], py[sl][pair]
+            straddle = (y1 > qy) != (y2 > qy)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = x1 + (qy - y1) * (x2 - x1) / (y2 - y1)
+            crossing = straddle & (qx < x_cross)
+            parity = np.bincount(pair, weights=crossing, minlength=stop - start)
+            inside[sl] = parity.astype(np.int64) % 2 == 1
+            start = stop
+        return inside
+
+
+class GridIndex:
+    """Uniform grid over polygon bboxes; yields candidate (point, polygon) pairs."""
+
+    def __init__(self, bbox, cells_per_side=None):
+        self.bbox = np.asarray(bbox, dtype=np.float64)
+        n = len(self.bbox)
+        if n == 0:
+            self.origin = np.zeros(2)
+            self.cell = 1.0
+            self.shape = (1, 1)
+            self.cell_start = np.zeros(2, dtype=np.int64)
+            self.items = np.zeros(0, dtype=np.int64)
+            return
+
+        min_x, min_y = self.bbox[:, 0].min(), self.bbox[:, 1].min()
+        max_x, max_y = self.bbox[:, 2].max(), self.bbox[:, 3].max()
+        side = cells_per_side or max(1, int(math.sqrt(n)))
+        self.cell = max(max_x - min_x, max_y - min_y, 1e-12) / side
+        self.origin = np.array([min_x, min_y])
+        nx = int((max_x - min_x) / self.cell) + 1
+        ny = int((max_y - min_y) / self.cell) + 1
+        self.shape = (ny, nx)
+
+        ix0, iy0 = self._cell(self.bbox[:, 0], self.bbox[:, 1])
+        ix1, iy1 = self._cell(self.bbox[:, 2], self.bbox[:, 3])
+        wx = ix1 - ix0 + 1
+        wy = iy1 - iy0 + 1
+        per = wx * wy
+        item = np.repeat(np.arange(n), per)
+        k = np.arange(per.sum()) - np.repeat(np.cumsum(per) - per, per)
+        cx = ix0[item] + k % wx[item]
+        cy = iy0[item] + k // wx[item]
+        cell_id = cy * nx + cx
+
+        order = np.argsort(cell_id, kind="stable")
+        self.items = item[order]
+        self.cell_start = np.searchsorted(
+            cell_id[order], np.arange(nx * ny + 1), side="left"
+        )
+
+    def _cell(self, x, y):
+        ny, nx = self.shape
+        ix = np.clip(((x - self.origin[0]) / self.cell).astype(np.int64), 0, nx - 1)
+        iy = np.clip(((y - self.origin[1]) / self.cell).astype(np.int64), 0, ny - 1)
+        return ix, iy
+
+    def candidates(self, x, y):
+        """(point_idx, item_idx) pairs whose bbox contains the point."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        ny, nx = self.shape
+        ix, iy = self._cell(x, y)
+        cell = iy * nx + ix
+        start = self.cell_start[cell]
+        count = self.cell_start[cell + 1] - start
+        point = np.repeat(np.arange(len(x)), count)
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        item = self.items[np.repeat(start, count) + offset]
+
+        b = self.bbox[item]
+        px, py = x[point], y[point]
+        keep = (px >= b[:, 0]) & (px <= b[:, 2]) & (py >= b[:, 1]) & (py <= b[:, 3])
+        return point[keep], item[keep]
+
+
+def locate_points(polygons, x, y, index=None):
+    """
+    Index of the smallest polygon containing each point (-1 if none).
+    Nested polygons resolve to the innermost one.
+    """
+    index = index or GridIndex(polygons.bbox)
+    point, poly = index.candidates(x, y)
+    hit = polygons.contains(np.asarray(x)[point], np.asarray(y)[point], poly)
+    point, poly = point[hit], poly[hit]
+
+    result = np.full(len(x), -1, dtype=np.int64)
+    # Sort by point, then area: the first pair of each point is the innermost
+    order = np.lexsort((polygons.area[poly], point))
+    point, poly = point[order], poly[order]
+    first = np.unique(point, return_index=True)[1]
+    result[point[first]] = poly[first]
+    return result
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Offline search index over map labels, administrative units and organizations.
+
+Tìm chi bộ, tổ dân phố, cơ sở y tế / giáo dục / ... theo tên mà không phải duyệt
+tuần tự text_labels.json và các danh sách tổ chức. Tên được chuẩn hoá và bỏ
+dấu ("Mỹ Đa Đông" -> "my da dong", đ -> d) rồi đánh index hai cách:
+  - bảng tiền tố: các từ (token) sắp xếp + danh sách doc chứa từ đó; mỗi từ của
+    câu truy vấn là tiền tố của một từ trong tên (gõ tới đâu ra tới đó)
+  - posting list trigram: bắt lỗi gõ / thiếu chữ khi tiền tố không đủ kết quả
+Mỗi kết quả có payload: loại, toạ độ (lon/lat) và bbox nếu có (tổ, chi bộ).
+
+Nguồn:
+  - nhãn text CAD: HOAHAI / HOAQUY / KM / MYAN.geojson, tools/text_labels.json
+  - ranh giới tổ 260to.geojson (bbox tổ, chi bộ = hợp các tổ)
+  - y_te, giao_duc, nha_sinh_hoat, ton_giao, cong_vien.geojson
+  - scripts/tdp_meeting_locations.json (địa điểm họp theo tổ)
+  - danh sách tổ chức Đảng (scripts/Danh_Sach_To_Chuc_Dang_*.xlsx, hoặc
+    organization_names_actual.txt khi không có openpyxl)
+File index là JSON gọn (postings mã hoá delta), app cũng đọc được.
+
+Usage:
+    python tools/search_index.py build
+    python tools/search_index.py query "my da dong"
+    python tools/search_index.py bench
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from label_anchors import compute_anchors
+from label_join import classify, load_labels
+from vn2000 import vn2000_to_wgs84_np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAPS = os.path.join(ROOT, "assets", "maps")
+INDEX_FILE = os.path.join(MAPS, "search_index.json")
+POLYGON_FILE = os.path.join(MAPS, "260to.geojson")
+LABEL_FILES = [
+    os.path.join(MAPS, f"{ward}.geojson") for ward in ("HOAHAI", "HOAQUY", "KM", "MYAN")
+] + [os.path.join(ROOT, "tools", "text_labels.json")]
+FACILITY_FILES = {
+    "y_te": os.path.join(MAPS, "y_te.geojson"),
+    "giao_duc": os.path.join(MAPS, "giao_duc.geojson"),
+    "nha_sinh_hoat": os.path.join(MAPS, "nha_sinh_hoat.geojson"),
+    "ton_giao": os.path.join(MAPS, "ton_giao.geojson"),
+    "cong_vien": os.path.join(MAPS, "cong_vien.geojson"),
+}
+MEETING_FILE = os.path.join(ROOT, "scripts", "tdp_meeting_locations.json")
+ORGANIZATION_XLSX = os.path.join(
+    ROOT, "scripts", "Danh_Sach_To_Chuc_Dang_2025-12-16 đã sửa.xlsx"
+)
+ORGANIZATION_TXT = os.path.join(ROOT, "scripts", "organization_names_actual.txt")
+
+INDEX_VERSION = 1
+FUZZY_THRESHOLD = 0.3  # trigram Jaccard similarity
+# Ties are broken by kind: units first, then places, organizations, raw labels
+KINDS = [
+    "to_dan_pho",
+    "chi_bo",
+    "nha_sinh_hoat",
+    "y_te",
+    "giao_duc",
+    "ton_giao",
+    "cong_vien",
+    "to_chuc_dang",
+    "label",
+]
+
+NON_WORD = re.compile(r"[^0-9a-z]+")
+ORG_LINE = re.compile(r"^\s*\d+\.\s*\[STT:\s*(\d+)\]\s*(.+?)\s*$")
+PARENTHESES = re.compile(r"\([^)]*\)?")
+CHI_BO_PREFIX = re.compile(r"^(dang bo|chi bo) ")
+
+
+def fold(text):
+    """Lowercase ASCII form: diacritics removed, đ -> d, punctuation -> space."""
+    text = unicodedata.normalize("NFD", str(text).replace("đ", "d").replace("Đ", "D"))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(NON_WORD.sub(" ", text).split())
+
+
+def trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def unit_key(name):
+    """Match key for chi bộ names: folded, no parentheses, no leading zeros."""
+    words = fold(PARENTHESES.sub(" ", name)).split()
+    return " ".join(w.lstrip("0") or "0" if w.isdigit() else w for w in words)
+
+
+# --- Collecting documents ----------------------------------------------------
+
+
+def _doc(name, kind, lon=None, lat=None, bbox=None, info=None, aliases=()):
+    return {
+        "name": " ".join(str(name).split()),
+        "kind": kind,
+        "lon": lon,
+        "lat": lat,
+        "bbox": bbox,
+        "info": info,
+        "aliases": list(aliases),
+    }
+
+
+def _bbox(points):
+    return [*points.min(axis=0).tolist(), *points.max(axis=0).tolist()]
+
+
+def collect_units(polygon_file=POLYGON_FILE, label_files=LABEL_FILES):
+    """Tổ and chi bộ docs from the 260to boundaries plus ward text labels."""
+    with open(polygon_file, "r", encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+
+    vertices = defaultdict(list)
+    votes = defaultdict(Counter)
+    for feature in features:
+        props = feature.get("properties") or {}
+        kind, name = classify(str(props.get("ToDP") or ""))
+        if kind != "ToDP":
+            continue
+        if props.get("ChiBo"):
+            votes[name][" ".join(str(props["ChiBo"]).split())] += 1
+        geom = feature.get("geometry") or {}
+        if geom.get("type") in ("LineString", "MultiLineString"):
+            coords = np.asarray(geom["coordinates"], dtype=np.float64)
+            vertices[name].append(coords.reshape(-1, coords.shape[-1])[:, :2])
+
+    tos = {}
+    for name, parts in vertices.items():
+        points = np.concatenate(parts)
+        lon, lat = points.mean(axis=0).tolist()
+        tos[name] = _doc(name, "to_dan_pho", lon, lat, _bbox(points))
+    for anchor in compute_anchors(features):  # polylabel centre when closed
+        kind, name = classify(str(anchor["ToDP"] or ""))
+        if kind == "ToDP" and name in tos and not tos[name].get("anchored"):
+            tos[name].update(lon=anchor["lon"], lat=anchor["lat"], anchored=True)
+
+    chi_bos = {}
+    for name, counter in votes.items():
+        chi_bo = counter.most_common(1)[0][0]
+        _, chi_bo = classify(chi_bo)
+        unit = chi_bos.setdefault(unit_key(chi_bo), _doc(chi_bo, "chi_bo", info=[]))
+        unit["info"].append(name)
+        tos[name]["info"] = chi_bo
+
+    # Text labels: units without a boundary get the label point
+    others = defaultdict(list)
+    for label in load_labels(label_files):
+        x, y = label["x"], label["y"]
+        if abs(x) > 180:
+            x, y = (float(v) for v in vn2000_to_wgs84_np(x, y))
+        kind, name = classify(label["text"])
+        if kind == "ToDP":
+            unit = tos.setdefault(name, _doc(name, "to_dan_pho"))
+        elif kind == "ChiBo":
+            unit = chi_bos.setdefault(unit_key(name), _doc(name, "chi_bo", info=[]))
+        else:
+            others[fold(name)].append((name, x, y))
+            continue
+        unit.setdefault("label_point", (x, y))
+
+    for unit in chi_bos.values():
+        members = [tos[m] for m in unit["info"] if tos[m]["bbox"]]
+        if members:
+            boxes = np.array([m["bbox"] for m in members])
+            unit["bbox"] = [*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0)]
+            unit["bbox"] = [float(v) for v in unit["bbox"]]
+            unit["lon"] = float(np.mean([m["lon"] for m in members]))
+            unit["lat"] = float(np.mean([m["lat"] for m in members]))
+        unit["info"] = ", ".join(sorted(unit["info"], key=_number)) or None
+    for unit in list(tos.values()) + list(chi_bos.values()):
+        point = unit.pop("label_point", None)
+        unit.pop("anchored", None)
+        if unit["lon"] is None and point:
+            unit["lon"], unit["lat"] = point
+        number = _number(unit["name"])
+        if unit["kind"] == "to_dan_pho" and number is not None:
+            unit["aliases"] = [f"Tổ dân phố {number}", f"TDP {number}"]
+
+    # Other labels: one doc per distinct text, at the occurrence nearest the mean
+    labels = []
+    for occurrences in others.values():
+        points = np.array([(x, y) for _, x, y in occurrences])
+        nearest = np.argmin(((points - points.mean(axis=0)) ** 2).sum(axis=1))
+        bbox = _bbox(points) if len(points) > 1 else None
+        lon, lat = points[nearest].tolist()
+        labels.append(_doc(occurrences[0][0], "label", lon, lat, bbox))
+    return list(tos.values()), list(chi_bos.values()), labels
+
+
+def _number(name):
+    match = re.search(r"\d+", name)
+    return int(match.group()) if match else None
+
+
+def collect_facilities(files=FACILITY_FILES, meeting_file=MEETING_FILE, tos=()):
+    docs = []
+    for kind, path in files.items():
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+        for feature in features:
+            props = feature.get("properties") or {}
+            geom = feature.get("geometry") or {}
+            if not props.get("name"):
+                continue
+            lon = lat = None
+            if geom.get("type") == "Point":
+                lon, lat = geom["coordinates"][:2]
+            docs.append(_doc(props["name"], kind, lon, lat, info=props.get("address")))
+
+    # Meeting places: add served tổ to the matching nhà sinh hoạt, or place
+    # the meeting point on the tổ it serves
+    if os.path.exists(meeting_file):
+        with open(meeting_file, "r", encoding="utf-8") as f:
+            meetings = json.load(f)
+        by_name = {fold(d["name"]): d for d in docs if d["kind"] == "nha_sinh_hoat"}
+        tos = {_number(t["name"]): t for t in tos}
+        seen = set()
+        for meeting in meetings.values():
+            numbers = meeting.get("tdpNumbers") or []
+            aliases = [f"TDP {n}" for n in numbers]
+            doc = by_name.get(fold(meeting["name"]))
+            if doc is None:
+                key = fold(meeting["name"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                served = [tos[n] for n in numbers if n in tos and tos[n]["lon"]]
+                lon = served[0]["lon"] if served else None
+                lat = served[0]["lat"] if served else None
+                doc = _doc(meeting["name"], "nha_sinh_hoat", lon, lat)
+                doc["info"] = meeting.get("address")
+                docs.append(doc)
+                by_name[key] = doc
+            doc["aliases"] = sorted(set(doc["aliases"]) | set(aliases), key=_number)
+    return docs
+
+
+def collect_organizations(chi_bos=(), facilities=()):
+    """
+    Party organizations. Located at the map chi bộ with the same name, or at
+    the facility they are based in ("Chi bộ Trường THPT ..." -> the school).
+    """
+    rows = []
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        load_workbook = None
+    if load_workbook and os.path.exists(ORGANIZATION_XLSX):
+        sheet = load_workbook(ORGANIZATION_XLSX, read_only=True).worksheets[0]
+        header = None
+        for values in sheet.iter_rows(values_only=True):
+            if header is None:
+                header = [str(v or "").strip() for v in values]
+                continue
+            row = dict(zip(header, values))
+            if row.get("Tên Tổ Chức"):
+                secretary = " ".join(str(row.get("Bí Thư") or "").split())
+                rows.append((str(row["Tên Tổ Chức"]), secretary or None))
+    elif os.path.exists(ORGANIZATION_TXT):
+        print("⚠️  openpyxl not found, reading organization_names_actual.txt")
+        with open(ORGANIZATION_TXT, "r", encoding="utf-8") as f:
+            for line in f:
+                match = ORG_LINE.match(line)
+                if match:
+                    rows.append((match.group(2), None))
+
+    units = {unit_key(c["name"]): c for c in chi_bos}
+    places = {unit_key(f["name"]): f for f in facilities if f["lon"] is not None}
+    docs = []
+    for name, secretary in rows:
+        doc = _doc(
+            name, "to_chuc_dang", info=f"Bí thư: {secretary}" if secretary else None
+        )
+        key = unit_key(name)
+        unit = units.get(key) or places.get(CHI_BO_PREFIX.sub("", key))
+        if unit is not None:
+            doc.update(lon=unit["lon"], lat=unit["lat"], bbox=unit["bbox"])
+        docs.append(doc)
+    return docs
+
+
+def collect_documents():
+    tos, chi_bos, labels = collect_units()
+    docs = tos + chi_bos
+    facilities = collect_facilities(tos=tos)
+    docs += facilities
+    docs += collect_organizations(chi_bos, facilities)
+    docs += labels
+    return docs
+
+
+# --- Index -------------------------------------------------------------------
+
+
+def _delta(ids):
+    ids = sorted(ids)
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])] if ids else []
+
+
+def _undelta(values):
+    return np.cumsum(values, dtype=np.int64).tolist()
+
+
+def build_index(docs):
+    """Compact index dict: columnar docs, sorted token table, trigram postings."""
+    docs = sorted(
+        docs, key=lambda d: (KINDS.index(d["kind"]), _number(d["name"]) or 0, d["name"])
+    )
+    token_docs = defaultdict(set)
+    trigram_docs = defaultdict(set)
+    for i, doc in enumerate(docs):
+        names = [fold(doc["name"])] + [fold(a) for a in doc["aliases"]]
+        for name in names:
+            for token in name.split():
+                token_docs[token].add(i)
+        for gram in trigrams(names[0]):
+            trigram_docs[gram].add(i)
+
+    def rounded(value):
+        return None if value is None else round(float(value), 6)
+
+    tokens = sorted(token_docs)
+    grams = sorted(trigram_docs)
+    return {
+        "version": INDEX_VERSION,
+        "kinds": KINDS,
+        "docs": {
+            "name": [d["name"] for d in docs],
+            "kind": [KINDS.index(d["kind"]) for d in docs],
+            "lon": [rounded(d["lon"]) for d in docs],
+            "lat": [rounded(d["lat"]) for d in docs],
+            "bbox": [
+                [rounded(v) for v in d["bbox"]] if d["bbox"] else None for d in docs
+            ],
+            "info": [d["info"] for d in docs],
+            "aliases": [d["aliases"] or None for d in docs],
+        },
+        "tokens": tokens,
+        "token_docs": [_delta(token_docs[t]) for t in tokens],
+        "trigrams": grams,
+        "trigram_docs": [_delta(trigram_docs[g]) for g in grams],
+    }
+
+
+class SearchIndex:
+    """Type-ahead search over a built index (dict or file)."""
+
+    def __init__(self, index):
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"unsupported search index version {index.get('version')}")
+        docs = index["docs"]
+        self.kinds = index["kinds"]
+        self.names = docs["name"]
+        self.docs = docs
+        self.folded = [fold(name) for name in self.names]
+        self.tokens = index["tokens"]
+        self.token_docs = [_undelta(p) for p in index["token_docs"]]
+        self.trigram_docs = dict(
+            zip(index["trigrams"], (_undelta(p) for p in index["trigram_docs"]))
+        )
+        self.gram_counts = [len(trigrams(name)) for name in self.folded]
+        self._prefix_cache = {}
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix(self, token):
+        """Doc ids with a token starting with `token`."""
+        ids = self._prefix_cache.get(token)
+        if ids is None:
+            start = bisect_left(self.tokens, token)
+            end = bisect_left(self.tokens, token + "\x7f", start)
+            ids = set()
+            for postings in self.token_docs[start:end]:
+                ids.update(postings)
+            if len(self._prefix_cache) > 4096:
+                self._prefix_cache.clear()
+            self._prefix_cache[token] = ids
+        return ids
+
+    def _result(self, i, score):
+        docs = self.docs
+        return {
+            "name": self.names[i],
+            "kind": self.kinds[docs["kind"][i]],
+            "lon": docs["lon"][i],
+            "lat": docs["lat"][i],
+            "bbox": docs["bbox"][i],
+            "info": docs["info"][i],
+            "score": score,
+        }
+
+    def search(self, query, limit=10, kinds=None):
+        """Best matches for a (partial) query, prefix matches before fuzzy ones."""
+        folded = fold(query)
+        if not folded:
+            return []
+        allowed = None if kinds is None else {self.kinds.index(k) for k in kinds}
+        kind_of = self.docs["kind"]
+
+        words = folded.split()
+        ids = None
+        for word in sorted(words, key=len, reverse=True):  # rarest first
+            matches = self._prefix(word)
+            ids = matches if ids is None else ids & matches
+            if not ids:
+                break
+        ranked = []
+        for i in ids or ():
+            if allowed is not None and kind_of[i] not in allowed:
+                continue
+            name = self.folded[i]
+            if name == folded:
+                score = 1.0
+            elif name.startswith(folded):
+                score = 0.9
+            else:
+                score = 0.8
+            ranked.append((-score, kind_of[i], len(name), i))
+        ranked.sort()
+        results = [self._result(i, -s) for s, _, _, i in ranked[:limit]]
+
+        if len(results) < limit:
+            grams = trigrams(folded)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.trigram_docs.get(gram, ()))
+            found = {r[3] for r in ranked}
+            fuzzy = []
+            for i, count in shared.items():
+                if i in found or (allowed is not None and kind_of[i] not in allowed):
+                    continue
+                similarity = count / (len(grams) + self.gram_counts[i] - count)
+                if similarity >= FUZZY_THRESHOLD:
+                    fuzzy.append((-similarity, kind_of[i], i))
+            fuzzy.sort()
+            for s, _, i in fuzzy[: limit - len(results)]:
+                results.append(self._result(i, round(-s * 0.7, 3)))
+        return results
+
+
+def save_index(index, path=INDEX_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def benchmark(search, queries, repeat=3):
+    """Per-query latency (ms) over `repeat` passes."""
+    times = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search.search(query)
+            times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index for map names")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--output", default=INDEX_FILE)
+    p = sub.add_parser("query")
+    p.add_argument("text")
+    p.add_argument("--index", default=INDEX_FILE)
+    p.add_argument("--limit", type=int, default=10)
+    p.add_argument("--kind", action="append", choices=KINDS)
+    p = sub.add_parser("bench", help="type-ahead latency over name prefixes")
+    p.add_argument("--index", default=INDEX_FILE)
+    p.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    if args.command == "build":
+        start = time.perf_counter()
+        docs = collect_documents()
+        index = build_index(docs)
+        save_index(index, args.output)
+        counts = Counter(d["kind"] for d in docs)
+        located = sum(d["lon"] is not None for d in docs)
+        print(f"✅ Search index saved: {args.output}")
+        print(f"   Documents: {len(docs):,} ({located:,} with a location)")
+        for kind in KINDS:
+            if counts[kind]:
+                print(f"   - {kind}: {counts[kind]:,}")
+        print(
+            f"   Tokens: {len(index['tokens']):,}, trigrams: {len(index['trigrams']):,}"
+        )
+        print(f"   Size: {os.path.getsize(args.output) / 1024:.1f} KB")
+        print(f"Done in {time.perf_counter() - start:.2f}s")
+    elif args.command == "query":
+        search = SearchIndex.load(args.index)
+        start = time.perf_counter()
+        results = search.search(args.text, args.limit, args.kind)
+        elapsed = (time.perf_counter() - start) * 1000
+        for r in results:
+            where = f"{r['lat']:.6f},{r['lon']:.6f}" if r["lon"] is not None else "-"
+            print(f"{r['score']:.2f}  [{r['kind']}] {r['name']}  ({where})")
+            if r["info"]:
+                print(f"      {r['info']}")
+        print(f"{len(results)} results in {elapsed:.3f} ms")
+    else:
+        search = SearchIndex.load(args.index)
+        rng = random.Random(1)
+        queries = []
+        for _ in range(args.queries):
+            name = rng.choice(search.names)
+            if rng.random() < 0.5:
+                name = fold(name)  # typed without diacritics
+            queries.append(name[: rng.randint(1, len(name))])
+        times = benchmark(search, queries)
+        print(f"{len(search):,} documents, {len(queries):,} prefix queries")
+        p50, p99 = np.percentile(times, [50, 99])
+        print(f"   Mean {times.mean():.3f} ms, p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Delta tile packages for over-the-air map updates.
+
+Khi dữ liệu CAD thay đổi, thay vì build lại và phát hành toàn bộ bộ tile trong
+app, so sánh hai bản build (hash nội dung từng tile) và chỉ đưa lên storage
+các tile mới / thay đổi. App tải delta tương ứng với phiên bản đang có, rồi
+chỉ tải các object nó còn thiếu.
+
+Storage lưu theo địa chỉ nội dung (content-addressed), nén gzip:
+    objects/ab/ab12...ef.gz         nội dung tile, key = sha256 của tile gốc
+    builds/<version>.json.gz        manifest một bản build: {z/x/y: sha256}
+    deltas/<from>..<to>.json.gz     added / changed / removed + index mới
+    latest.json                     {"version": ..., "delta": {<from>: key}}
+Tile trùng nội dung (giữa các ô hoặc giữa các lần build) chỉ lưu một lần.
+
+<version> là hash của manifest nên hai bản build giống nhau có cùng version.
+LocalStore là bản thay thế bằng thư mục local cho bucket; client bucket nào có
+cùng exists / get / put đều dùng được.
+
+Bản build: thư mục {z}/{x}/{y}.json (geojson_tiler.py), thư mục đã đóng gói
+(pack_tile_bundles.py) hoặc file .mbtiles. Bản build cũ cũng có thể là một
+version đã publish trong store.
+
+Usage:
+    python tools/tile_delta.py publish assets/maps/tiles --store build/ota
+    python tools/tile_delta.py diff old_tiles assets/maps/tiles --store build/ota
+    python tools/tile_delta.py diff 3f2a9c0d11e4b7a2 assets/maps/tiles --store build/ota
+    python tools/tile_delta.py apply old_tiles --store build/ota \\
+        --delta deltas/3f2a9c0d11e4b7a2..9b1e0c7d2f3a4e5b.json.gz --output new_tiles
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from pack_tile_bundles import TABLE_NAME, TileBundleReader
+from pmtiles import read_mbtiles, read_tile_directory
+
+DELTA_FORMAT = 1
+
+
+class LocalStore:
+    """Filesystem stand-in for the storage bucket (keys are relative paths)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # readers never see a partial object
+
+
+def object_key(digest):
+    return f"objects/{digest[:2]}/{digest}.gz"
+
+
+def build_key(version):
+    return f"builds/{version}.json.gz"
+
+
+def delta_key(old_version, new_version):
+    return f"deltas/{old_version}..{new_version}.json.gz"
+
+
+def put_json(store, key, value):
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    store.put(key, gzip.compress(data.encode("utf-8"), mtime=0))
+
+
+def get_json(store, key):
+    return json.loads(gzip.decompress(store.get(key)))
+
+
+def open_build(path):
+    """(tiles iterator of (z, x, y, bytes), tile extension, index or None)."""
+    if path.endswith(".mbtiles"):
+        tiles, options = read_mbtiles(path)
+        fmt = options["metadata"].get("format", "pbf")
+        return tiles, "." + fmt, None
+
+    index = None
+    index_file = os.path.join(path, "index.json")
+    if os.path.exists(index_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+    if os.path.exists(os.path.join(path, TABLE_NAME)):
+        reader = TileBundleReader(path)
+
+        def bundled():
+            try:
+                for z, x, y in reader.tiles():
+                    yield z, x, y, reader.get(z, x, y)
+            finally:
+                reader.close()
+
+        return bundled(), ".json", index
+
+    tiles, _ = read_tile_directory(path, compress=False)
+    return tiles, ".json", index
+
+
+def tile_hashes(path):
+    """{"z/x/y": sha256} of a build."""
+    tiles, _, _ = open_build(path)
+    return {f"{z}/{x}/{y}": hashlib.sha256(data).hexdigest() for z, x, y, data in tiles}
+
+
+def version_of(hashes):
+    """Short id of a build: hash of its sorted manifest."""
+    digest = hashlib.sha256()
+    for key in sorted(hashes):
+        digest.update(f"{key} {hashes[key]}\n".encode("ascii"))
+    return digest.hexdigest()[:16]
+
+
+def publish(path, store):
+    """Upload every missing object of a build plus its manifest."""
+    tiles, ext, index = open_build(path)
+    hashes = {}
+    uploaded = 0
+    for z, x, y, data in tiles:
+        digest = hashlib.sha256(data).hexdigest()
+        hashes[f"{z}/{x}/{y}"] = digest
+        if not store.exists(object_key(digest)):
+            store.put(object_key(digest), gzip.compress(data, mtime=0))
+            uploaded += 1
+    version = version_of(hashes)
+    put_json(store, build_key(version), {"tiles": hashes, "ext": ext, "index": index})
+    set_latest(store, version)
+    return version, {"tiles": len(hashes), "uploaded": uploaded}
+
+
+def make_delta(old, new_path, store):
+    """
+    Diff two builds and upload the delta package.
+
+    `old` is a build path or a version already published in the store; only
+    objects of added / changed tiles are uploaded.
+    """
+    if store.exists(build_key(old)):
+        old_hashes = get_json(store, build_key(old))["tiles"]
+    else:
+        old_hashes = tile_hashes(old)
+    old_version = version_of(old_hashes)
+
+    tiles, ext, index = open_build(new_path)
+    new_hashes = {}
+    added, changed = {}, {}
+    objects = {}
+    uploaded = 0
+    for z, x, y, data in tiles:
+        key = f"{z}/{x}/{y}"
+        digest = hashlib.sha256(data).hexdigest()
+        new_hashes[key] = digest
+        if old_hashes.get(key) == digest:
+            continue
+        (changed if key in old_hashes else added)[key] = digest
+        if digest not in objects:
+            if store.exists(object_key(digest)):
+                packed = store.get(object_key(digest))
+            else:
+                packed = gzip.compress(data, mtime=0)
+                store.put(object_key(digest), packed)
+                uploaded += 1
+            objects[digest] = len(packed)
+    removed = sorted(set(old_hashes) - set(new_hashes))
+
+    new_version = version_of(new_hashes)
+    delta = {
+        "format": DELTA_FORMAT,
+        "from": old_version,
+        "to": new_version,
+        "ext": ext,
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "objects": objects,
+        "download_bytes": sum(objects.values()),
+        "index": index,
+    }
+    key = delta_key(old_version, new_version)
+    put_json(store, key, delta)
+    put_json(
+        store, build_key(new_version), {"tiles": new_hashes, "ext": ext, "index": index}
+    )
+
+    set_latest(store, new_version, old_version, key)
+    return key, delta, uploaded
+
+
+def set_latest(store, version, old_version=None, key=None):
+    """
+    latest.json: newest version plus the deltas leading to it. Deltas to an
+    older version are dropped; clients without a delta download the build.
+    """
+    latest = {"version": version, "delta": {}}
+    if store.exists("latest.json"):
+        current = json.loads(store.get("latest.json"))
+        if current.get("version") == version:
+            latest = current
+    if key:
+        latest["delta"][old_version] = key
+    store.put("latest.json", json.dumps(latest, indent=2).encode("utf-8"))
+
+
+def apply_delta(old_path, store, key, output_dir):
+    """
+    Client side: rebuild the new tile directory from the old build and the
+    delta, fetching only the objects the delta lists.
+    """
+    delta = get_json(store, key)
+    if delta.get("format") != DELTA_FORMAT:
+        raise ValueError(f"unsupported delta format {delta.get('format')}")
+    tiles, ext, _ = open_build(old_path)
+    tiles = list(tiles)
+    old_hashes = {
+        f"{z}/{x}/{y}": hashlib.sha256(data).hexdigest() for z, x, y, data in tiles
+    }
+    if version_of(old_hashes) != delta["from"]:
+        raise ValueError(
+            f"{old_path} is build {version_of(old_hashes)}, delta expects {delta['from']}"
+        )
+
+    def write(tile_key, data):
+        path = os.path.join(output_dir, *tile_key.split("/")) + delta["ext"]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    os.makedirs(output_dir, exist_ok=True)
+    updated = {**delta["added"], **delta["changed"]}
+    removed = set(delta["removed"])
+    kept = 0
+    for z, x, y, data in tiles:
+        tile_key = f"{z}/{x}/{y}"
+        if tile_key not in updated and tile_key not in removed:
+            write(tile_key, data)
+            kept += 1
+
+    fetched = {}
+    for tile_key, digest in updated.items():
+        if digest not in fetched:
+            data = gzip.decompress(store.get(object_key(digest)))
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"object {digest} is corrupt")
+            fetched[digest] = data
+        write(tile_key, fetched[digest])
+
+    if delta["index"] is not None:
+        with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(delta["index"], f, indent=2)
+    return {"kept": kept, "updated": len(updated), "fetched": len(fetched)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta tile packages")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("publish", help="upload a full build")
+    p.add_argument("build")
+    p.add_argument("--store", required=True, help="local store directory")
+    p = sub.add_parser("diff", help="upload the delta between two builds")
+    p.add_argument("old", help="old build path or published version")
+    p.add_argument("new")
+    p.add_argument("--store", required=True)
+    p = sub.add_parser("apply", help="rebuild the new tiles from old + delta")
+    p.add_argument("old")
+    p.add_argument("--store", required=True)
+    p.add_argument("--delta", required=True, help="delta key in the store")
+    p.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    store = LocalStore(args.store)
+    start = time.perf_counter()
+    print("=" * 80)
+    if args.command == "publish":
+        version, stats = publish(args.build, store)
+        print(f"✅ Published build {version}: {stats['tiles']:,} tiles")
+        print(f"   New objects: {stats['uploaded']:,}")
+    elif args.command == "diff":
+        key, delta, uploaded = make_delta(args.old, args.new, store)
+        print(f"Build {delta['from']} -> {delta['to']}")
+        print(f"   Added:   {len(delta['added']):,}")
+        print(f"   Changed: {len(delta['changed']):,}")
+        print(f"   Removed: {len(delta['removed']):,}")
+        print(f"   Objects: {len(delta['objects']):,} ({uploaded:,} uploaded)")
+        print(f"   Download: {delta['download_bytes'] / 1024:.1f} KB")
+        print(f"✅ Delta saved: {key}")
+    else:
+        stats = apply_delta(args.old, store, args.delta, args.output)
+        print(f"✅ Rebuilt {args.output}")
+        print(f"   Kept {stats['kept']:,} tiles, updated {stats['updated']:,}")
+        print(f"   Fetched {stats['fetched']:,} objects")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
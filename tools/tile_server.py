@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Asyncio HTTP tile server for local development and the web target.
+
+Phục vụ tile từ thư mục {z}/{x}/{y}.json của geojson_tiler.py (hoặc thư mục
+đã đóng gói bằng pack_tile_bundles.py), file .mbtiles hoặc .pmtiles:
+  - LRU cache trong bộ nhớ (giới hạn theo byte) cho tile hay dùng; tile không
+    tồn tại cũng được cache (404) vì viewport hỏi rất nhiều ô trống
+  - ETag mạnh từ sha256 nội dung, mỗi encoding một ETag; If-None-Match -> 304
+  - bản nén gzip / brotli được tạo một lần khi nạp vào cache (hoặc lấy sẵn
+    {y}.json.gz / {y}.json.br trên đĩa) và chọn theo Accept-Encoding
+  - /metrics (định dạng Prometheus): số request, tỉ lệ cache hit, histogram
+    độ trễ tách theo hit / miss
+Chỉ dùng thư viện chuẩn; brotli là tuỳ chọn (pip install brotli).
+
+Routes:
+    /{z}/{x}/{y}[.ext]   tile
+    /index.json          index tile (thư mục) hoặc danh sách tile (mbtiles/pmtiles)
+    /metadata.json       metadata của mbtiles / pmtiles
+    /metrics             metrics
+
+Usage:
+    python tools/tile_server.py assets/maps/tiles --port 8080
+    python tools/tile_server.py build/nhs.pmtiles --port 8080 --cache-mb 128
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pack_tile_bundles import TABLE_NAME, TileBundleReader
+from pmtiles import COMPRESSION, TILE_TYPE, PMTilesReader, tileid_to_zxy
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_BYTES = 64 * 1024 * 1024
+LOAD_WORKERS = 4
+MIN_COMPRESS_BYTES = 256  # smaller bodies are served as they are
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "pbf": "application/vnd.mapbox-vector-tile",
+    "mvt": "application/vnd.mapbox-vector-tile",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+COMPRESSIBLE = {"application/json", "application/vnd.mapbox-vector-tile"}
+TILE_PATH = re.compile(r"^/(\d+)/(\d+)/(\d+)(?:\.\w+)?$")
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+# variants: {"identity" | "gzip" | "br": bytes}; a missing tile has no etag
+Tile = namedtuple("Tile", "etag variants size")
+MISSING = Tile(None, {}, 64)
+
+
+# --- Tile sources ----------------------------------------------------------
+#
+# get(z, x, y) runs on a worker thread and returns {encoding: bytes} with at
+# least one entry, or None when the tile does not exist.
+
+
+class DirectorySource:
+    def __init__(self, path):
+        self.path = path
+        self.content_type = CONTENT_TYPES["json"]
+        self.bundle = None
+        self.lock = threading.Lock()
+        if os.path.exists(os.path.join(path, TABLE_NAME)):
+            self.bundle = TileBundleReader(path)
+
+    def get(self, z, x, y):
+        if self.bundle is not None:
+            with self.lock:  # bundle files are shared handles
+                data = self.bundle.get(z, x, y)
+            return None if data is None else {"identity": data}
+        base = os.path.join(self.path, str(z), str(x), f"{y}.json")
+        variants = {}
+        for encoding, suffix in (("identity", ""), ("gzip", ".gz"), ("br", ".br")):
+            if os.path.exists(base + suffix):
+                with open(base + suffix, "rb") as f:
+                    variants[encoding] = f.read()
+        return variants or None
+
+    def index(self):
+        path = os.path.join(self.path, "index.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def metadata(self):
+        return None
+
+    def close(self):
+        if self.bundle is not None:
+            self.bundle.close()
+
+
+class MBTilesSource:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        metadata = dict(self._conn().execute("SELECT name, value FROM metadata"))
+        self._metadata = metadata
+        self.content_type = CONTENT_TYPES.get(
+            metadata.get("format"), "application/octet-stream"
+        )
+
+    def _conn(self):
+        # sqlite connections are per thread
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+            conn = self.local.conn = sqlite3.connect(uri, uri=True)
+        return conn
+
+    def get(self, z, x, y):
+        row = (
+            self._conn()
+            .execute(
+                "SELECT tile_data FROM tiles "
+                "WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (z, x, (1 << z) - 1 - y),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        data = bytes(row[0])
+        return {"gzip" if data[:2] == b"\x1f\x8b" else "identity": data}
+
+    def index(self):
+        rows = self._conn().execute(
+            "SELECT zoom_level, tile_column, tile_row, length(tile_data) FROM tiles"
+        )
+        index = {f"{z}/{x}/{(1 << z) - 1 - row}": {"size": n} for z, x, row, n in rows}
+        return json.dumps(index).encode("utf-8")
+
+    def metadata(self):
+        return json.dumps(self._metadata, ensure_ascii=False).encode("utf-8")
+
+    def close(self):
+        pass
+
+
+class PMTilesSource:
+    def __init__(self, path):
+        self.reader = PMTilesReader(path)
+        self.lock = threading.Lock()  # the reader seeks one file handle
+        tile_type = {v: k for k, v in TILE_TYPE.items()}.get(
+            self.reader.header.tile_type
+        )
+        self.content_type = CONTENT_TYPES.get(tile_type, CONTENT_TYPES["json"])
+        compression = self.reader.header.tile_compression
+        self.encoding = {COMPRESSION["gzip"]: "gzip", COMPRESSION["brotli"]: "br"}.get(
+            compression, "identity"
+        )
+
+    def get(self, z, x, y):
+        with self.lock:
+            data = self.reader.get_tile(z, x, y)
+        return None if data is None else {self.encoding: data}
+
+    def index(self):
+        with self.lock:
+            entries = list(self.reader.entries())
+        index = {}
+        for entry in entries:
+            for tile_id in range(entry.tile_id, entry.tile_id + entry.run_length):
+                z, x, y = tileid_to_zxy(tile_id)
+                index[f"{z}/{x}/{y}"] = {"size": entry.length}
+        return json.dumps(index).encode("utf-8")
+
+    def metadata(self):
+        with self.lock:
+            return json.dumps(self.reader.metadata(), ensure_ascii=False).encode(
+                "utf-8"
+            )
+
+    def close(self):
+        self.reader.close()
+
+
+def open_source(path):
+    if path.endswith(".mbtiles"):
+        return MBTilesSource(path)
+    if path.endswith(".pmtiles"):
+        return PMTilesSource(path)
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    raise ValueError(f"unsupported tile source: {path}")
+
+
+def prepare(variants, compressible):
+    """Complete the variants of a loaded tile and give it a strong ETag."""
+    if "identity" not in variants:
+        if "gzip" in variants:
+            variants["identity"] = gzip.decompress(variants["gzip"])
+        elif brotli is not None:
+            variants["identity"] = brotli.decompress(variants["br"])
+        else:
+            raise ValueError("brotli tile without the brotli module")
+    identity = variants["identity"]
+    if compressible and len(identity) >= MIN_COMPRESS_BYTES:
+        if "gzip" not in variants:
+            variants["gzip"] = gzip.compress(identity, compresslevel=6, mtime=0)
+        if "br" not in variants and brotli is not None:
+            variants["br"] = brotli.compress(identity, quality=5)
+    # Keep only the encodings that actually save bytes
+    variants = {
+        k: v for k, v in variants.items() if k == "identity" or len(v) < len(identity)
+    }
+    etag = hashlib.sha256(identity).hexdigest()[:32]
+    return Tile(etag, variants, sum(len(v) for v in variants.values()))
+
+
+def choose_encoding(accept, available):
+    """Best of br / gzip / identity allowed by an Accept-Encoding header."""
+    weights = {}
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            q = float(match.group(1))
+        if name:
+            weights[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding in available and weights.get(encoding, weights.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def variant_etag(etag, encoding):
+    suffix = {"identity": "", "gzip": "-gz", "br": "-br"}[encoding]
+    return f'"{etag}{suffix}"'
+
+
+# --- Cache and metrics -----------------------------------------------------
+
+
+class LRUCache:
+    """Least recently used entries are dropped once max_bytes is exceeded."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+        if value.size > self.max_bytes:
+            return
+        self.items[key] = value
+        self.bytes += value.size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.items.popitem(last=False)
+            self.bytes -= evicted.size
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.requests = {}  # status -> count
+        self.hits = 0
+        self.misses = 0
+        self.sent = {}  # encoding -> body bytes
+        self.latency = {
+            cache: [0] * (len(LATENCY_BUCKETS) + 1) for cache in ("hit", "miss", "none")
+        }
+        self.latency_sum = {cache: 0.0 for cache in self.latency}
+
+    def observe(self, status, cache, seconds, encoding=None, size=0):
+        self.requests[status] = self.requests.get(status, 0) + 1
+        if encoding:
+            self.sent[encoding] = self.sent.get(encoding, 0) + size
+        buckets = self.latency[cache]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        self.latency_sum[cache] += seconds
+
+    def render(self, cache):
+        lookups = self.hits + self.misses
+        lines = [
+            "# HELP tile_requests_total HTTP responses by status code.",
+            "# TYPE tile_requests_total counter",
+        ]
+        for status, count in sorted(self.requests.items()):
+            lines.append(f'tile_requests_total{{status="{status}"}} {count}')
+        lines += [
+            "# TYPE tile_cache_hits_total counter",
+            f"tile_cache_hits_total {self.hits}",
+            "# TYPE tile_cache_misses_total counter",
+            f"tile_cache_misses_total {self.misses}",
+            "# TYPE tile_cache_hit_ratio gauge",
+            f"tile_cache_hit_ratio {self.hits / lookups if lookups else 0:.4f}",
+            "# TYPE tile_cache_entries gauge",
+            f"tile_cache_entries {len(cache)}",
+            "# TYPE tile_cache_bytes gauge",
+            f"tile_cache_bytes {cache.bytes}",
+            "# TYPE tile_response_bytes_total counter",
+        ]
+        for encoding, size in sorted(self.sent.items()):
+            lines.append(f'tile_response_bytes_total{{encoding="{encoding}"}} {size}')
+        lines += [
+            "# HELP tile_request_duration_seconds Request latency by cache result.",
+            "# TYPE tile_request_duration_seconds histogram",
+        ]
+        for cache_result, buckets in self.latency.items():
+            total = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                total += count
+                lines.append(
+                    f'tile_request_duration_seconds_bucket{{cache="{cache_result}",'
+                    f'le="{bound}"}} {total}'
+                )
+            label = f'{{cache="{cache_result}"}}'
+            lines.append(
+                f"tile_request_duration_seconds_sum{label} "
+                f"{self.latency_sum[cache_result]:.6f}"
+            )
+            lines.append(f"tile_request_duration_seconds_count{label} {total}")
+        lines.append(f"tile_uptime_seconds {time.time() - self.started:.0f}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# --- Server ----------------------------------------------------------------
+
+
+class TileServer:
+    def __init__(self, source, cache_bytes=CACHE_BYTES, workers=LOAD_WORKERS):
+        self.source = source
+        self.cache = LRUCache(cache_bytes)
+        self.metrics = Metrics()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.compressible = source.content_type in COMPRESSIBLE
+        self._pending = {}  # concurrent misses of one tile share one load
+        self._index = None
+
+    def _load(self, z, x, y):
+        variants = self.source.get(z, x, y)
+        return MISSING if variants is None else prepare(variants, self.compressible)
+
+    async def tile(self, z, x, y):
+        """(Tile, "hit" | "miss")."""
+        key = (z, x, y)
+        tile = self.cache.get(key)
+        if tile is not None:
+            self.metrics.hits += 1
+            return tile, "hit"
+        self.metrics.misses += 1
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await pending, "miss"
+        loop = asyncio.get_running_loop()
+        pending = self._pending[key] = loop.run_in_executor(
+            self.executor, self._load, z, x, y
+        )
+        try:
+            tile = await pending
+        finally:
+            del self._pending[key]
+        self.cache.put(key, tile)
+        return tile, "miss"
+
+    async def respond(self, method, path, headers):
+        """(status, headers, body, cache result, encoding)."""
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b"", "none", None
+        path = path.split("?", 1)[0]
+        match = TILE_PATH.match(path)
+        if match:
+            z, x, y = (int(v) for v in match.groups())
+            tile, cache = await self.tile(z, x, y)
+            if tile.etag is None:
+                return 404, {}, b"", cache, None
+            encoding = choose_encoding(
+                headers.get("accept-encoding", ""), tile.variants
+            )
+            etag = variant_etag(tile.etag, encoding)
+            extra = {
+                "ETag": etag,
+                "Vary": "Accept-Encoding",
+                "Cache-Control": "no-cache",  # always revalidate with the ETag
+                "Content-Type": self.source.content_type,
+            }
+            if encoding != "identity":
+                extra["Content-Encoding"] = encoding
+            if (
+                etag in headers.get("if-none-match", "")
+                or headers.get("if-none-match") == "*"
+            ):
+                return 304, extra, b"", cache, None
+            return 200, extra, tile.variants[encoding], cache, encoding
+
+        loop = asyncio.get_running_loop()
+        if path == "/metrics":
+            body = self.metrics.render(self.cache)
+            return (
+                200,
+                {"Content-Type": "text/plain; version=0.0.4"},
+                body,
+                "none",
+                None,
+            )
+        if path == "/index.json":
+            if self._index is None:
+                self._index = await loop.run_in_executor(
+                    self.executor, self.source.index
+                )
+            if self._index is not None:
+                return (
+                    200,
+                    {"Content-Type": "application/json"},
+                    self._index,
+                    "none",
+                    None,
+                )
+        if path == "/metadata.json":
+            body = await loop.run_in_executor(self.executor, self.source.metadata)
+            if body is not None:
+                return 200, {"Content-Type": "application/json"}, body, "none", None
+        return 404, {}, b"", "none", None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                start = time.perf_counter()
+
+                if len(parts) != 3:
+                    status, extra, body, cache, encoding = 400, {}, b"", "none", None
+                    keep_alive = False
+                else:
+                    method, path, version = parts
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = (version == "HTTP/1.1" and connection != "close") or (
+                        connection == "keep-alive"
+                    )
+                    try:
+                        status, extra, body, cache, encoding = await self.respond(
+                            method, path, headers
+                        )
+                    except Exception as e:
+                        print(f"❌ {line.decode('latin-1').strip()}: {e}")
+                        status, extra, body, cache, encoding = (
+                            500,
+                            {},
+                            b"",
+                            "none",
+                            None,
+                        )
+
+                head = [f"HTTP/1.1 {status} {REASONS[status]}"]
+                extra.setdefault("Content-Type", "text/plain")
+                extra["Content-Length"] = str(len(body))
+                extra["Access-Control-Allow-Origin"] = "*"
+                extra["Connection"] = "keep-alive" if keep_alive else "close"
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if len(parts) != 3 or parts[0] != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                self.metrics.observe(
+                    status, cache, time.perf_counter() - start, encoding, len(body)
+                )
+                if not keep_alive:
+                    break
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown()
+        self.source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio tile server")
+    parser.add_argument("source", help="tile directory, .mbtiles or .pmtiles")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--cache-mb", type=float, default=CACHE_BYTES / 1024 / 1024, help="LRU size"
+    )
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS)
+    args = parser.parse_args()
+
+    source = open_source(args.source)
+    server = TileServer(source, int(args.cache_mb * 1024 * 1024), args.workers)
+    print("=" * 80)
+    print(f"Serving {args.source} ({source.content_type})")
+    print(f"   http://{args.host}:{args.port}/{{z}}/{{x}}/{{y}}")
+    print(f"   http://{args.host}:{args.port}/metrics")
+    print(f"   Cache: {args.cache_mb:.0f} MB")
+    if brotli is None:
+        print(
+            "⚠️  brotli not found, serving gzip only. Install with: pip install brotli"
+        )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
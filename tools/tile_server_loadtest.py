@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Load test for tile_server.py.
+
+Mô phỏng nhiều client xem bản đồ cùng lúc: mỗi client giữ một kết nối
+keep-alive và xin tile lấy từ /index.json của server theo phân bố Zipf (vài
+tile "nóng" được xin rất nhiều, phần lớn tile hiếm khi). Một phần request gửi
+If-None-Match với ETag đã nhận như trình duyệt có cache.
+
+Kết quả: request/s, phân bố status, byte nhận được, độ trễ p50/p90/p99 phía
+client, rồi đọc /metrics để in tỉ lệ cache hit và độ trễ hit / miss phía server.
+
+Usage:
+    python tools/tile_server.py assets/maps/tiles --port 8080 &
+    python tools/tile_server_loadtest.py http://127.0.0.1:8080 --requests 20000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client over asyncio streams."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, headers=None):
+        """(status, headers, body); reconnects when the server closed."""
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(
+                    self.host, self.port
+                )
+            lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+            lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+            self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            try:
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+                if not status_line:
+                    raise ConnectionError("connection closed")
+                response_headers = {}
+                while True:
+                    line = await self.reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    response_headers[name.strip().lower()] = value.strip()
+                length = int(response_headers.get("content-length", 0))
+                body = await self.reader.readexactly(length) if length else b""
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if attempt:
+                    raise
+                continue
+            if response_headers.get("connection") == "close":
+                self.close()
+            return int(status_line.split()[1]), response_headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def zipf_weights(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def parse_metrics(text):
+    """{(name, labels): value} of a Prometheus text exposition."""
+    values = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, _, value = line.rpartition(" ")
+        labels = ""
+        if "{" in name:
+            name, labels = name[:-1].split("{", 1)
+        values[(name, labels)] = float(value)
+    return values
+
+
+def histogram_quantile(values, cache, q):
+    """Approximate quantile (upper bucket bound) of one histogram series."""
+    buckets = sorted(
+        (float(labels.split('le="')[1].rstrip('"')), count)
+        for (name, labels), count in values.items()
+        if name == "tile_request_duration_seconds_bucket"
+        and f'cache="{cache}"' in labels
+    )
+    total = buckets[-1][1] if buckets else 0
+    for bound, count in buckets:
+        if total and count >= q * total:
+            return bound
+    return None
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    prefix = url.path.rstrip("/")
+
+    probe = Connection(host, port)
+    status, _, body = await probe.request(f"{prefix}/index.json")
+    if status != 200:
+        raise SystemExit(f"❌ {args.url}/index.json returned {status}")
+    keys = sorted(json.loads(body))
+    if args.zoom is not None:
+        keys = [k for k in keys if k.split("/")[0] == str(args.zoom)]
+    rng = random.Random(args.seed)
+    rng.shuffle(keys)  # hot tiles spread over the map, not one corner
+    plan = np.random.default_rng(args.seed).choice(
+        len(keys), size=args.requests, p=zipf_weights(len(keys), args.zipf)
+    )
+
+    latencies = np.zeros(args.requests)
+    statuses = {}
+    received = 0
+    etags = {}
+    next_request = 0
+
+    async def worker():
+        nonlocal next_request, received
+        connection = Connection(host, port)
+        while next_request < args.requests:
+            i = next_request
+            next_request += 1
+            key = keys[plan[i]]
+            headers = {"Accept-Encoding": args.accept_encoding}
+            if key in etags and rng.random() < args.revalidate:
+                headers["If-None-Match"] = etags[key]
+            start = time.perf_counter()
+            status, response_headers, body = await connection.request(
+                f"{prefix}/{key}.json", headers
+            )
+            latencies[i] = time.perf_counter() - start
+            statuses[status] = statuses.get(status, 0) + 1
+            received += len(body)
+            if "etag" in response_headers:
+                etags[key] = response_headers["etag"]
+        connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    _, _, body = await probe.request(f"{prefix}/metrics")
+    probe.close()
+    metrics = parse_metrics(body.decode("utf-8"))
+
+    print("=" * 80)
+    print(
+        f"{args.requests:,} requests over {len(keys):,} tiles, "
+        f"{args.concurrency} connections"
+    )
+    print(f"   Throughput: {args.requests / elapsed:,.0f} req/s ({elapsed:.2f}s)")
+    print(
+        "   Status:     "
+        + ", ".join(f"{s}: {n:,}" for s, n in sorted(statuses.items()))
+    )
+    print(f"   Received:   {received / 1024 / 1024:.2f} MB")
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    print(f"   Latency:    p50 {p50:.2f} ms, p90 {p90:.2f} ms, p99 {p99:.2f} ms")
+    print("Server /metrics:")
+    print(f"   Cache hit ratio: {metrics.get(('tile_cache_hit_ratio', ''), 0):.1%}")
+    print(f"   Cache entries:   {metrics.get(('tile_cache_entries', ''), 0):,.0f}")
+    for cache in ("hit", "miss"):
+        count = metrics.get(
+            ("tile_request_duration_seconds_count", f'cache="{cache}"'), 0
+        )
+        p99 = histogram_quantile(metrics, cache, 0.99)
+        if count:
+            print(f"   {cache:>4}: {count:,.0f} requests, p99 <= {p99 * 1000:g} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for tile_server.py")
+    parser.add_argument("url", nargs="?", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew")
+    parser.add_argument("--zoom", type=int, help="only tiles of this zoom")
+    parser.add_argument(
+        "--revalidate",
+        type=float,
+        default=0.2,
+        help="share of repeat requests sent with If-None-Match",
+    )
+    parser.add_argument("--accept-encoding", default="br, gzip")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
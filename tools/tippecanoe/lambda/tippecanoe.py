@@ -1,24 +1,62 @@
 import os
+import gzip
 import json
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore import UNSIGNED
 from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
 # if the input bucket is publicly readable
 #s3 = boto3.client('s3',config=Config(signature_version=UNSIGNED))
 
+# at most one progress PUT per interval (seconds)
+PROGRESS_INTERVAL = 1.0
+
+# .mbtiles above the threshold go up as parallel multipart uploads
+MULTIPART_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+EXECUTABLE = 'tippecanoe'
+TMPDIR = '/tmp'
+
+# inputs tippecanoe can read from stdin; fgb and geobuf need a seekable file
+STREAM_FORMATS = {'.geojson': None, '.json': None, '.geojsonseq': None, '.csv': 'csv'}
+
 def lambda_handler(event, context):
-    bucket_name = event['Records'][0]['s3']['bucket']['name']
-    input_key = event['Records'][0]['s3']['object']['key']
-    tmpdir = '/tmp'
-    run_tippecanoe('tippecanoe',tmpdir,bucket_name, input_key)
+    s3 = boto3.client('s3')
+    records = [(r['s3']['bucket']['name'], unquote_plus(r['s3']['object']['key'])) for r in event.get('Records', [])]
+    workers = max(1, min(len(records), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda r: process_record(EXECUTABLE, TMPDIR, r[0], r[1], s3), records))
+    failed = [r for r in results if r['error']]
     return {
-        'statusCode': 200,
-        'body': json.dumps('Done!')
+        'statusCode': 500 if failed else 200,
+        'body': json.dumps(results if failed else 'Done!')
     }
 
+def process_record(executable, tmpdir, bucket_name, input_key, s3=None):
+    # one temp dir per job; a failing record does not affect the others
+    try:
+        with tempfile.TemporaryDirectory(dir=tmpdir) as jobdir:
+            run_tippecanoe(executable, jobdir, bucket_name, input_key, s3)
+        return {'key': input_key, 'error': None}
+    except Exception as e:
+        traceback.print_exc()
+        return {'key': input_key, 'error': '%s: %s' % (type(e).__name__, e)}
+
 # input formats: "geojsonseq", "fgb", "geobuf", "geojson", "csv"
 def split_key(key):
     if key.endswith(".gz"):
@@ -27,20 +65,120 @@ def split_key(key):
     else:
         return os.path.splitext(key)
 
-def run_tippecanoe(executable, tmpdir, bucket_name, input_key):
-    s3 = boto3.client('s3')
-    root, ext = split_key(input_key)
-    input_path = os.path.join(tmpdir,'input' + ext)
-    output_path = os.path.join(tmpdir,'output.mbtiles')
-    s3.download_file(bucket_name,input_key,input_path)
-    p = subprocess.Popen([executable,'-o',output_path,input_path,'--force','-u','-U','5'],stderr=subprocess.PIPE)
-    for line in p.stderr:
+def stream_format(ext):
+    """(streamable, format) of an input extension as returned by split_key."""
+    base = ext[0:-3] if ext.endswith('.gz') else ext
+    return base in STREAM_FORMATS, STREAM_FORMATS.get(base)
+
+def feed_stdin(body, ext, stdin, errors):
+    # S3 body -> (gunzip) -> tippecanoe stdin, on its own thread so stderr keeps draining
+    try:
+        source = gzip.GzipFile(fileobj=body) if ext.endswith('.gz') else body
+        shutil.copyfileobj(source, stdin, 1024 * 1024)
+    except BrokenPipeError:
+        pass  # tippecanoe exited early; its return code tells why
+    except Exception as e:
+        errors.append(e)
+    finally:
         try:
-            j = json.loads(line)
-            s3.put_object(Body=json.dumps(j),Bucket=os.environ['OUTPUT_BUCKET'],Key=root + ".progress",ACL="public-read",ContentType="application/json",ContentDisposition="inline")
-        except json.decoder.JSONDecodeError:
+            stdin.close()
+        except BrokenPipeError:
             pass
-    s3.upload_file(output_path,os.environ['OUTPUT_BUCKET'],root + ".mbtiles")
+
+class ProgressPublisher:
+    """
+    Publishes tippecanoe progress to S3 from a background thread.
+
+    update() only records the latest state, so the stderr reader never waits
+    on S3; the thread writes at most one object per interval and close()
+    always writes the final state.
+    """
+
+    def __init__(self, s3, bucket, key, interval=PROGRESS_INTERVAL):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.interval = interval
+        self.puts = 0
+        self._latest = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def update(self, progress):
+        with self._lock:
+            self._latest = progress
+        self._wake.set()
+
+    def close(self):
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self._flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            self._flush()
+            # coalesce everything that arrives during the interval
+            self._closed.wait(self.interval)
+
+    def _flush(self):
+        with self._lock:
+            progress, self._latest = self._latest, None
+        if progress is None:
+            return
+        try:
+            self.s3.put_object(Body=json.dumps(progress),Bucket=self.bucket,Key=self.key,ACL="public-read",ContentType="application/json",ContentDisposition="inline")
+            self.puts += 1
+        except (BotoCoreError, ClientError) as e:
+            print('progress upload failed: %s' % e, file=sys.stderr)
+
+def run_tippecanoe(executable, tmpdir, bucket_name, input_key, s3=None, progress_interval=PROGRESS_INTERVAL):
+    s3 = s3 or boto3.client('s3')
+    output_bucket = os.environ['OUTPUT_BUCKET']
+    root, ext = split_key(input_key)
+    output_path = os.path.join(tmpdir,'output.mbtiles')
+    streamable, fmt = stream_format(ext)
+    feeder = None
+    errors = []
+    if streamable:
+        # same layer name as the downloaded 'input' + ext file would get
+        layer = {'file': '', 'layer': 'input'}
+        if fmt:
+            layer['format'] = fmt
+        body = s3.get_object(Bucket=bucket_name,Key=input_key)['Body']
+        p = subprocess.Popen([executable,'-o',output_path,'-L' + json.dumps(layer),'--force','-u','-U','5'],stdin=subprocess.PIPE,stderr=subprocess.PIPE)
+        feeder = threading.Thread(target=feed_stdin, args=(body, ext, p.stdin, errors), daemon=True)
+        feeder.start()
+    else:
+        input_path = os.path.join(tmpdir,'input' + ext)
+        s3.download_file(bucket_name,input_key,input_path)
+        p = subprocess.Popen([executable,'-o',output_path,input_path,'--force','-u','-U','5'],stderr=subprocess.PIPE)
+    with ProgressPublisher(s3, output_bucket, root + ".progress", progress_interval) as progress:
+        for line in p.stderr:
+            try:
+                progress.update(json.loads(line))
+            except json.decoder.JSONDecodeError:
+                pass
+        p.wait()
+        p.stderr.close()
+    if feeder:
+        feeder.join()
+    if errors:
+        raise errors[0]
+    if p.returncode != 0:
+        raise RuntimeError('tippecanoe exited with status %d for %s' % (p.returncode, input_key))
+    s3.upload_file(output_path,output_bucket,root + ".mbtiles",Config=MULTIPART_CONFIG)
 
 if __name__ == "__main__":
     tmpdir = 'tmp'
@@ -1,5 +1,17 @@
-from tippecanoe import split_key
+from tippecanoe import split_key, stream_format, run_tippecanoe, lambda_handler, ProgressPublisher, MULTIPART_CONFIG
+import tippecanoe
+import gzip
+import json
+import os
+import tempfile
 import unittest
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
 
 class TestTippecanoe(unittest.TestCase):
     def test_basic(self):
@@ -22,5 +34,135 @@ class TestTippecanoe(unittest.TestCase):
         self.assertEqual(root,"dir/file")
         self.assertEqual(ext,".geojsonseq.gz")
 
+    def test_dotted_key_gz(self):
+        root, ext = split_key("dir/file.v2.geojsonseq.gz")
+        self.assertEqual(root,"dir/file.v2")
+        self.assertEqual(ext,".geojsonseq.gz")
+
+    def test_streamed_formats(self):
+        self.assertEqual(stream_format(split_key("dir/file.geojsonseq.gz")[1]),(True,None))
+        self.assertEqual(stream_format(split_key("dir/file.geojson")[1]),(True,None))
+        self.assertEqual(stream_format(split_key("file.csv.gz")[1]),(True,"csv"))
+
+    def test_downloaded_formats(self):
+        self.assertEqual(stream_format(split_key("dir/file.fgb")[1]),(False,None))
+        self.assertEqual(stream_format(split_key("file.geobuf")[1]),(False,None))
+        self.assertEqual(stream_format(split_key("file.fgb.gz")[1]),(False,None))
+
+@unittest.skipIf(mock_aws is None, "moto is not installed")
+class TestS3(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault('AWS_DEFAULT_REGION','us-east-1')
+        self.mock = mock_aws()
+        self.mock.start()
+        self.s3 = boto3.client('s3')
+        self.s3.create_bucket(Bucket='output')
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def get_json(self, key):
+        return json.loads(self.s3.get_object(Bucket='output',Key=key)['Body'].read())
+
+    def test_progress_coalesced(self):
+        with ProgressPublisher(self.s3,'output','file.progress',interval=60) as progress:
+            for i in range(1000):
+                progress.update({"progress": i / 10})
+        self.assertLessEqual(progress.puts,2)
+        self.assertEqual(self.get_json('file.progress'),{"progress": 99.9})
+
+    def test_progress_final_state(self):
+        progress = ProgressPublisher(self.s3,'output','file.progress',interval=0.01)
+        progress.update({"progress": 50.0})
+        progress.update({"progress": 100.0})
+        progress.close()
+        self.assertGreaterEqual(progress.puts,1)
+        self.assertEqual(self.get_json('file.progress'),{"progress": 100.0})
+
+    def test_progress_nothing_to_publish(self):
+        progress = ProgressPublisher(self.s3,'output','file.progress')
+        progress.close()
+        self.assertEqual(progress.puts,0)
+        self.assertEqual(self.s3.list_objects_v2(Bucket='output')['KeyCount'],0)
+
+    def test_multipart_upload(self):
+        config = TransferConfig(multipart_threshold=5 * 1024 * 1024,multipart_chunksize=5 * 1024 * 1024,max_concurrency=MULTIPART_CONFIG.max_concurrency)
+        data = os.urandom(12 * 1024 * 1024)
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            self.s3.upload_file(f.name,'output','file.mbtiles',Config=config)
+        obj = self.s3.get_object(Bucket='output',Key='file.mbtiles')
+        self.assertIn('-3',obj['ETag'])  # three parts
+        self.assertEqual(obj['Body'].read(),data)
+
+    def stand_in(self, tmpdir, status=0):
+        # fake tippecanoe: progress on stderr, then copies stdin (-L) or the input file to the output
+        executable = os.path.join(tmpdir,'tippecanoe')
+        with open(executable,'w') as f:
+            f.write('#!/bin/sh\n')
+            f.write('for i in $(seq 1 500); do echo "{\\"progress\\": $i}" >&2; done\n')
+            f.write('echo "not json" >&2\n')
+            f.write('case "$3" in -L*) cat > "$2";; *) cp "$3" "$2";; esac\n')
+            f.write('exit %d\n' % status)
+        os.chmod(executable,0o755)
+        return executable
+
+    def run_key(self, key, body):
+        self.s3.create_bucket(Bucket='input')
+        self.s3.put_object(Bucket='input',Key=key,Body=body)
+        os.environ['OUTPUT_BUCKET'] = 'output'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_tippecanoe(self.stand_in(tmpdir),tmpdir,'input',key,s3=self.s3,progress_interval=60)
+
+    def test_run_tippecanoe_streamed(self):
+        self.run_key('dir/file.geojsonseq','{"type":"Feature"}\n')
+        self.assertEqual(self.get_json('dir/file.progress'),{"progress": 500})
+        body = self.s3.get_object(Bucket='output',Key='dir/file.mbtiles')['Body'].read()
+        self.assertEqual(body,b'{"type":"Feature"}\n')
+
+    def test_run_tippecanoe_streamed_gz(self):
+        self.run_key('dir/file.geojsonseq.gz',gzip.compress(b'{"type":"Feature"}\n'))
+        body = self.s3.get_object(Bucket='output',Key='dir/file.mbtiles')['Body'].read()
+        self.assertEqual(body,b'{"type":"Feature"}\n')
+
+    def test_run_tippecanoe_downloaded(self):
+        self.run_key('dir/file.fgb',b'fgb')
+        body = self.s3.get_object(Bucket='output',Key='dir/file.mbtiles')['Body'].read()
+        self.assertEqual(body,b'fgb')
+
+    def test_handler_all_records(self):
+        self.s3.create_bucket(Bucket='input')
+        keys = ['a.geojson','dir/b.geojsonseq.gz','c+d.fgb']
+        for key in keys:
+            self.s3.put_object(Bucket='input',Key=key,Body=b'data' if not key.endswith('.gz') else gzip.compress(b'data'))
+        os.environ['OUTPUT_BUCKET'] = 'output'
+        # S3 notifications URL-encode keys; 'missing.geojson' fails on its own
+        event = {'Records': [{'s3': {'bucket': {'name': 'input'}, 'object': {'key': k.replace('+','%2B')}}} for k in keys + ['missing.geojson']]}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tippecanoe.EXECUTABLE, tippecanoe.TMPDIR = self.stand_in(tmpdir), tmpdir
+            try:
+                result = lambda_handler(event,None)
+            finally:
+                tippecanoe.EXECUTABLE, tippecanoe.TMPDIR = 'tippecanoe', '/tmp'
+            self.assertEqual(os.listdir(tmpdir),['tippecanoe'])  # job dirs removed
+        self.assertEqual(result['statusCode'],500)
+        errors = {r['key']: r['error'] for r in json.loads(result['body'])}
+        self.assertIsNone(errors['c+d.fgb'])
+        self.assertIn('NoSuchKey',errors['missing.geojson'])
+        for key in keys:
+            body = self.s3.get_object(Bucket='output',Key=split_key(key)[0] + '.mbtiles')['Body'].read()
+            self.assertEqual(body,b'data')
+
+    def test_failed_run_not_uploaded(self):
+        self.s3.create_bucket(Bucket='input')
+        self.s3.put_object(Bucket='input',Key='a.geojson',Body=b'data')
+        os.environ['OUTPUT_BUCKET'] = 'output'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(RuntimeError):
+                run_tippecanoe(self.stand_in(tmpdir,status=1),tmpdir,'input','a.geojson',s3=self.s3)
+        keys = [o['Key'] for o in self.s3.list_objects_v2(Bucket='output').get('Contents',[])]
+        self.assertEqual(keys,['a.progress'])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+TopoJSON-style topology: mỗi đoạn biên chung giữa hai tổ / phường chỉ lưu một lần.
+
+Các bước (theo cách của topojson):
+  1. lượng tử hoá toạ độ lên lưới số nguyên (--quantization, mặc định 1e6)
+  2. tìm điểm nối (junction): điểm có nhiều cặp láng giềng khác nhau, hoặc là
+     đầu mút của line
+  3. cắt vòng / line tại junction thành các arc, gộp arc trùng nhau (kể cả đảo
+     chiều, tham chiếu ~i như TopoJSON)
+  4. arc lưu dạng delta so với đỉnh trước
+  5. polygon = danh sách vòng, mỗi vòng = danh sách chỉ số arc
+Tuỳ chọn --simplify chạy Douglas-Peucker trên từng arc: hai đầu arc giữ nguyên
+nên các polygon kề nhau vẫn khít, không sinh khe hở.
+
+decode_topology() dựng lại FeatureCollection GeoJSON từ topology.
+
+Usage:
+    python tools/topology.py assets/maps/260to.geojson --output assets/maps/260to.topojson
+    python tools/topology.py assets/maps/260to.topojson --decode --output 260to.geojson
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from polygon_index import is_closed_line
+
+QUANTIZATION = 1_000_000
+
+
+def _geometry_rings(geom):
+    """(type, parts) with parts = [[ring, ...], ...]; closed lines -> Polygon."""
+    geom_type = geom.get("type") if geom else None
+    coords = geom.get("coordinates") if geom else None
+    if not coords:
+        return None, []
+    if geom_type == "Polygon":
+        return "Polygon", [coords]
+    if geom_type == "MultiPolygon":
+        return "MultiPolygon", coords
+    if geom_type == "LineString":
+        if is_closed_line(coords):
+            return "Polygon", [[coords]]
+        return "LineString", [[coords]]
+    if geom_type == "MultiLineString":
+        return "MultiLineString", [[line] for line in coords]
+    return geom_type, []
+
+
+class _Builder:
+    """Collects rings/lines as point-id sequences and cuts them into arcs."""
+
+    def __init__(self, features, quantization):
+        self.entries = []  # (feature, part, ring, is_polygon, start, end)
+        self.geom_types = []
+        coords = []
+        for f, feature in enumerate(features):
+            geom_type, parts = _geometry_rings(feature.get("geometry"))
+            self.geom_types.append(geom_type)
+            for p, rings in enumerate(parts):
+                for r, ring in enumerate(rings):
+                    points = [c[:2] for c in ring]
+                    closed = geom_type in ("Polygon", "MultiPolygon")
+                    if closed and len(points) > 1 and points[0] == points[-1]:
+                        points = points[:-1]  # stored open, closed implicitly
+                    start = len(coords)
+                    coords.extend(points)
+                    self.entries.append((f, p, r, closed, start, len(coords)))
+
+        xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if len(xy):
+            self.bbox = [*xy.min(axis=0).tolist(), *xy.max(axis=0).tolist()]
+        else:
+            self.bbox = [0.0, 0.0, 0.0, 0.0]
+        x0, y0, x1, y1 = self.bbox
+        self.scale = [
+            (x1 - x0) / (quantization - 1) or 1.0,
+            (y1 - y0) / (quantization - 1) or 1.0,
+        ]
+        self.translate = [x0, y0]
+        q = np.round((xy - self.translate) / self.scale).astype(np.int64)
+
+        # One id per distinct quantized point
+        self.points, self.ids = np.unique(q, axis=0, return_inverse=True)
+        self.ids = self.ids.reshape(-1)
+        self.junction = self._junctions()
+
+    def _junctions(self):
+        """Points whose (unordered) neighbour pair differs between occurrences."""
+        n = len(self.ids)
+        prev = np.empty(n, dtype=np.int64)
+        nxt = np.empty(n, dtype=np.int64)
+        junction = np.zeros(len(self.points), dtype=bool)
+        for _, _, _, closed, start, end in self.entries:
+            if end - start == 0:
+                continue
+            ring = self.ids[start:end]
+            if closed:
+                prev[start:end] = np.roll(ring, 1)
+                nxt[start:end] = np.roll(ring, -1)
+            else:
+                prev[start:end] = np.concatenate([[-1], ring[:-1]])
+                nxt[start:end] = np.concatenate([ring[1:], [-1]])
+                junction[ring[0]] = junction[ring[-1]] = True
+
+        pairs = np.column_stack(
+            [self.ids, np.minimum(prev, nxt), np.maximum(prev, nxt)]
+        )
+        distinct = np.unique(pairs, axis=0)
+        junction |= np.bincount(distinct[:, 0], minlength=len(self.points)) > 1
+        return junction
+
+    def build(self):
+        arcs = []
+        index = {}
+        refs = []  # per entry: list of arc refs
+
+        def add_arc(ids):
+            key = ids.tobytes()
+            ref = index.get(key)
+            if ref is None:
+                rkey = ids[::-1].tobytes()
+                ref = index.get(rkey)
+                if ref is not None:
+                    return ~ref
+                ref = index[key] = len(arcs)
+                arcs.append(ids)
+            return ref
+
+        for _, _, _, closed, start, end in self.entries:
+            ring = self.ids[start:end]
+            if len(ring) == 0:
+                refs.append([])
+                continue
+            cuts = np.flatnonzero(self.junction[ring])
+            if closed:
+                if cuts.size == 0:
+                    # Isolated ring: canonical rotation so duplicates match
+                    k = int(np.argmin(ring))
+                    ring = np.roll(ring, -k)
+                    refs.append([add_arc(np.append(ring, ring[0]))])
+                    continue
+                ring = np.roll(ring, -int(cuts[0]))
+                ring = np.append(ring, ring[0])
+                cuts = np.append(cuts - cuts[0], len(ring) - 1)
+            else:
+                cuts = np.union1d(cuts, [0, len(ring) - 1])
+            refs.append([add_arc(ring[a : b + 1]) for a, b in zip(cuts[:-1], cuts[1:])])
+        return arcs, refs
+
+
+def _douglas_peucker(points, tolerance):
+    """Keep-mask of a Douglas-Peucker simplification; endpoints always kept."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = points[b] - points[a]
+        rel = points[a + 1 : b] - points[a]
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            m = a + 1 + i
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return keep
+
+
+def simplify_arcs(arcs, tolerance):
+    """Simplify each arc (absolute integer points) independently."""
+    result = []
+    for arc in arcs:
+        keep = _douglas_peucker(arc.astype(np.float64), tolerance)
+        if len(arc) > 3 and arc[0].tolist() == arc[-1].tolist() and keep.sum() < 4:
+            # Isolated closed ring: keep enough vertices to stay a polygon
+            keep[[0, len(arc) // 3, 2 * len(arc) // 3, len(arc) - 1]] = True
+        result.append(arc[keep])
+    return result
+
+
+def build_topology(
+    features, name="collection", quantization=QUANTIZATION, simplify=None
+):
+    """GeoJSON features -> TopoJSON topology dict."""
+    builder = _Builder(features, quantization)
+    arc_ids, refs = builder.build()
+    arcs = [builder.points[ids] for ids in arc_ids]
+    if simplify:
+        # Tolerance given in source units, arcs are in quantized units
+        arcs = simplify_arcs(arcs, simplify / min(builder.scale))
+
+    # Group entry refs back into features -> parts -> rings
+    shape = {}
+    for (f, p, r, _, _, _), ring_refs in zip(builder.entries, refs):
+        shape.setdefault(f, {}).setdefault(p, []).append(ring_refs)
+
+    geometries = []
+    for f, feature in enumerate(features):
+        geom_type = builder.geom_types[f]
+        parts = [rings for _, rings in sorted(shape.get(f, {}).items())]
+        geometry = {"type": geom_type, "properties": feature.get("properties")}
+        if geom_type == "Polygon":
+            geometry["arcs"] = parts[0]
+        elif geom_type == "MultiPolygon":
+            geometry["arcs"] = parts
+        elif geom_type == "LineString":
+            geometry["arcs"] = parts[0][0]
+        elif geom_type == "MultiLineString":
+            geometry["arcs"] = [rings[0] for rings in parts]
+        else:
+            geometry = {
+                "type": geom_type,
+                "properties": feature.get("properties"),
+                "coordinates": (feature.get("geometry") or {}).get("coordinates"),
+            }
+        geometries.append(geometry)
+
+    return {
+        "type": "Topology",
+        "bbox": builder.bbox,
+        "transform": {"scale": builder.scale, "translate": builder.translate},
+        "objects": {name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": [delta_encode(arc) for arc in arcs],
+    }
+
+
+def delta_encode(arc):
+    deltas = np.diff(arc, axis=0, prepend=np.zeros((1, 2), dtype=arc.dtype))
+    return deltas.tolist()
+
+
+def _decode_arcs(topology):
+    scale = np.asarray(topology["transform"]["scale"], dtype=np.float64)
+    translate = np.asarray(topology["transform"]["translate"], dtype=np.float64)
+    return [
+        np.cumsum(np.asarray(arc, dtype=np.int64).reshape(-1, 2), axis=0) * scale
+        + translate
+        for arc in topology["arcs"]
+    ]
+
+
+def _stitch(refs, arcs):
+    """Concatenate arcs of a ring/line, dropping the repeated joint vertex."""
+    points = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        points.append(arc if not points else arc[1:])
+    return np.concatenate(points).tolist() if points else []
+
+
+def decode_topology(topology, name=None):
+    """TopoJSON topology -> GeoJSON FeatureCollection (one object)."""
+    arcs = _decode_arcs(topology)
+    name = name or next(iter(topology["objects"]))
+    features = []
+    for geometry in topology["objects"][name]["geometries"]:
+        geom_type = geometry.get("type")
+        refs = geometry.get("arcs")
+        if geom_type == "Polygon":
+            coords = [_stitch(ring, arcs) for ring in refs]
+        elif geom_type == "MultiPolygon":
+            coords = [[_stitch(ring, arcs) for ring in poly] for poly in refs]
+        elif geom_type == "LineString":
+            coords = _stitch(refs, arcs)
+        elif geom_type == "MultiLineString":
+            coords = [_stitch(line, arcs) for line in refs]
+        else:
+            coords = geometry.get("coordinates")
+        features.append(
+            {
+                "type": "Feature",
+                "properties": geometry.get("properties"),
+                "geometry": (
+                    {"type": geom_type, "coordinates": coords} if geom_type else None
+                ),
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def arc_stats(topology):
+    arcs = topology["arcs"]
+    uses = np.zeros(len(arcs), dtype=np.int64)
+    for objects in topology["objects"].values():
+        for geometry in objects["geometries"]:
+            stack = [geometry.get("arcs") or []]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, list):
+                    stack.extend(item)
+                else:
+                    uses[item if item >= 0 else ~item] += 1
+    return {
+        "arcs": len(arcs),
+        "shared_arcs": int((uses > 1).sum()),
+        "arc_vertices": sum(len(arc) for arc in arcs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / decode TopoJSON topology")
+    parser.add_argument("input_file")
+    parser.add_argument("--output")
+    parser.add_argument("--decode", action="store_true")
+    parser.add_argument("--quantization", type=float, default=QUANTIZATION)
+    parser.add_argument(
+        "--simplify", type=float, help="per-arc Douglas-Peucker tolerance"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    stem = os.path.splitext(args.input_file)[0]
+
+    if args.decode:
+        result = decode_topology(data)
+        output = args.output or stem + ".geojson"
+    else:
+        name = data.get("name") or os.path.basename(stem)
+        result = build_topology(
+            data.get("features", []), name, args.quantization, args.simplify
+        )
+        output = args.output or stem + ".topojson"
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, separators=(",", ":"))
+
+    size_in = os.path.getsize(args.input_file)
+    size_out = os.path.getsize(output)
+    print("=" * 80)
+    print(f"Input:   {args.input_file} ({size_in / 1024:.1f} KB)")
+    print(f"Output:  {output} ({size_out / 1024:.1f} KB)")
+    if not args.decode:
+        stats = arc_stats(result)
+        print(f"Arcs:    {stats['arcs']:,} ({stats['shared_arcs']:,} shared)")
+        print(f"Arc vertices: {stats['arc_vertices']:,}")
+        print(f"Size:    {100.0 * size_out / size_in:.1f}% of the GeoJSON")
+    print("=" * 80)
+    print(f"✅ Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
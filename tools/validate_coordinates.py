@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Validate coordinates of every vertex in every layer of a GeoJSON export.
+
+Thay cho verify_km_coordinates.py: chuyển đổi toàn bộ đỉnh (không chỉ R.GIOI)
+theo từng khối vector hoá, rồi với mỗi layer:
+  - đếm feature / đỉnh nằm ngoài khung bao dự kiến (Đà Nẵng)
+  - phát hiện ngoại lai bằng robust z-score (median/MAD) và rào IQR
+    trên tâm của từng feature
+  - histogram khoảng cách tới trung vị của layer
+và ghi báo cáo JSON kèm id các feature vi phạm.
+
+Usage:
+    python tools/validate_coordinates.py assets/maps/nhs.geojson
+    python tools/validate_coordinates.py KM_POINT.geojson --report km_report.json
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+from geojson_stream import flatten_coords
+from columnar_cache import open_cache
+from grid_transform import load_grid
+from vn2000 import A, vn2000_to_wgs84_np
+
+# Expected envelope for Đà Nẵng (lon_min, lat_min, lon_max, lat_max)
+DA_NANG_ENVELOPE = (107.8, 15.8, 108.6, 16.4)
+CHUNK_SIZE = 1_000_000
+Z_THRESHOLD = 3.5
+IQR_FACTOR = 1.5
+HISTOGRAM_BINS = 10
+MAX_IDS = 100
+M_PER_DEG = math.pi * A / 180
+
+
+def feature_id(feature, index):
+    props = feature.get("properties") or {}
+    for key in ("fid", "EntityHandle", "id"):
+        if props.get(key) is not None:
+            return props[key]
+    return feature.get("id", index)
+
+
+def detect_source_crs(data, xs):
+    """'wgs84' for CRS84/lon-lat files, 'vn2000' for projected CAD exports."""
+    name = ((data.get("crs") or {}).get("properties") or {}).get("name", "")
+    if "CRS84" in name or "4326" in name:
+        return "wgs84"
+    if xs.size and np.abs(xs).max() <= 180:
+        return "wgs84"
+    return "vn2000"
+
+
+def load_vertices(features):
+    """Flatten all features into coordinate arrays plus a vertex->feature index."""
+    flat = []
+    counts = np.zeros(len(features), dtype=np.int64)
+    for i, feature in enumerate(features):
+        geom = feature.get("geometry") or {}
+        before = len(flat)
+        flatten_coords(geom.get("coordinates"), flat)
+        counts[i] = (len(flat) - before) // 2
+    xy = np.asarray(flat, dtype=np.float64).reshape(-1, 2)
+    owner = np.repeat(np.arange(len(features)), counts)
+    return xy[:, 0], xy[:, 1], owner, counts
+
+
+def to_wgs84(xs, ys, chunk_size=CHUNK_SIZE):
+    """Project VN-2000 arrays to lon/lat chunk by chunk (grid if available)."""
+    grid = load_grid()
+    transform = grid.transform if grid is not None else vn2000_to_wgs84_np
+    lon = np.empty(xs.shape)
+    lat = np.empty(ys.shape)
+    for start in range(0, xs.size, chunk_size):
+        end = start + chunk_size
+        lon[start:end], lat[start:end] = transform(xs[start:end], ys[start:end])
+    return lon, lat
+
+
+def robust_z(values):
+    """Modified z-score: 0.6745 * (x - median) / MAD."""
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return np.zeros_like(values)
+    return 0.6745 * (values - median) / mad
+
+
+def iqr_outliers(values, factor=IQR_FACTOR):
+    q1, q3 = np.percentile(values, [25, 75])
+    iqr = q3 - q1
+    return (values < q1 - factor * iqr) | (values > q3 + factor * iqr)
+
+
+def validate_layer(name, idx, cx, cy, outside, counts, id_of):
+    """Build the report entry for one layer (idx = feature indices)."""
+    lon, lat = cx[idx], cy[idx]
+    # Work in metres relative to the layer median
+    lat0 = np.median(lat)
+    dx = (lon - np.median(lon)) * M_PER_DEG * math.cos(math.radians(lat0))
+    dy = (lat - lat0) * M_PER_DEG
+    dist = np.hypot(dx, dy)
+
+    z_flags = (np.abs(robust_z(dx)) > Z_THRESHOLD) | (
+        np.abs(robust_z(dy)) > Z_THRESHOLD
+    )
+    iqr_flags = iqr_outliers(dist)
+    env_flags = outside[idx]
+
+    hist, edges = np.histogram(dist, bins=HISTOGRAM_BINS)
+
+    def id_list(flags):
+        return [id_of(i) for i in idx[flags][:MAX_IDS].tolist()]
+
+    return {
+        "layer": name,
+        "features": int(idx.size),
+        "vertices": int(counts[idx].sum()),
+        "bbox": [
+            float(lon.min()),
+            float(lat.min()),
+            float(lon.max()),
+            float(lat.max()),
+        ],
+        "outside_envelope": int(env_flags.sum()),
+        "zscore_outliers": int(z_flags.sum()),
+        "iqr_outliers": int(iqr_flags.sum()),
+        "distance_histogram_m": {
+            "counts": hist.tolist(),
+            "edges": [round(float(e), 2) for e in edges],
+        },
+        "offending_ids": {
+            "outside_envelope": id_list(env_flags),
+            "zscore": id_list(z_flags),
+            "iqr": id_list(iqr_flags),
+        },
+    }
+
+
+def _from_geojson(input_file):
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    features = data.get("features", [])
+    xs, ys, owner, counts = load_vertices(features)
+    layers = [(f.get("properties") or {}).get("Layer", "None") for f in features]
+    ids = [feature_id(f, i) for i, f in enumerate(features)]
+    return data, xs, ys, owner, counts, layers, ids.__getitem__
+
+
+def _from_cache(input_file):
+    cache = open_cache(input_file)
+    counts = cache.vertex_counts()
+    names = cache.dictionaries["Layer"] + ["None"]  # code -1 -> "None"
+    layers = [names[code] for code in cache.codes["Layer"]]
+
+    def id_of(index):
+        return feature_id(cache.feature(index), index)
+
+    return (
+        {},
+        cache.xy[:, 0],
+        cache.xy[:, 1],
+        cache.vertex_owner(),
+        counts,
+        layers,
+        id_of,
+    )
+
+
+def validate_file(
+    input_file,
+    envelope=DA_NANG_ENVELOPE,
+    source_crs="auto",
+    chunk_size=CHUNK_SIZE,
+    use_cache=False,
+):
+    """Validate every vertex of every layer. Returns the report dict."""
+    load = _from_cache if use_cache else _from_geojson
+    data, xs, ys, owner, counts, layer_names, id_of = load(input_file)
+
+    if source_crs == "auto":
+        source_crs = detect_source_crs(data, xs)
+    if source_crs == "vn2000":
+        lon, lat = to_wgs84(xs, ys, chunk_size)
+    else:
+        lon, lat = xs, ys
+
+    # Per-vertex envelope test, reduced to per-feature flags
+    lon_min, lat_min, lon_max, lat_max = envelope
+    bad = (lon < lon_min) | (lon > lon_max) | (lat < lat_min) | (lat > lat_max)
+    n = len(counts)
+    outside = np.bincount(owner, weights=bad, minlength=n) > 0
+
+    # Per-feature centroid (vertex mean)
+    has_coords = counts > 0
+    safe = np.maximum(counts, 1)
+    cx = np.bincount(owner, weights=lon, minlength=n) / safe
+    cy = np.bincount(owner, weights=lat, minlength=n) / safe
+
+    codes = {}
+    layer_codes = np.array(
+        [codes.setdefault(name, len(codes)) for name in layer_names], dtype=np.int64
+    )
+
+    layers = []
+    for name, code in codes.items():
+        idx = np.flatnonzero((layer_codes == code) & has_coords)
+        if idx.size:
+            layers.append(validate_layer(name, idx, cx, cy, outside, counts, id_of))
+    layers.sort(key=lambda entry: entry["features"], reverse=True)
+
+    return {
+        "file": input_file,
+        "source_crs": source_crs,
+        "envelope": list(envelope),
+        "features": n,
+        "vertices": int(xs.size),
+        "empty_features": int((~has_coords).sum()),
+        "outside_envelope": int(outside.sum()),
+        "layers": layers,
+    }
+
+
+def print_report(report):
+    print(f"File:        {report['file']} ({report['source_crs']})")
+    print(f"Features:    {report['features']:,}")
+    print(f"Vertices:    {report['vertices']:,}")
+    print(f"Empty:       {report['empty_features']:,}")
+    print("\n" + "=" * 80)
+    print(f"{'Layer':40} {'feat':>7} {'verts':>9} {'out':>5} {'z':>5} {'iqr':>5}")
+    print("=" * 80)
+    for layer in report["layers"]:
+        print(
+            f"{layer['layer'][:40]:40} {layer['features']:7,} {layer['vertices']:9,} "
+            f"{layer['outside_envelope']:5} {layer['zscore_outliers']:5} "
+            f"{layer['iqr_outliers']:5}"
+        )
+    print("=" * 80)
+    if report["outside_envelope"]:
+        print(f"❌ {report['outside_envelope']} features OUTSIDE the expected envelope")
+    else:
+        print("✅ All features inside the expected envelope")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate GeoJSON coordinates")
+    parser.add_argument("input_file")
+    parser.add_argument("--report", default="coordinate_report.json")
+    parser.add_argument(
+        "--source-crs", choices=("auto", "vn2000", "wgs84"), default="auto"
+    )
+    parser.add_argument(
+        "--envelope",
+        type=float,
+        nargs=4,
+        default=DA_NANG_ENVELOPE,
+        metavar=("LON_MIN", "LAT_MIN", "LON_MAX", "LAT_MAX"),
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--cache", action="store_true", help="read through the columnar cache"
+    )
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("COORDINATE VALIDATION")
+    print("=" * 80)
+
+    report = validate_file(
+        args.input_file,
+        tuple(args.envelope),
+        args.source_crs,
+        args.chunk_size,
+        args.cache,
+    )
+    print_report(report)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nReport saved to: {args.report}")
+
+    return 1 if report["outside_envelope"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
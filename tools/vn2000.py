@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+VN-2000 TM-3 107-45 (EPSG:5899) <-> WGS84 (EPSG:4326) cho vùng Đà Nẵng.
+
+Kernel thuần NumPy, vector hoá trên cả mảng toạ độ:
+  - Transverse Mercator theo chuỗi Krüger bậc 6 (giống `etmerc` của PROJ)
+  - Helmert 7 tham số VN-2000 -> WGS84 (coordinate frame, giống EPSG:5899 của pyproj)
+
+Sai khác với pyproj < 1 mm trong toàn vùng Ngũ Hành Sơn.
+"""
+
+import math
+
+import numpy as np
+
+# Try to use pyproj for the reference (exact) transform
+try:
+    from pyproj import Transformer
+
+    USE_PYPROJ = True
+except ImportError:
+    USE_PYPROJ = False
+
+VN2000_CRS = "EPSG:5899"  # VN-2000 / TM-3 107-45
+WGS84_CRS = "EPSG:4326"
+
+# Ellipsoid WGS84 (VN-2000 dùng cùng ellipsoid)
+A = 6378137.0
+F = 1 / 298.257223563
+E2 = F * (2 - F)
+
+# TM-3 107-45
+LON_0 = 107.75
+K0 = 0.9999
+FALSE_EASTING = 500000.0
+FALSE_NORTHING = 0.0
+
+# VN-2000 -> WGS 84 (2), coordinate frame rotation
+HELMERT = {
+    "x": -191.90441429,
+    "y": -39.30318279,
+    "z": -111.45032835,
+    "rx": -0.00928836,
+    "ry": 0.01975479,
+    "rz": -0.00427372,
+    "s": 0.252906278,
+}
+
+# Khung bao vùng nghiên cứu (Ngũ Hành Sơn / Đà Nẵng) theo VN-2000, mét
+STUDY_AREA = (540000.0, 1760000.0, 570000.0, 1790000.0)
+
+_N = F / (2 - F)
+_RECT = A / (1 + _N) * (1 + _N**2 / 4 + _N**4 / 64)
+
+_ALPHA = (
+    _N / 2 - 2 * _N**2 / 3 + 5 * _N**3 / 16 + 41 * _N**4 / 180 - 127 * _N**5 / 288,
+    13 * _N**2 / 48 - 3 * _N**3 / 5 + 557 * _N**4 / 1440 + 281 * _N**5 / 630,
+    61 * _N**3 / 240 - 103 * _N**4 / 140 + 15061 * _N**5 / 26880,
+    49561 * _N**4 / 161280 - 179 * _N**5 / 168,
+    34729 * _N**5 / 80640,
+)
+_BETA = (
+    _N / 2 - 2 * _N**2 / 3 + 37 * _N**3 / 96 - _N**4 / 360 - 81 * _N**5 / 512,
+    _N**2 / 48 + _N**3 / 15 - 437 * _N**4 / 1440 + 46 * _N**5 / 105,
+    17 * _N**3 / 480 - 37 * _N**4 / 840 - 209 * _N**5 / 4480,
+    4397 * _N**4 / 161280 - 11 * _N**5 / 504,
+    4583 * _N**5 / 161280,
+)
+_DELTA = (
+    2 * _N - 2 * _N**2 / 3 - 2 * _N**3 + 116 * _N**4 / 45 + 26 * _N**5 / 45,
+    7 * _N**2 / 3 - 8 * _N**3 / 5 - 227 * _N**4 / 45 + 2704 * _N**5 / 315,
+    56 * _N**3 / 15 - 136 * _N**4 / 35 - 1262 * _N**5 / 105,
+    4279 * _N**4 / 630 - 332 * _N**5 / 35,
+    4174 * _N**5 / 315,
+)
+
+_ARCSEC = math.pi / (180 * 3600)
+
+
+def _rotation(inverse=False):
+    """Helmert rotation matrix (coordinate frame convention, exact)."""
+    rx, ry, rz = (HELMERT[k] * _ARCSEC for k in ("rx", "ry", "rz"))
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    rot_x = np.array([[1, 0, 0], [0, cx, sx], [0, -sx, cx]])
+    rot_y = np.array([[cy, 0, -sy], [0, 1, 0], [sy, 0, cy]])
+    rot_z = np.array([[cz, sz, 0], [-sz, cz, 0], [0, 0, 1]])
+    rot = rot_x @ rot_y @ rot_z
+    return rot.T if inverse else rot
+
+
+_ROT = _rotation()
+_ROT_INV = _rotation(inverse=True)
+_SHIFT = np.array([HELMERT["x"], HELMERT["y"], HELMERT["z"]])
+_SCALE = 1 + HELMERT["s"] * 1e-6
+
+
+def _tm_inverse(easting, northing):
+    """TM grid (m) -> geodetic lon/lat (radians) on the VN-2000 datum."""
+    xi = (np.asarray(northing, dtype=np.float64) - FALSE_NORTHING) / (K0 * _RECT)
+    eta = (np.asarray(easting, dtype=np.float64) - FALSE_EASTING) / (K0 * _RECT)
+
+    xi_p = xi.copy()
+    eta_p = eta.copy()
+    for j, beta in enumerate(_BETA, 1):
+        xi_p -= beta * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        eta_p -= beta * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+
+    chi = np.arcsin(np.sin(xi_p) / np.cosh(eta_p))
+    lat = chi.copy()
+    for j, delta in enumerate(_DELTA, 1):
+        lat += delta * np.sin(2 * j * chi)
+    lon = math.radians(LON_0) + np.arctan2(np.sinh(eta_p), np.cos(xi_p))
+    return lon, lat
+
+
+def _tm_forward(lon, lat):
+    """Geodetic lon/lat (radians) on the VN-2000 datum -> TM grid (m)."""
+    dlon = lon - math.radians(LON_0)
+    k = 2 * math.sqrt(_N) / (1 + _N)
+    sin_lat = np.sin(lat)
+    t = np.sinh(np.arctanh(sin_lat) - k * np.arctanh(k * sin_lat))
+    xi_p = np.arctan2(t, np.cos(dlon))
+    eta_p = np.arctanh(np.sin(dlon) / np.sqrt(1 + t * t))
+
+    xi = xi_p.copy()
+    eta = eta_p.copy()
+    for j, alpha in enumerate(_ALPHA, 1):
+        xi += alpha * np.sin(2 * j * xi_p) * np.cosh(2 * j * eta_p)
+        eta += alpha * np.cos(2 * j * xi_p) * np.sinh(2 * j * eta_p)
+
+    easting = FALSE_EASTING + K0 * _RECT * eta
+    northing = FALSE_NORTHING + K0 * _RECT * xi
+    return easting, northing
+
+
+def _to_cartesian(lon, lat):
+    sin_lat = np.sin(lat)
+    n = A / np.sqrt(1 - E2 * sin_lat * sin_lat)
+    cos_lat = np.cos(lat)
+    return np.stack(
+        [n * cos_lat * np.cos(lon), n * cos_lat * np.sin(lon), n * (1 - E2) * sin_lat]
+    )
+
+
+def _from_cartesian(xyz):
+    x, y, z = xyz
+    p = np.hypot(x, y)
+    lon = np.arctan2(y, x)
+    lat = np.arctan2(z, p * (1 - E2))
+    for _ in range(4):
+        sin_lat = np.sin(lat)
+        n = A / np.sqrt(1 - E2 * sin_lat * sin_lat)
+        lat = np.arctan2(z + E2 * n * sin_lat, p)
+    return lon, lat
+
+
+def _helmert(lon, lat, inverse=False):
+    """Datum shift at h=0 (pyproj pushes/pops the height the same way)."""
+    xyz = _to_cartesian(lon, lat)
+    shape = xyz.shape[1:]
+    flat = xyz.reshape(3, -1)
+    if inverse:
+        flat = _ROT_INV @ ((flat - _SHIFT[:, None]) / _SCALE)
+    else:
+        flat = _SHIFT[:, None] + _SCALE * (_ROT @ flat)
+    return _from_cartesian(flat.reshape((3,) + shape))
+
+
+def vn2000_to_wgs84_np(easting, northing):
+    """
+    Convert VN-2000 easting/northing arrays to WGS84 (lon, lat) in degrees.
+    Works on scalars or any NumPy array shape.
+    """
+    lon, lat = _tm_inverse(easting, northing)
+    lon, lat = _helmert(lon, lat)
+    return np.degrees(lon), np.degrees(lat)
+
+
+def wgs84_to_vn2000_np(lon, lat):
+    """Convert WGS84 lon/lat arrays (degrees) to VN-2000 easting/northing (m)."""
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon, lat = _helmert(lon, lat, inverse=True)
+    return _tm_forward(lon, lat)
+
+
+def get_transformer(inverse=False):
+    """pyproj Transformer VN-2000 -> WGS84 (or reverse), None if pyproj missing."""
+    if not USE_PYPROJ:
+        return None
+    if inverse:
+        return Transformer.from_crs(WGS84_CRS, VN2000_CRS, always_xy=True)
+    return Transformer.from_crs(VN2000_CRS, WGS84_CRS, always_xy=True)
+
+
+def vn2000_to_wgs84_exact(easting, northing):
+    """Reference transform: pyproj when available, NumPy kernel otherwise."""
+    transformer = get_transformer()
+    if transformer is None:
+        return vn2000_to_wgs84_np(easting, northing)
+    lon, lat = transformer.transform(
+        np.asarray(easting, dtype=np.float64), np.asarray(northing, dtype=np.float64)
+    )
+    return np.asarray(lon), np.asarray(lat)
+
+
+def wgs84_to_vn2000_exact(lon, lat):
+    """Reference inverse transform: pyproj when available, NumPy kernel otherwise."""
+    transformer = get_transformer(inverse=True)
+    if transformer is None:
+        return wgs84_to_vn2000_np(lon, lat)
+    easting, northing = transformer.transform(
+        np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+    )
+    return np.asarray(easting), np.asarray(northing)
+
+
+def degrees_to_metres(dlon, dlat, lat):
+    """Approximate ground distance (m) of a lon/lat difference at latitude `lat`."""
+    m_per_deg = math.pi * A / 180
+    return np.hypot(dlon * m_per_deg * np.cos(np.radians(lat)), dlat * m_per_deg)
+
+
+if __name__ == "__main__":
+    test_e, test_n = 553202.45, 1774166.03
+    lon, lat = vn2000_to_wgs84_np(test_e, test_n)
+    print(f"NumPy kernel: {float(lon):.9f}°E, {float(lat):.9f}°N")
+    if USE_PYPROJ:
+        ref_lon, ref_lat = vn2000_to_wgs84_exact(test_e, test_n)
+        err = degrees_to_metres(lon - ref_lon, lat - ref_lat, ref_lat)
+        print(f"pyproj:       {float(ref_lon):.9f}°E, {float(ref_lat):.9f}°N")
+        print(f"Difference:   {float(err) * 1000:.3f} mm")
+    back_e, back_n = wgs84_to_vn2000_np(lon, lat)
+    print(f"Round trip:   E={float(back_e):.4f}, N={float(back_n):.4f}")